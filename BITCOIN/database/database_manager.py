@@ -1,47 +1,129 @@
 # database/database_manager.py
+import logging
+import os
+import queue
 import sqlite3
+import threading
 from datetime import datetime, timedelta
-import pandas as pd
+from urllib.request import pathname2url
+from database.migrations import migrate
+from database.trade_queries import to_epoch, query_trades, aggregate_trades, load_daily_pnl
+
+logger = logging.getLogger(__name__)
+
+# WAL lets the dashboard read while the bot writes; NORMAL skips the fsync on every commit
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-16000",  # 16 MB page cache
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=5000",
+)
+
+TRADE_COLUMNS = ('timestamp', 'ts_epoch', 'source', 'decision', 'percentage', 'reason', 'coin_symbol',
+                 'coin_balance', 'krw_balance', 'coin_avg_buy_price', 'coin_krw_price', 'profit_amount',
+                 'profit_rate', 'trade_start_time', 'trade_end_time', 'reflection', 'gpt_response', 'fee')
+
+_STOP = object()
+
+
+def connect(db_name):
+    """Read/write connection with the tuned pragmas."""
+    conn = sqlite3.connect(db_name, timeout=5)
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+def connect_readonly(db_name):
+    """
+    Read-only connection for dashboards. It can never take the write lock,
+    so it does not block (or get blocked by) the bot's writer under WAL.
+    """
+    uri = f"file:{pathname2url(os.path.abspath(db_name))}?mode=ro"
+    conn = sqlite3.connect(uri, uri=True, timeout=5, check_same_thread=False)
+    conn.execute("PRAGMA busy_timeout=5000")
+    conn.execute("PRAGMA query_only=ON")
+    return conn
+
 
 class DatabaseManager:
-    def __init__(self, db_name="crypto_trades.db"):
-        self.conn = sqlite3.connect(db_name)
+    def __init__(self, db_name="crypto_trades.db", source="trade_bot", batch_size=500):
+        self.db_name = db_name
+        self.source = source  # bot name stored on every row of the shared store
+        self.batch_size = batch_size
+        self.conn = connect(db_name)  # used for reads on the caller's thread
         self._initialize_db()
+        # writes go through a queue so log_trade never waits on disk
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="trade-writer", daemon=True)
+        self._writer.start()
 
     def _initialize_db(self):
-        c = self.conn.cursor()
-        c.execute('''CREATE TABLE IF NOT EXISTS trades
-                     (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                      timestamp TEXT,
-                      decision TEXT,
-                      percentage REAL,
-                      reason TEXT,
-                      coin_symbol TEXT,
-                      coin_balance REAL,
-                      krw_balance REAL,
-                      coin_avg_buy_price REAL,
-                      coin_krw_price REAL,
-                      profit_amount REAL,
-                      profit_rate REAL,
-                      trade_start_time TEXT,
-                      trade_end_time TEXT,
-                      reflection TEXT)''')
-        self.conn.commit()
+        # creates the unified schema, or upgrades a legacy file in place
+        migrate(self.conn, self.source)
+
+    def _write_loop(self):
+        conn = connect(self.db_name)
+        sql = (f"INSERT INTO trades ({', '.join(TRADE_COLUMNS)}) "
+               f"VALUES ({', '.join(':' + col for col in TRADE_COLUMNS)})")
+        stop = False
+        while not stop:
+            batch = [self._queue.get()]
+            # drain whatever queued up meanwhile into the same transaction
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            rows = [item for item in batch if item is not _STOP]
+            stop = len(rows) < len(batch)
+            if rows:
+                try:
+                    with conn:
+                        conn.executemany(sql, rows)
+                except sqlite3.Error as e:
+                    logger.error(f"Failed to write {len(rows)} trade(s): {e}")
+            for _ in batch:
+                self._queue.task_done()
+        conn.close()
 
     def log_trade(self, **kwargs):
-        c = self.conn.cursor()
-        c.execute("""INSERT INTO trades 
-                     (timestamp, decision, percentage, reason, coin_symbol, coin_balance, krw_balance,
-                      coin_avg_buy_price, coin_krw_price, profit_amount, profit_rate, trade_start_time, trade_end_time, reflection) 
-                     VALUES (:timestamp, :decision, :percentage, :reason, :coin_symbol, :coin_balance, :krw_balance,
-                             :coin_avg_buy_price, :coin_krw_price, :profit_amount, :profit_rate, :trade_start_time, :trade_end_time, :reflection)""",
-                  kwargs)
-        self.conn.commit()
-
-    def get_recent_trades(self, days=30):
-        c = self.conn.cursor()
-        days_ago = (datetime.now() - timedelta(days=days)).isoformat()
-        c.execute("SELECT * FROM trades WHERE timestamp > ? ORDER BY timestamp ASC", (days_ago,))
-        columns = [column[0] for column in c.description]
-        trades_df = pd.DataFrame.from_records(data=c.fetchall(), columns=columns)
-        return trades_df
\ No newline at end of file
+        """Queue a trade row for the background writer (returns immediately)."""
+        row = {col: kwargs.get(col) for col in TRADE_COLUMNS}
+        if row['timestamp'] is None:
+            row['timestamp'] = datetime.now().isoformat()
+        row['ts_epoch'] = to_epoch(row['timestamp'])
+        row['source'] = row['source'] or self.source
+        self._queue.put(row)
+
+    def flush(self):
+        """Block until every queued trade is committed."""
+        self._queue.join()
+
+    def close(self):
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join()
+        self.conn.close()
+
+    def query_trades(self, columns=None, start=None, end=None, coins=None, decision=None,
+                     descending=False, limit=None, sources=None):
+        """Trades in [start, end) with only the requested columns (see trade_queries.query_trades)."""
+        self.flush()
+        return query_trades(self.conn, columns, start, end, coins, decision, descending, limit, sources)
+
+    def aggregate_trades(self, aggregates, bucket=None, by_coin=False, start=None, end=None,
+                         coins=None, decision=None, sources=None, by_source=False):
+        """Grouped aggregates computed in SQL (see trade_queries.aggregate_trades)."""
+        self.flush()
+        return aggregate_trades(self.conn, aggregates, bucket, by_coin, start, end, coins, decision,
+                                sources, by_source)
+
+    def daily_pnl(self, start=None, end=None, coins=None, sources=None):
+        """Rows of the daily_pnl rollup (see trade_queries.load_daily_pnl)."""
+        self.flush()
+        return load_daily_pnl(self.conn, start, end, coins, sources)
+
+    def get_recent_trades(self, days=30, columns=None):
+        return self.query_trades(columns, start=datetime.now() - timedelta(days=days))
@@ -0,0 +1,90 @@
+# indicators/batch_indicators.py
+import numpy as np
+
+# Vectorized BB / RSI / MACD over a (markets x time) close matrix.
+# Rows are markets, columns are candles in time order; no per-market Python loop.
+# Outputs follow the `ta` library conventions used by IndicatorCalculator.add_indicators.
+
+
+def _as_matrix(close):
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    return close[np.newaxis, :] if close.ndim == 1 else close
+
+
+def rolling_mean_std(close, window):
+    """Rolling mean and population (ddof=0) std along time; first window-1 columns are NaN."""
+    close = _as_matrix(close)
+    n_markets, n = close.shape
+    mean = np.full(close.shape, np.nan)
+    std = np.full(close.shape, np.nan)
+    if n < window:
+        return mean, std
+    # shift by each row's first value so the running sums stay small
+    x = close - close[:, :1]
+    csum = np.zeros((n_markets, n + 1))
+    csq = np.zeros((n_markets, n + 1))
+    np.cumsum(x, axis=1, out=csum[:, 1:])
+    np.cumsum(x * x, axis=1, out=csq[:, 1:])
+    s = csum[:, window:] - csum[:, :-window]
+    sq = csq[:, window:] - csq[:, :-window]
+    m = s / window
+    mean[:, window - 1:] = m + close[:, :1]
+    std[:, window - 1:] = np.sqrt(np.maximum(sq / window - m * m, 0.0))
+    return mean, std
+
+
+def ewm(x, alpha, min_periods=0):
+    """adjust=False EWM along time, seeded with each row's first non-NaN value."""
+    x = _as_matrix(x)
+    out = np.empty_like(x)
+    prev = np.full(x.shape[0], np.nan)
+    for t in range(x.shape[1]):
+        col = x[:, t]
+        valid = ~np.isnan(col)
+        prev = np.where(np.isnan(prev), col, np.where(valid, prev + alpha * (col - prev), prev))
+        out[:, t] = prev
+    if min_periods:
+        seen = np.cumsum(~np.isnan(x), axis=1)
+        out[seen < min_periods] = np.nan
+    return out
+
+
+def bollinger(close, window=20, window_dev=2):
+    mavg, std = rolling_mean_std(close, window)
+    return mavg, mavg + window_dev * std, mavg - window_dev * std
+
+
+def rsi(close, window=14):
+    close = _as_matrix(close)
+    diff = np.zeros(close.shape)
+    diff[:, 1:] = np.diff(close, axis=1)
+    up = ewm(np.maximum(diff, 0.0), 1.0 / window, min_periods=window)
+    dn = ewm(np.maximum(-diff, 0.0), 1.0 / window, min_periods=window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out = 100.0 - 100.0 / (1.0 + up / dn)
+    return np.where(dn == 0, 100.0, out)
+
+
+def macd(close, window_fast=12, window_slow=26, window_sign=9):
+    close = _as_matrix(close)
+    fast = ewm(close, 2.0 / (window_fast + 1), min_periods=window_fast)
+    slow = ewm(close, 2.0 / (window_slow + 1), min_periods=window_slow)
+    line = fast - slow
+    signal = ewm(line, 2.0 / (window_sign + 1), min_periods=window_sign)
+    return line, signal, line - signal
+
+
+def compute_all(close):
+    """All indicators used by the bots, keyed like IndicatorCalculator.add_indicators."""
+    close = _as_matrix(close)
+    bbm, bbh, bbl = bollinger(close)
+    line, signal, diff = macd(close)
+    return {
+        'bb_bbm': bbm,
+        'bb_bbh': bbh,
+        'bb_bbl': bbl,
+        'rsi': rsi(close),
+        'macd': line,
+        'macd_signal': signal,
+        'macd_diff': diff,
+    }
@@ -0,0 +1,40 @@
+# indicators/benchmark_batch.py
+# Usage (from BITCOIN/): python -m indicators.benchmark_batch
+import time
+import numpy as np
+import pandas as pd
+from indicators.batch_indicators import compute_all
+from indicators.indicator_calculator import IndicatorCalculator
+
+
+def _best_of(func, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(market_counts=(10, 100, 1000), candles=200, seed=0):
+    rng = np.random.default_rng(seed)
+    print(f"{'markets':>8} {'ta (s)':>10} {'batch (s)':>10} {'speedup':>8} {'max rel diff':>13}")
+    for n in market_counts:
+        close = np.cumprod(1 + rng.normal(0, 0.01, (n, candles)), axis=1) * 1e7
+        frames = [pd.DataFrame({'open': c, 'high': c, 'low': c, 'close': c, 'volume': 1.0}) for c in close]
+
+        ta_results = []
+        ta_time = _best_of(lambda: ta_results.__setitem__(
+            slice(None), [IndicatorCalculator.add_indicators(df.copy()) for df in frames]))
+        batch_results = {}
+        batch_time = _best_of(lambda: batch_results.update(compute_all(close)))
+
+        diff = 0.0
+        for key, values in batch_results.items():
+            ref = np.vstack([r[key].to_numpy() for r in ta_results])
+            diff = max(diff, float(np.nanmax(np.abs(values - ref) / np.maximum(np.abs(ref), 1.0))))
+        print(f"{n:>8} {ta_time:>10.4f} {batch_time:>10.4f} {ta_time / batch_time:>7.1f}x {diff:>13.2e}")
+
+
+if __name__ == "__main__":
+    run()
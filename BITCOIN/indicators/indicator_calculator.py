@@ -1,8 +1,12 @@
 # indicators/indicator_calculator.py
 import ta
 from ta.utils import dropna
+from indicators.streaming_indicators import StreamingIndicators
 
 class IndicatorCalculator:
+    def __init__(self):
+        self.streams = {}
+
     @staticmethod
     def add_indicators(df):
         df = dropna(df)
@@ -18,4 +22,25 @@ class IndicatorCalculator:
         df['macd'] = macd.macd()
         df['macd_signal'] = macd.macd_signal()
         df['macd_diff'] = macd.macd_diff()
-        return df
\ No newline at end of file
+        return df
+
+    def update(self, market, ts, close):
+        """O(1) update of one market's indicators with a new (or in-progress) candle."""
+        stream = self.streams.get(market)
+        if stream is None:
+            stream = self.streams[market] = StreamingIndicators()
+        return stream.update(close, ts)
+
+    def warm_up(self, market, df):
+        """Seed a market's streaming state from a history DataFrame."""
+        df = dropna(df)
+        self.streams[market] = StreamingIndicators()
+        for ts, close in zip(df.index, df['close']):
+            values = self.streams[market].update(close, ts)
+        return values if len(df) else None
+
+    def snapshot(self):
+        return {market: stream.snapshot() for market, stream in self.streams.items()}
+
+    def restore(self, snapshot):
+        self.streams = {market: StreamingIndicators.restore(state) for market, state in snapshot.items()}
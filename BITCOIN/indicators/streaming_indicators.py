@@ -0,0 +1,159 @@
+# indicators/streaming_indicators.py
+import math
+from collections import deque
+
+NAN = float('nan')
+
+
+class StreamingIndicators:
+    """
+    Incremental BB / RSI (Wilder) / MACD / SMA / EMA for a single market.
+    Each update is O(1) and reproduces the `ta` library's values
+    (same windows, ddof=0 std, adjust=False EWMs, same warm-up NaNs).
+    Re-sending the timestamp of the last candle replaces it, so an
+    in-progress candle can be updated without double counting.
+    """
+
+    RESUM_INTERVAL = 1000  # recompute window sums periodically to cancel float drift
+
+    def __init__(self, bb_window=20, bb_dev=2, rsi_window=14, macd_fast=12, macd_slow=26,
+                 macd_sign=9, sma_window=20, ema_window=12):
+        self.params = dict(bb_window=bb_window, bb_dev=bb_dev, rsi_window=rsi_window,
+                           macd_fast=macd_fast, macd_slow=macd_slow, macd_sign=macd_sign,
+                           sma_window=sma_window, ema_window=ema_window)
+        self._window_len = max(bb_window, sma_window)
+        self._state = self._empty_state()
+        self._undo = None
+
+    @staticmethod
+    def _empty_state():
+        return {
+            'count': 0, 'last_ts': None, 'prev_close': None,
+            'window': deque(), 'win_sum': 0.0, 'win_sumsq': 0.0, 'since_resum': 0,
+            'rsi_up': 0.0, 'rsi_dn': 0.0,
+            'ema_fast': None, 'ema_slow': None, 'ema': None,
+            'signal': None, 'signal_count': 0,
+        }
+
+    @staticmethod
+    def _ewm(prev, value, alpha):
+        return value if prev is None else prev + alpha * (value - prev)
+
+    def _apply(self, close, ts):
+        s = self._state
+        p = self.params
+        # keep what is needed to roll this candle back if it gets replaced
+        scalars = {k: v for k, v in s.items() if k != 'window'}
+        evicted = None
+
+        s['window'].append(close)
+        s['win_sum'] += close
+        s['win_sumsq'] += close * close
+        if len(s['window']) > self._window_len:
+            evicted = s['window'].popleft()
+            s['win_sum'] -= evicted
+            s['win_sumsq'] -= evicted * evicted
+        s['since_resum'] += 1
+        if s['since_resum'] >= self.RESUM_INTERVAL:
+            s['win_sum'] = math.fsum(s['window'])
+            s['win_sumsq'] = math.fsum(x * x for x in s['window'])
+            s['since_resum'] = 0
+
+        diff = 0.0 if s['prev_close'] is None else close - s['prev_close']
+        alpha = 1.0 / p['rsi_window']
+        if s['count'] == 0:
+            s['rsi_up'], s['rsi_dn'] = max(diff, 0.0), max(-diff, 0.0)
+        else:
+            s['rsi_up'] += alpha * (max(diff, 0.0) - s['rsi_up'])
+            s['rsi_dn'] += alpha * (max(-diff, 0.0) - s['rsi_dn'])
+
+        s['ema_fast'] = self._ewm(s['ema_fast'], close, 2.0 / (p['macd_fast'] + 1))
+        s['ema_slow'] = self._ewm(s['ema_slow'], close, 2.0 / (p['macd_slow'] + 1))
+        s['ema'] = self._ewm(s['ema'], close, 2.0 / (p['ema_window'] + 1))
+        s['count'] += 1
+        if s['count'] >= max(p['macd_fast'], p['macd_slow']):
+            macd = s['ema_fast'] - s['ema_slow']
+            s['signal'] = self._ewm(s['signal'], macd, 2.0 / (p['macd_sign'] + 1))
+            s['signal_count'] += 1
+
+        s['prev_close'] = close
+        s['last_ts'] = ts
+        self._undo = (scalars, evicted)
+
+    def _rollback(self):
+        scalars, evicted = self._undo
+        window = self._state['window']
+        window.pop()
+        if evicted is not None:
+            window.appendleft(evicted)
+        scalars['window'] = window
+        self._state = scalars
+        self._undo = None
+
+    def update(self, close, ts=None):
+        """Feed one candle close and return the latest indicator values."""
+        close = float(close)
+        ts = None if ts is None else str(ts)  # comparable and JSON friendly
+        if ts is not None and ts == self._state['last_ts'] and self._undo is not None:
+            self._rollback()
+        self._apply(close, ts)
+        return self.values()
+
+    def _window_stats(self, n):
+        window = self._state['window']
+        if len(window) < n:
+            return NAN, NAN
+        if n == len(window):
+            total, total_sq = self._state['win_sum'], self._state['win_sumsq']
+        else:
+            tail = list(window)[-n:]
+            total, total_sq = math.fsum(tail), math.fsum(x * x for x in tail)
+        mean = total / n
+        var = max(total_sq / n - mean * mean, 0.0)
+        return mean, math.sqrt(var)
+
+    def values(self):
+        s = self._state
+        p = self.params
+        bbm, std = self._window_stats(p['bb_window'])
+        sma, _ = self._window_stats(p['sma_window'])
+
+        rsi = NAN
+        if s['count'] >= p['rsi_window']:
+            rsi = 100.0 if s['rsi_dn'] == 0 else 100.0 - 100.0 / (1.0 + s['rsi_up'] / s['rsi_dn'])
+
+        macd = NAN
+        if s['count'] >= max(p['macd_fast'], p['macd_slow']):
+            macd = s['ema_fast'] - s['ema_slow']
+        signal = s['signal'] if s['signal_count'] >= p['macd_sign'] else NAN
+
+        return {
+            'bb_bbm': bbm,
+            'bb_bbh': bbm + p['bb_dev'] * std,
+            'bb_bbl': bbm - p['bb_dev'] * std,
+            'rsi': rsi,
+            'macd': macd,
+            'macd_signal': signal,
+            'macd_diff': macd - signal,
+            f"sma_{p['sma_window']}": sma,
+            f"ema_{p['ema_window']}": s['ema'] if s['count'] >= p['ema_window'] else NAN,
+        }
+
+    def snapshot(self):
+        """Serializable copy of the full state (JSON friendly)."""
+        state = {k: v for k, v in self._state.items() if k != 'window'}
+        state['window'] = list(self._state['window'])
+        undo = None
+        if self._undo is not None:
+            undo = [dict(self._undo[0]), self._undo[1]]
+        return {'params': dict(self.params), 'state': state, 'undo': undo}
+
+    @classmethod
+    def restore(cls, snapshot):
+        obj = cls(**snapshot['params'])
+        state = dict(snapshot['state'])
+        state['window'] = deque(state['window'])
+        obj._state = state
+        if snapshot.get('undo'):
+            obj._undo = (dict(snapshot['undo'][0]), snapshot['undo'][1])
+        return obj
@@ -0,0 +1,58 @@
+# trade/signals.py
+import numpy as np
+import pandas as pd
+
+# Reason codes, in the priority order TradeBot.make_decision checks them
+HOLD = 0
+BB_RSI_OVERBOUGHT = 1
+BB_RSI_OVERSOLD = 2
+MACD_CROSS_UP = 3
+MACD_CROSS_DOWN = 4
+
+DECISIONS = {HOLD: "hold", BB_RSI_OVERBOUGHT: "sell", BB_RSI_OVERSOLD: "buy",
+             MACD_CROSS_UP: "buy", MACD_CROSS_DOWN: "sell"}
+REASONS = {
+    HOLD: "",
+    BB_RSI_OVERBOUGHT: "Price crossed upper BB and RSI overbought.",
+    BB_RSI_OVERSOLD: "Price crossed lower BB and RSI oversold.",
+    MACD_CROSS_UP: "MACD crossed above signal line.",
+    MACD_CROSS_DOWN: "MACD crossed below signal line.",
+}
+
+
+def reason_codes(df):
+    """Reason code for every row, from crossover masks over the whole history (row 0 is HOLD)."""
+    def prev(col):
+        values = df[col].to_numpy(dtype=float)
+        shifted = np.full_like(values, np.nan)
+        shifted[1:] = values[:-1]
+        return shifted, values
+
+    with np.errstate(invalid='ignore'):
+        close_p, close = prev('close')
+        bbh_p, bbh = prev('bb_bbh')
+        bbl_p, bbl = prev('bb_bbl')
+        rsi_p, rsi = prev('rsi')
+        macd_p, macd = prev('macd')
+        sig_p, sig = prev('macd_signal')
+
+        conditions = [
+            (close_p < bbh_p) & (close >= bbh) & (rsi_p <= 70) & (rsi > 70),
+            (close_p > bbl_p) & (close <= bbl) & (rsi_p >= 30) & (rsi < 30),
+            (macd_p <= sig_p) & (macd > sig),
+            (macd_p >= sig_p) & (macd < sig),
+        ]
+    choices = [BB_RSI_OVERBOUGHT, BB_RSI_OVERSOLD, MACD_CROSS_UP, MACD_CROSS_DOWN]
+    return np.select(conditions, choices, default=HOLD).astype(np.int8)
+
+
+def signal_series(df):
+    """DataFrame of decision / reason_code / reason aligned with df's index."""
+    codes = reason_codes(df)
+    decisions = np.array([DECISIONS[c] for c in sorted(DECISIONS)], dtype=object)
+    reasons = np.array([REASONS[c] for c in sorted(REASONS)], dtype=object)
+    return pd.DataFrame({
+        'decision': decisions[codes],
+        'reason_code': codes,
+        'reason': reasons[codes],
+    }, index=df.index)
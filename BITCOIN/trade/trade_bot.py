@@ -2,10 +2,13 @@
 import pyupbit
 import logging
 from datetime import datetime
+from trade import signals
+from trade.balance_book import BalanceBook
 
 class TradeBot:
     def __init__(self, access_key, secret_key, database_manager, indicator_calculator):
         self.upbit = pyupbit.Upbit(access_key, secret_key)
+        self.balances = BalanceBook(self.upbit)
         self.db_manager = database_manager
         self.indicator_calculator = indicator_calculator
         self.logger = logging.getLogger(__name__)
@@ -13,32 +16,43 @@ class TradeBot:
     def make_decision(self, df):
         if len(df) < 2:
             return "hold", ""
+        code = signals.reason_codes(df)[-1]
+        return signals.DECISIONS[code], signals.REASONS[code]
 
-        prev_row = df.iloc[-2]
-        last_row = df.iloc[-1]
-        decision, reason = "hold", ""
+    def decision_series(self, df):
+        """Full buy/sell/hold history with reason codes (for backtests)."""
+        return signals.signal_series(df)
 
-        if (prev_row['close'] < prev_row['bb_bbh'] and last_row['close'] >= last_row['bb_bbh']) and \
-           (prev_row['rsi'] <= 70 and last_row['rsi'] > 70):
-            decision, reason = "sell", "Price crossed upper BB and RSI overbought."
-        elif (prev_row['close'] > prev_row['bb_bbl'] and last_row['close'] <= last_row['bb_bbl']) and \
-             (prev_row['rsi'] >= 30 and last_row['rsi'] < 30):
-            decision, reason = "buy", "Price crossed lower BB and RSI oversold."
-        elif prev_row['macd'] <= prev_row['macd_signal'] and last_row['macd'] > last_row['macd_signal']:
-            decision, reason = "buy", "MACD crossed above signal line."
-        elif prev_row['macd'] >= prev_row['macd_signal'] and last_row['macd'] < last_row['macd_signal']:
-            decision, reason = "sell", "MACD crossed below signal line."
-
-        return decision, reason
-
-    def execute_trade(self, decision, market, allocation, krw_balance):
+    def execute_trade(self, decision, market, allocation, price, krw_balance=None):
+        """
+        Place a market order for a signal and apply the fill to the balance book.
+        :param price: price the signal was computed on (e.g. the last close); the book uses it as the
+                      fill price, so no extra quote request is made
+        """
+        # one get_balances() per cycle at most; fills are applied to the book locally
+        self.balances.refresh()
+        if krw_balance is None:
+            krw_balance = self.balances.balance("KRW")
         if decision == "buy":
             amount_to_buy = krw_balance * (allocation / 100)
             if amount_to_buy >= 5000:
-                self.upbit.buy_market_order(market, amount_to_buy)
+                result = self.upbit.buy_market_order(market, amount_to_buy)
+                if not self._accepted(result):
+                    self.logger.error(f"BUY order for {amount_to_buy} KRW on {market} failed: {result}")
+                    return
+                self.balances.apply_buy(market, amount_to_buy, price)
                 self.logger.info(f"Executed BUY order for {amount_to_buy} KRW on {market}.")
         elif decision == "sell":
-            coin_balance = self.upbit.get_balance(market.replace("KRW-", ""))
-            if coin_balance * pyupbit.get_current_price(market) >= 5000:
-                self.upbit.sell_market_order(market, coin_balance)
+            coin_balance = self.balances.balance(market)
+            if coin_balance * price >= 5000:
+                result = self.upbit.sell_market_order(market, coin_balance)
+                if not self._accepted(result):
+                    self.logger.error(f"SELL order for {coin_balance} on {market} failed: {result}")
+                    return
+                self.balances.apply_sell(market, coin_balance, price)
                 self.logger.info(f"Executed SELL order for {coin_balance} on {market}.")
+
+    @staticmethod
+    def _accepted(result):
+        # pyupbit returns the order (with its uuid) on success, an {'error': ...} dict or None otherwise
+        return isinstance(result, dict) and 'uuid' in result
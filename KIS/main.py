@@ -1,56 +1,148 @@
 # 7. main.py
 #python
-import time
+import asyncio
 import datetime
+import threading
+import time
 from models.stock_config import StockConfig
 from services.notification import NotificationService
+from services.kis_client import KisClient
 from services.authentication import AuthenticationService
 from services.stock_info import StockInfoService
+from services.history_store import HistoryStore
 from services.account import AccountService
 from services.trading import TradingService
+from services.realtime_quote import RealtimeQuoteService, Tick
+from services.trading_engine import (TradingEngine, PHASE_LIQUIDATE, PHASE_BUY,
+                                     PHASE_SELL, PHASE_CLOSED)
 
 class AutoTradeBot:
     def __init__(self, config_path='config/config.yaml'):
         # 컴포넌트 초기화
         self.config = StockConfig(config_path)
         self.notification = NotificationService(self.config.DISCORD_WEBHOOK_URL)
-        self.auth_service = AuthenticationService(self.config)
-        self.stock_info = StockInfoService(self.config, self.auth_service)
-        self.account_service = AccountService(self.config, self.auth_service, self.notification)
-        self.trading_service = TradingService(self.config, self.auth_service, self.notification)
+        self.client = KisClient(self.config)  # 모든 서비스가 공유하는 커넥션 풀
+        self.auth_service = AuthenticationService(self.config, self.client)
+        self.history_store = HistoryStore(self.config.HISTORY_DIR, self.client)
+        self.stock_info = StockInfoService(self.config, self.auth_service, self.client, self.history_store)
+        self.account_service = AccountService(self.config, self.auth_service, self.notification, self.client)
+        self.trading_service = TradingService(self.config, self.auth_service, self.notification, self.client)
+        self.realtime = RealtimeQuoteService(self.config, self.auth_service, self._on_tick)
+
+        # 트레이딩 파라미터
+        self.symbol_list = ["005930", "035720", "000660", "069500"]
+        self.target_buy_count = 3
+        self.buy_percent = 0.33
+        self.bought_list = []
+        self.stock_dict = {}
+        self.target_prices = {}
+        self.buy_amount = 0
+        self.soldout = False
+        self.engine = None
+
+    def _on_tick(self, tick):
+        # 웹소켓 스레드에서 호출되므로 엔진 대기열로만 넘긴다
+        self.engine.post(tick)
+
+    def _start_realtime(self):
+        for sym in self.symbol_list:
+            asyncio.run(self.realtime.subscribe(sym))
+        threading.Thread(target=asyncio.run, args=(self.realtime.run(),),
+                         name="kis-realtime", daemon=True).start()
+
+    def _sell_all(self):
+        self.account_service.invalidate()
+        self.stock_dict = self.account_service.get_stock_balance()
+        for sym, qty in self.stock_dict.items():
+            self.trading_service.sell_stock(sym, qty)
+        self.bought_list = []
+        self.account_service.invalidate()
+
+    def _try_buy(self, sym, current_price):
+        if sym in self.bought_list or len(self.bought_list) >= self.target_buy_count:
+            return
+        target_price = self.target_prices.get(sym)
+        if not self.stock_info.strategy.is_breakout(current_price, target_price):
+            return
+        buy_qty = int(self.buy_amount // current_price)
+        if buy_qty <= 0:
+            return
+        self.notification.send_message(f"{sym} 목표가 달성({target_price} < {current_price}) 매수를 시도합니다.")
+        if self.trading_service.buy_stock(sym, buy_qty, current_price):
+            self.soldout = False
+            self.bought_list.append(sym)
+            self.account_service.invalidate()
+
+    def _report_balance(self):
+        """매수 구간 동안 매시 30분에 보유 잔고 알림"""
+        self.account_service.get_stock_balance()
+        next_report = (datetime.datetime.now() + datetime.timedelta(hours=1)).replace(
+            minute=30, second=0, microsecond=0)
+        self.engine.call_at(next_report, self._report_balance)
+
+    def on_phase(self, phase):
+        """장 구간 전환 처리 (전환 시각에 한 번만 호출)"""
+        if phase == PHASE_LIQUIDATE and not self.soldout:
+            # 잔여 수량 매도
+            self._sell_all()
+        elif phase == PHASE_BUY:
+            # 목표가는 장중 바뀌지 않으므로 구간 시작 시 한 번에 조회
+            snapshot = asyncio.run(self.stock_info.scan(self.symbol_list))
+            self.target_prices = {sym: s["target_price"] for sym, s in snapshot.items()}
+            for sym, s in snapshot.items():
+                self._try_buy(sym, s["current_price"])
+            self._start_realtime()
+            now = datetime.datetime.now()
+            first_report = now.replace(minute=30, second=0, microsecond=0)
+            if first_report <= now:
+                first_report += datetime.timedelta(hours=1)
+            self.engine.call_at(first_report, self._report_balance)
+        elif phase == PHASE_SELL and not self.soldout:
+            # 일괄 매도
+            self._sell_all()
+            self.soldout = True
+        elif phase == PHASE_CLOSED:
+            self.notification.send_message("프로그램을 종료합니다.")
+            self.engine.stop()
+
+    def on_event(self, event):
+        """시세 이벤트 처리 (체결 수신 즉시 돌파 여부 확인)"""
+        if isinstance(event, Tick) and self.engine.phase == PHASE_BUY:
+            self._try_buy(event.code, event.price)
 
     def run(self):
         try:
             # 액세스 토큰 획득
             self.auth_service.get_access_token()
 
-            # 트레이딩 파라미터
-            symbol_list = ["005930", "035720", "000660", "069500"]
-            bought_list = []
-            total_cash = self.account_service.get_balance()
-            stock_dict = self.account_service.get_stock_balance()
-            
-            for sym in stock_dict.keys():
-                bought_list.append(sym)
+            if datetime.datetime.today().weekday() >= 5:  # 토요일이나 일요일이면 자동 종료
+                self.notification.send_message("주말이므로 프로그램을 종료합니다.")
+                return
 
-            target_buy_count = 3
-            buy_percent = 0.33
-            buy_amount = total_cash * buy_percent
-            soldout = False
+            try:
+                # 전일까지의 일봉을 로컬 저장소에 이어 받기 (목표가 계산은 저장소를 우선 사용)
+                self.history_store.backfill(self.symbol_list)
+            except RuntimeError as e:
+                self.notification.send_message(f"일봉 백필 실패: {e}")
 
-            self.notification.send_message("===국내 주식 자동매매 프로그램을 시작합니다===")
+            snapshot = self.account_service.get_snapshot()
+            total_cash = self.account_service.get_balance()
+            self.stock_dict = snapshot.quantities
+            self.bought_list = list(self.stock_dict.keys())
+            self.buy_amount = total_cash * self.buy_percent
+            self.soldout = False
 
-            while True:
-                # 기존 트레이딩 로직 (생략)
-                # 시간대별 매수/매도 로직 유지
+            self.notification.send_message("===국내 주식 자동매매 프로그램을 시작합니다===")
 
-                time.sleep(1)  # CPU 사용률 제어
+            self.engine = TradingEngine(self.on_phase, self.on_event)
+            self.engine.run()
 
         except Exception as e:
             self.notification.send_message(f"[오류 발생] {e}")
             time.sleep(1)
+        finally:
+            self.notification.close()  # 대기 중인 알림 전송 후 종료
 
 if __name__ == "__main__":
     bot = AutoTradeBot()
     bot.run()
-#
\ No newline at end of file
@@ -0,0 +1,74 @@
+# models/account_snapshot.py
+# python
+import time
+from collections import namedtuple
+
+Holding = namedtuple("Holding", ["code", "name", "qty", "avg_price", "current_price", "eval_amount", "pnl", "pnl_rate"])
+
+
+class AccountSnapshot:
+    """inquire-balance 한 번의 (연속)조회로 만든 계좌 스냅샷"""
+
+    def __init__(self, cash, holdings, summary, fetched_at=None):
+        """
+        :param cash: 예수금 총액
+        :param holdings: {종목코드: Holding}
+        :param summary: output2 요약 (평가금액, 평가손익 등)
+        """
+        self.cash = cash
+        self.holdings = holdings
+        self.summary = summary
+        self.fetched_at = time.monotonic() if fetched_at is None else fetched_at
+
+    @classmethod
+    def from_pages(cls, pages):
+        """
+        :param pages: inquire-balance 응답 JSON 리스트
+        """
+        holdings = {}
+        summary = {}
+        for page in pages:
+            for stock in page.get('output1', []):
+                qty = int(stock['hldg_qty'])
+                if qty <= 0:
+                    continue
+                holdings[stock['pdno']] = Holding(
+                    code=stock['pdno'],
+                    name=stock.get('prdt_name', ''),
+                    qty=qty,
+                    avg_price=float(stock['pchs_avg_pric']),
+                    current_price=int(stock['prpr']),
+                    eval_amount=int(stock['evlu_amt']),
+                    pnl=int(stock['evlu_pfls_amt']),
+                    pnl_rate=float(stock['evlu_pfls_rt']),
+                )
+            if page.get('output2'):
+                summary = page['output2'][0]
+        cash = int(summary.get('dnca_tot_amt', 0))
+        return cls(cash, holdings, summary)
+
+    @property
+    def quantities(self):
+        """{종목코드: 보유수량}"""
+        return {code: h.qty for code, h in self.holdings.items()}
+
+    @property
+    def avg_prices(self):
+        """{종목코드: 매입평균가}"""
+        return {code: h.avg_price for code, h in self.holdings.items()}
+
+    @property
+    def stock_eval_amount(self):
+        return int(self.summary.get('scts_evlu_amt', 0))
+
+    @property
+    def total_eval_amount(self):
+        return int(self.summary.get('tot_evlu_amt', 0))
+
+    @property
+    def pnl(self):
+        """평가손익 합계"""
+        return int(self.summary.get('evlu_pfls_smtl_amt', 0))
+
+    def age(self):
+        return time.monotonic() - self.fetched_at
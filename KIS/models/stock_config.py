@@ -14,6 +14,12 @@ class StockConfig:
             self.ACNT_PRDT_CD = self._cfg['ACNT_PRDT_CD']
             self.DISCORD_WEBHOOK_URL = self._cfg['DISCORD_WEBHOOK_URL']
             self.URL_BASE = self._cfg['URL_BASE']
+            self.WS_URL_BASE = self._cfg.get('WS_URL_BASE', 'ws://ops.koreainvestment.com:21000')
+            self.RATE_LIMIT_PER_SEC = self._cfg.get('RATE_LIMIT_PER_SEC', 18)
+            self.TOKEN_CACHE_PATH = self._cfg.get('TOKEN_CACHE_PATH', 'config/.token_cache.json')
+            self.DAILY_BAR_CACHE_PATH = self._cfg.get('DAILY_BAR_CACHE_PATH', 'config/.daily_bar_cache.json')
+            self.HISTORY_DIR = self._cfg.get('HISTORY_DIR', 'data/history')
+            self.ACCOUNT_SNAPSHOT_TTL = self._cfg.get('ACCOUNT_SNAPSHOT_TTL', 5)
             self.ACCESS_TOKEN = ""
         except FileNotFoundError:
             raise FileNotFoundError(f"Configuration file not found: {config_path}")
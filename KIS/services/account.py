@@ -1,26 +1,36 @@
+import threading
 import requests
-import json
+from models.account_snapshot import AccountSnapshot
 
 class AccountService:
-    def __init__(self, config, auth_service, notification_service):
+    def __init__(self, config, auth_service, notification_service, client):
         self.config = config
+        self.client = client
         self.auth_service = auth_service
         self.notification = notification_service
+        self.snapshot_ttl = config.ACCOUNT_SNAPSHOT_TTL
+        self._snapshot = None
+        self._lock = threading.Lock()
     
-    def get_balance(self):
+    def get_snapshot(self, max_age=None):
         """
-        계좌 잔고 조회
-        :return: 총 현금 잔고
+        계좌 스냅샷 조회 (TTL 이내면 기존 스냅샷 공유)
+        :param max_age: 허용할 스냅샷 나이 (초, 기본값 config.ACCOUNT_SNAPSHOT_TTL)
+        :return: AccountSnapshot
         """
+        max_age = self.snapshot_ttl if max_age is None else max_age
+        with self._lock:
+            if self._snapshot is None or self._snapshot.age() > max_age:
+                self._snapshot = self._fetch_snapshot()
+            return self._snapshot
+
+    def invalidate(self):
+        """주문 체결 등으로 잔고가 바뀐 경우 다음 조회 시 새로 받아오도록 표시"""
+        with self._lock:
+            self._snapshot = None
+
+    def _fetch_snapshot(self):
         PATH = "uapi/domestic-stock/v1/trading/inquire-balance"
-        URL = f"{self.config.URL_BASE}/{PATH}"
-        headers = {
-            "Content-Type": "application/json", 
-            "authorization": f"Bearer {self.config.ACCESS_TOKEN}",
-            "appKey": self.config.APP_KEY,
-            "appSecret": self.config.APP_SECRET,
-            "tr_id": "TTTC8434R"
-        }
         params = {
             "CANO": self.config.CANO,
             "ACNT_PRDT_CD": self.config.ACNT_PRDT_CD,
@@ -28,15 +38,20 @@ class AccountService:
             "OFL_YN": "",
             "INQR_DVSN": "02",
             "UNPR_DVSN": "01",
-            "FUND_STTL_DVSN_CD": "40",
-            "FNCG_AMT_AUTO_RDPT_YN": "N"
+            "FUND_STTL_ICLD_YN": "N",
+            "FNCG_AMT_AUTO_RDPT_YN": "N",
+            "PRCS_DVSN": "01"
         }
-        
+        pages = self.client.call_pages("TTTC8434R", PATH, params)
+        return AccountSnapshot.from_pages(pages)
+
+    def get_balance(self):
+        """
+        계좌 잔고 조회
+        :return: 총 현금 잔고
+        """
         try:
-            res = requests.get(URL, headers=headers, params=params)
-            res.raise_for_status()
-            output = res.json()['output1']
-            total_cash = int(output[0]['dnca_tot_amt'])
+            total_cash = self.get_snapshot().cash
             self.notification.send_message(f"현재 계좌 잔고: {total_cash}원")
             return total_cash
         except requests.exceptions.RequestException as e:
@@ -48,37 +63,10 @@ class AccountService:
         보유 주식 잔고 조회
         :return: 보유 주식 딕셔너리
         """
-        PATH = "uapi/domestic-stock/v1/trading/inquire-balance"
-        URL = f"{self.config.URL_BASE}/{PATH}"
-        headers = {
-            "Content-Type": "application/json", 
-            "authorization": f"Bearer {self.config.ACCESS_TOKEN}",
-            "appKey": self.config.APP_KEY,
-            "appSecret": self.config.APP_SECRET,
-            "tr_id": "TTTC8434R"
-        }
-        params = {
-            "CANO": self.config.CANO,
-            "ACNT_PRDT_CD": self.config.ACNT_PRDT_CD,
-            "AFHR_FLPR_YN": "N",
-            "OFL_YN": "",
-            "INQR_DVSN": "01",
-            "UNPR_DVSN": "01",
-            "FUND_STTL_DVSN_CD": "40",
-            "FNCG_AMT_AUTO_RDPT_YN": "N"
-        }
-        
         try:
-            res = requests.get(URL, headers=headers, params=params)
-            res.raise_for_status()
-            output = res.json()['output1']
-            stock_dict = {}
-            for stock in output:
-                if int(stock['bfdy_bltn_qty']) > 0:
-                    stock_dict[stock['pdno']] = int(stock['bfdy_bltn_qty'])
-            
+            stock_dict = self.get_snapshot().quantities
             self.notification.send_message(f"현재 보유 주식: {stock_dict}")
             return stock_dict
         except requests.exceptions.RequestException as e:
             self.notification.send_message(f"주식 잔고 조회 실패: {e}")
-            return {}
\ No newline at end of file
+            return {}
@@ -1,14 +1,53 @@
 # 4. services/authentication.py
 #python
+import hashlib
+import threading
+import time
 import requests
-import json
+from services.storage import atomic_write_json, read_json
 
 class AuthenticationService:
-    def __init__(self, config):
+    REFRESH_MARGIN = 600  # 만료 10분 전에 미리 재발급
+    RETRY_DELAY = 60  # 재발급 실패 시 재시도 간격 (초)
+
+    def __init__(self, config, client):
         self.config = config
+        self.client = client
+        self.cache_path = config.TOKEN_CACHE_PATH
+        self.expires_at = 0.0
+        self._lock = threading.Lock()
+        self._refresh_timer = None
     
-    def get_access_token(self):
-        """토큰 발급"""
+    def _cache_owner(self):
+        # 다른 앱키/서버(실전/모의)의 토큰을 재사용하지 않도록 식별자를 함께 저장
+        key = f"{self.config.APP_KEY}|{self.config.URL_BASE}"
+        return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+    def _load_cached_token(self):
+        cached = read_json(self.cache_path)
+        if not cached or cached.get("owner") != self._cache_owner():
+            return None
+        if cached.get("expires_at", 0) - self.REFRESH_MARGIN <= time.time():
+            return None
+        return cached
+
+    def get_access_token(self, force=False):
+        """
+        토큰 발급 (디스크 캐시 재사용)
+        :param force: True면 캐시를 무시하고 새로 발급
+        :return: 액세스 토큰
+        """
+        with self._lock:
+            cached = None if force else self._load_cached_token()
+            if cached:
+                self.config.ACCESS_TOKEN = cached["access_token"]
+                self.expires_at = cached["expires_at"]
+            else:
+                self._issue_token()
+            self._schedule_refresh()
+            return self.config.ACCESS_TOKEN
+
+    def _issue_token(self):
         headers = {"content-type": "application/json"}
         body = {
             "grant_type": "client_credentials",
@@ -16,20 +55,67 @@ class AuthenticationService:
             "appsecret": self.config.APP_SECRET
         }
         PATH = "oauth2/tokenP"
-        URL = f"{self.config.URL_BASE}/{PATH}"
         
         try:
-            res = requests.post(URL, headers=headers, data=json.dumps(body))
-            res.raise_for_status()
-            self.config.ACCESS_TOKEN = res.json()["access_token"]
-            return self.config.ACCESS_TOKEN
+            res = self.client.request("POST", PATH, headers=headers, body=body)
+            data = res.json()
         except requests.exceptions.RequestException as e:
             raise RuntimeError(f"Token acquisition failed: {e}")
+
+        self.config.ACCESS_TOKEN = data["access_token"]
+        self.expires_at = time.time() + int(data.get("expires_in", 86400))
+        try:
+            atomic_write_json(self.cache_path, {
+                "owner": self._cache_owner(),
+                "access_token": self.config.ACCESS_TOKEN,
+                "expires_at": self.expires_at,
+            })
+        except OSError as e:
+            # 캐시 저장 실패는 거래에 영향이 없으므로 무시
+            print(f"Token cache write failed: {e}")
+
+    def _schedule_refresh(self, delay=None):
+        if self._refresh_timer:
+            self._refresh_timer.cancel()
+        if delay is None:
+            delay = max(self.expires_at - self.REFRESH_MARGIN - time.time(), 0)
+        self._refresh_timer = threading.Timer(delay, self._refresh)
+        self._refresh_timer.daemon = True
+        self._refresh_timer.start()
+
+    def _refresh(self):
+        """만료 전 백그라운드 재발급"""
+        with self._lock:
+            try:
+                self._issue_token()
+                self._schedule_refresh()
+            except RuntimeError as e:
+                print(f"Token refresh failed, retrying: {e}")
+                self._schedule_refresh(self.RETRY_DELAY)
+
+    def close(self):
+        if self._refresh_timer:
+            self._refresh_timer.cancel()
     
+    def get_approval_key(self):
+        """실시간(웹소켓) 접속키 발급"""
+        headers = {"content-type": "application/json"}
+        body = {
+            "grant_type": "client_credentials",
+            "appkey": self.config.APP_KEY,
+            "secretkey": self.config.APP_SECRET
+        }
+        PATH = "oauth2/Approval"
+
+        try:
+            res = self.client.request("POST", PATH, headers=headers, body=body)
+            return res.json()["approval_key"]
+        except requests.exceptions.RequestException as e:
+            raise RuntimeError(f"Approval key acquisition failed: {e}")
+
     def hashkey(self, datas):
         """API 요청 암호화"""
         PATH = "uapi/hashkey"
-        URL = f"{self.config.URL_BASE}/{PATH}"
         headers = {
             'content-Type': 'application/json',
             'appKey': self.config.APP_KEY,
@@ -37,9 +123,7 @@ class AuthenticationService:
         }
         
         try:
-            res = requests.post(URL, headers=headers, data=json.dumps(datas))
-            res.raise_for_status()
+            res = self.client.request("POST", PATH, headers=headers, body=datas)
             return res.json()["HASH"]
         except requests.exceptions.RequestException as e:
             raise RuntimeError(f"Hashkey generation failed: {e}")
-#
\ No newline at end of file
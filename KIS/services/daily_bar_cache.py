@@ -0,0 +1,48 @@
+# services/daily_bar_cache.py
+# python
+import threading
+from services.storage import atomic_write_json, read_json
+
+
+class DailyBarCache:
+    """
+    (종목, 거래일)별 목표가 계산용 일봉 값 캐시
+    오늘 시가와 전일 고가/저가는 장 시작 후 바뀌지 않으므로 하루 한 번만 조회한다.
+    """
+
+    def __init__(self, path=None):
+        """
+        :param path: 디스크 스냅샷 경로 (None이면 메모리에만 보관)
+        """
+        self.path = path
+        self._bars = {}
+        # scan()의 작업 스레드들이 동시에 get/put 하므로 조회·갱신·저장을 하나의 잠금으로 묶는다
+        self._lock = threading.Lock()
+        if path:
+            self._bars = read_json(path) or {}
+
+    @staticmethod
+    def _key(code, trade_date):
+        return f"{code}:{trade_date}"
+
+    def get(self, code, trade_date):
+        """
+        :param code: 종목 코드
+        :param trade_date: 거래일 (YYYYMMDD)
+        :return: (오늘 시가, 전일 고가, 전일 저가) 또는 None
+        """
+        with self._lock:
+            bar = self._bars.get(self._key(code, trade_date))
+        return tuple(bar) if bar else None
+
+    def put(self, code, trade_date, today_open, yesterday_high, yesterday_low):
+        # 지난 거래일 항목은 스냅샷이 커지지 않도록 정리
+        suffix = f":{trade_date}"
+        with self._lock:
+            self._bars = {k: v for k, v in self._bars.items() if k.endswith(suffix)}
+            self._bars[self._key(code, trade_date)] = [today_open, yesterday_high, yesterday_low]
+            if self.path:
+                try:
+                    atomic_write_json(self.path, self._bars, mode=0o644)
+                except OSError as e:
+                    print(f"Daily bar cache write failed: {e}")
@@ -0,0 +1,232 @@
+# services/history_store.py
+# python
+import datetime
+import os
+import numpy as np
+import requests
+from services.storage import atomic_write_json, read_json
+
+# 컬럼별 원시 바이너리 파일 (np.memmap으로 복사 없이 읽는다)
+COLUMNS = (
+    ("ts", np.int64),       # 일봉: YYYYMMDD, 분봉: YYYYMMDDHHMM
+    ("open", np.float64),
+    ("high", np.float64),
+    ("low", np.float64),
+    ("close", np.float64),
+    ("volume", np.float64),
+)
+INTERVALS = ("D", "1m")
+
+
+class HistoryStore:
+    """종목별 일봉/분봉 컬럼 저장소"""
+
+    def __init__(self, root, client=None):
+        """
+        :param root: 저장 디렉터리
+        :param client: KisClient (백필 시에만 필요)
+        """
+        self.root = root
+        self.client = client
+
+    def _dir(self, code, interval):
+        if interval not in INTERVALS:
+            raise ValueError(f"Unsupported interval: {interval}")
+        return os.path.join(self.root, interval, code)
+
+    def _length(self, directory):
+        # 컬럼 파일 쓰기 도중 중단된 경우에도 모든 컬럼이 가진 행까지만 읽는다
+        lengths = []
+        for name, dtype in COLUMNS:
+            path = os.path.join(directory, f"{name}.bin")
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            lengths.append(size // np.dtype(dtype).itemsize)
+        return min(lengths)
+
+    def read(self, code, interval="D"):
+        """
+        저장된 시세 읽기 (읽기 전용 memmap, 복사 없음)
+        :return: {컬럼명: 배열}
+        """
+        directory = self._dir(code, interval)
+        n = self._length(directory)
+        if n == 0:
+            return {name: np.empty(0, dtype=dtype) for name, dtype in COLUMNS}
+        return {
+            name: np.memmap(os.path.join(directory, f"{name}.bin"), dtype=dtype, mode="r", shape=(n,))
+            for name, dtype in COLUMNS
+        }
+
+    def read_matrix(self, codes, interval="D"):
+        """
+        여러 종목을 같은 시간축으로 정렬한 백테스트용 행렬 (빈 칸은 NaN)
+        :return: (ts 배열, {컬럼명: 종목 x 시간 배열})
+        """
+        data = [self.read(code, interval) for code in codes]
+        ts = np.unique(np.concatenate([d["ts"] for d in data])) if data else np.empty(0, np.int64)
+        matrix = {name: np.full((len(codes), ts.size), np.nan) for name, _ in COLUMNS[1:]}
+        for row, d in enumerate(data):
+            cols = np.searchsorted(ts, d["ts"])
+            for name in matrix:
+                matrix[name][row, cols] = d[name]
+        return ts, matrix
+
+    def last_timestamp(self, code, interval="D"):
+        ts = self.read(code, interval)["ts"]
+        return int(ts[-1]) if ts.size else None
+
+    def append(self, code, interval, bars):
+        """
+        새 봉만 이어 붙이기
+        :param bars: {컬럼명: 배열} (ts 오름차순이 아니어도 됨)
+        :return: 추가된 봉 개수
+        """
+        ts = np.asarray(bars["ts"], dtype=np.int64)
+        _, order = np.unique(ts, return_index=True)  # 정렬 + 페이지 경계 중복 제거
+        last = self.last_timestamp(code, interval)
+        if last is not None:
+            order = order[ts[order] > last]
+        if order.size == 0:
+            return 0
+
+        directory = self._dir(code, interval)
+        os.makedirs(directory, exist_ok=True)
+        # 이전 append가 중단되어 일부 컬럼에만 남은 행(과 쓰다 만 바이트)을 먼저 잘라낸다.
+        # 그대로 이어 쓰면 그 행들이 새 ts와 어긋나게 짝지어진다.
+        n = self._length(directory)
+        for name, dtype in COLUMNS:
+            path = os.path.join(directory, f"{name}.bin")
+            size = n * np.dtype(dtype).itemsize
+            if os.path.exists(path) and os.path.getsize(path) != size:
+                os.truncate(path, size)
+        # ts 컬럼을 마지막에 써서 중단 시 불완전한 행이 보이지 않도록 한다
+        for name, dtype in COLUMNS[1:] + COLUMNS[:1]:
+            values = np.asarray(bars[name], dtype=dtype)[order]
+            with open(os.path.join(directory, f"{name}.bin"), "ab") as f:
+                f.write(values.astype(np.dtype(dtype).newbyteorder("<"), copy=False).tobytes())
+        return int(order.size)
+
+    def _mark_updated(self, code, interval):
+        atomic_write_json(os.path.join(self._dir(code, interval), "meta.json"),
+                          {"updated": datetime.date.today().strftime("%Y%m%d")}, mode=0o644)
+
+    def is_fresh(self, code, interval="D"):
+        """오늘 백필이 끝난 종목인지 여부 (전 거래일 봉까지 저장되어 있음)"""
+        meta = read_json(os.path.join(self._dir(code, interval), "meta.json"))
+        return bool(meta) and meta.get("updated") == datetime.date.today().strftime("%Y%m%d")
+
+    def previous_bar(self, code, before):
+        """
+        before(YYYYMMDD) 이전 마지막 일봉
+        :return: {컬럼명: 값} 또는 None
+        """
+        data = self.read(code, "D")
+        idx = int(np.searchsorted(data["ts"], int(before))) - 1
+        if idx < 0:
+            return None
+        return {name: data[name][idx].item() for name, _ in COLUMNS}
+
+    def backfill_daily(self, code, start="20000101"):
+        """
+        일봉 백필 (inquire-daily-itemchartprice, 요청당 최대 100봉을 과거 방향으로 페이지 조회)
+        완성된 봉(어제까지)만 저장하고 이미 저장된 날짜 이후만 받아온다.
+        :param start: 처음 백필 시 시작일 (YYYYMMDD)
+        :return: 추가된 봉 개수
+        """
+        PATH = "uapi/domestic-stock/v1/quotations/inquire-daily-itemchartprice"
+        today = datetime.date.today()
+        last = self.last_timestamp(code, "D")
+        if last is not None:
+            start = (datetime.datetime.strptime(str(last), "%Y%m%d") + datetime.timedelta(days=1)).strftime("%Y%m%d")
+        end = (today - datetime.timedelta(days=1)).strftime("%Y%m%d")
+
+        rows = []
+        while end >= start:
+            params = {
+                "FID_COND_MRKT_DIV_CODE": "J",
+                "FID_INPUT_ISCD": code,
+                "FID_INPUT_DATE_1": start,
+                "FID_INPUT_DATE_2": end,
+                "FID_PERIOD_DIV_CODE": "D",
+                "FID_ORG_ADJ_PRC": "0",
+            }
+            try:
+                output = self.client.call("FHKST03010100", PATH, params=params).get("output2") or []
+            except requests.exceptions.RequestException as e:
+                raise RuntimeError(f"Daily history backfill failed: {e}")
+            output = [bar for bar in output if bar.get("stck_bsop_date")]
+            if not output:
+                break
+            rows.extend(output)
+            oldest = min(bar["stck_bsop_date"] for bar in output)
+            end = (datetime.datetime.strptime(oldest, "%Y%m%d") - datetime.timedelta(days=1)).strftime("%Y%m%d")
+
+        added = self.append(code, "D", {
+            "ts": [int(bar["stck_bsop_date"]) for bar in rows],
+            "open": [float(bar["stck_oprc"]) for bar in rows],
+            "high": [float(bar["stck_hgpr"]) for bar in rows],
+            "low": [float(bar["stck_lwpr"]) for bar in rows],
+            "close": [float(bar["stck_clpr"]) for bar in rows],
+            "volume": [float(bar["acml_vol"]) for bar in rows],
+        })
+        self._mark_updated(code, "D")
+        return added
+
+    def backfill_minute(self, code):
+        """
+        당일 1분봉 백필 (inquire-time-itemchartprice, 요청당 30봉을 과거 방향으로 페이지 조회)
+        진행 중인 현재 분 봉은 저장하지 않는다.
+        :return: 추가된 봉 개수
+        """
+        PATH = "uapi/domestic-stock/v1/quotations/inquire-time-itemchartprice"
+        now = datetime.datetime.now()
+        today = now.strftime("%Y%m%d")
+        current_minute = int(now.strftime("%Y%m%d%H%M"))
+        last = self.last_timestamp(code, "1m") or 0
+        hour = now.strftime("%H%M%S")
+
+        rows = []
+        while hour >= "090000":
+            params = {
+                "FID_ETC_CLS_CODE": "",
+                "FID_COND_MRKT_DIV_CODE": "J",
+                "FID_INPUT_ISCD": code,
+                "FID_INPUT_HOUR_1": hour,
+                "FID_PW_DATA_INCU_YN": "N",
+            }
+            try:
+                output = self.client.call("FHKST03010200", PATH, params=params).get("output2") or []
+            except requests.exceptions.RequestException as e:
+                raise RuntimeError(f"Minute history backfill failed: {e}")
+            output = [bar for bar in output if bar.get("stck_bsop_date") == today]
+            if not output:
+                break
+            rows.extend(output)
+            oldest = min(bar["stck_cntg_hour"] for bar in output)
+            if int(today + oldest[:4]) <= last:
+                break
+            hour = (datetime.datetime.strptime(oldest, "%H%M%S") - datetime.timedelta(minutes=1)).strftime("%H%M%S")
+
+        ts = [int(bar["stck_bsop_date"] + bar["stck_cntg_hour"][:4]) for bar in rows]
+        keep = [i for i, t in enumerate(ts) if t < current_minute]
+        return self.append(code, "1m", {
+            "ts": [ts[i] for i in keep],
+            "open": [float(rows[i]["stck_oprc"]) for i in keep],
+            "high": [float(rows[i]["stck_hgpr"]) for i in keep],
+            "low": [float(rows[i]["stck_lwpr"]) for i in keep],
+            "close": [float(rows[i]["stck_prpr"]) for i in keep],
+            "volume": [float(rows[i]["cntg_vol"]) for i in keep],
+        })
+
+    def backfill(self, codes, minute=False):
+        """
+        여러 종목 백필 (장 시작 전 실행)
+        :param minute: 당일 1분봉도 받을지 여부
+        :return: {종목코드: 추가된 일봉 개수}
+        """
+        added = {}
+        for code in codes:
+            added[code] = self.backfill_daily(code)
+            if minute:
+                self.backfill_minute(code)
+        return added
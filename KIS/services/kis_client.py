@@ -0,0 +1,114 @@
+# services/kis_client.py
+# python
+import json
+import requests
+from requests.adapters import HTTPAdapter
+from services.rate_limiter import RateLimiter
+
+
+class KisClient:
+    """KIS Open API 공용 HTTP 클라이언트 (keep-alive 커넥션 풀 + 공통 헤더)"""
+
+    DEFAULT_TIMEOUT = (3.05, 10)  # (connect, read) 초
+    POOL_SIZE = 10
+    # 시세 조회보다 먼저 처리할 주문 엔드포인트
+    ORDER_PATHS = (
+        "uapi/domestic-stock/v1/trading/order-cash",
+        "uapi/overseas-stock/v1/trading/order",
+    )
+
+    def __init__(self, config, timeout=None, pool_size=None, limiter=None):
+        self.config = config
+        self.timeout = timeout or self.DEFAULT_TIMEOUT
+        self.limiter = limiter or RateLimiter(config.RATE_LIMIT_PER_SEC)
+
+        self.pool_size = pool_size or self.POOL_SIZE
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        # 요청마다 바뀌지 않는 헤더는 한 번만 만들어 둔다
+        self._base_headers = {
+            "Content-Type": "application/json",
+            "appKey": self.config.APP_KEY,
+            "appSecret": self.config.APP_SECRET,
+            "custtype": "P",
+        }
+        self._token = None
+        self._auth_headers = dict(self._base_headers)
+
+    def _headers(self, tr_id, extra=None):
+        # 토큰이 바뀐 경우에만 authorization 헤더를 다시 만든다
+        if self._token != self.config.ACCESS_TOKEN:
+            self._token = self.config.ACCESS_TOKEN
+            self._auth_headers = dict(self._base_headers)
+            self._auth_headers["authorization"] = f"Bearer {self._token}"
+
+        headers = dict(self._auth_headers)
+        if tr_id:
+            headers["tr_id"] = tr_id
+        if extra:
+            headers.update(extra)
+        return headers
+
+    def url(self, path):
+        return f"{self.config.URL_BASE}/{path}"
+
+    def request(self, method, path, headers=None, params=None, body=None):
+        """
+        헤더를 그대로 지정하는 저수준 요청 (토큰/해시키 발급 등)
+        :return: requests.Response
+        """
+        self.limiter.acquire(priority=path in self.ORDER_PATHS)
+        res = self.session.request(
+            method,
+            self.url(path),
+            headers=headers,
+            params=params,
+            data=json.dumps(body) if body is not None else None,
+            timeout=self.timeout,
+        )
+        res.raise_for_status()
+        return res
+
+    def call(self, tr_id, path, params=None, body=None, headers=None):
+        """
+        KIS API 호출
+        :param tr_id: 거래 ID
+        :param path: API 경로 (예: uapi/domestic-stock/v1/quotations/inquire-price)
+        :param params: GET 쿼리 파라미터
+        :param body: POST 본문 (지정하면 POST로 전송)
+        :param headers: 추가 헤더 (hashkey 등)
+        :return: 응답 JSON
+        """
+        method = "POST" if body is not None else "GET"
+        res = self.request(method, path, headers=self._headers(tr_id, headers),
+                           params=params, body=body)
+        return res.json()
+
+    def call_pages(self, tr_id, path, params, ctx_keys=("CTX_AREA_FK100", "CTX_AREA_NK100"), max_pages=50):
+        """
+        연속 조회 (tr_cont / CTX_AREA 키를 따라 페이지 단위로 응답을 넘겨준다)
+        :param ctx_keys: (연속조회검색조건 키, 연속조회키 키)
+        :param max_pages: 최대 페이지 수
+        :return: 페이지별 응답 JSON 제너레이터
+        """
+        params = dict(params)
+        fk_key, nk_key = ctx_keys
+        params.setdefault(fk_key, "")
+        params.setdefault(nk_key, "")
+        tr_cont = ""
+        for _ in range(max_pages):
+            res = self.request("GET", path, headers=self._headers(tr_id, {"tr_cont": tr_cont}), params=params)
+            data = res.json()
+            yield data
+            # 응답 헤더 tr_cont가 F/M이면 다음 페이지가 있다
+            if res.headers.get("tr_cont") not in ("F", "M"):
+                break
+            params[fk_key] = data.get(fk_key.lower(), "").strip()
+            params[nk_key] = data.get(nk_key.lower(), "").strip()
+            tr_cont = "N"
+
+    def close(self):
+        self.session.close()
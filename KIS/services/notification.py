@@ -1,19 +1,120 @@
 # 3. services/notification.py
 #python
-import requests
 import datetime
+import queue
+import threading
+import time
+import requests
 
 class NotificationService:
-    def __init__(self, webhook_url):
+    MAX_CONTENT_LENGTH = 2000  # Discord 메시지 최대 길이
+
+    def __init__(self, webhook_url, interval=1.0, max_queue=1000):
+        """
+        :param webhook_url: Discord 웹훅 주소
+        :param interval: 묶어서 전송할 주기 (초)
+        :param max_queue: 대기열 최대 길이 (넘치면 가장 오래된 메시지부터 버린다)
+        """
         self.webhook_url = webhook_url
+        self.interval = interval
+        self.session = requests.Session()
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._dropped = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._worker = threading.Thread(target=self._run, name="discord-notifier", daemon=True)
+        self._worker.start()
     
     def send_message(self, msg):
-        """Discord 메시지 전송"""
+        """Discord 메시지 전송 (대기열에 넣고 바로 반환)"""
         now = datetime.datetime.now()
-        message = {"content": f"[{now.strftime('%Y-%m-%d %H:%M:%S')}] {str(msg)}"}
-        try:
-            response = requests.post(self.webhook_url, data=message)
-            response.raise_for_status()
-            print(message)
-        except requests.exceptions.RequestException as e:
-            print(f"Notification failed: {e}")
\ No newline at end of file
+        content = f"[{now.strftime('%Y-%m-%d %H:%M:%S')}] {str(msg)}"
+        print({"content": content})
+        with self._lock:
+            while True:
+                try:
+                    self._queue.put_nowait(content)
+                    return
+                except queue.Full:
+                    try:
+                        self._queue.get_nowait()
+                        self._queue.task_done()
+                        self._dropped += 1
+                    except queue.Empty:
+                        pass
+
+    def _drain(self, first):
+        """
+        대기열에 쌓인 메시지를 한 번에 꺼낸다
+        :return: (전송할 줄 리스트, 대기열에서 꺼낸 개수)
+        """
+        lines = [first]
+        while True:
+            try:
+                lines.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        taken = len(lines)
+        with self._lock:
+            dropped, self._dropped = self._dropped, 0
+        if dropped:
+            lines.insert(0, f"(대기열 초과로 메시지 {dropped}건 생략)")
+        return lines, taken
+
+    def _chunks(self, lines):
+        """여러 메시지를 Discord 길이 제한 안에서 최소 개수의 본문으로 합친다"""
+        chunk = ""
+        for line in lines:
+            line = line[:self.MAX_CONTENT_LENGTH]
+            if chunk and len(chunk) + 1 + len(line) > self.MAX_CONTENT_LENGTH:
+                yield chunk
+                chunk = ""
+            chunk = f"{chunk}\n{line}" if chunk else line
+        if chunk:
+            yield chunk
+
+    def _post(self, content, max_attempts=5):
+        for _ in range(max_attempts):
+            try:
+                response = self.session.post(self.webhook_url, json={"content": content}, timeout=10)
+                if response.status_code == 429:
+                    # Discord 속도 제한: retry_after(초) 만큼 기다린 후 재시도
+                    try:
+                        retry_after = float(response.json().get("retry_after", 1))
+                    except ValueError:
+                        retry_after = float(response.headers.get("Retry-After", 1))
+                    time.sleep(retry_after)
+                    continue
+                response.raise_for_status()
+            except requests.exceptions.RequestException as e:
+                print(f"Notification failed: {e}")
+            return
+
+    def _run(self):
+        while not (self._stop.is_set() and self._queue.empty()):
+            try:
+                first = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            started = time.monotonic()
+            lines, taken = self._drain(first)
+            for content in self._chunks(lines):
+                self._post(content)
+            for _ in range(taken):
+                self._queue.task_done()
+            # 다음 묶음까지 interval 동안 메시지를 모은다
+            remaining = self.interval - (time.monotonic() - started)
+            if remaining > 0 and not self._stop.is_set():
+                self._stop.wait(remaining)
+
+    def flush(self, timeout=5.0):
+        """대기 중인 메시지가 모두 전송될 때까지 최대 timeout초 대기"""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+    def close(self, timeout=5.0):
+        """남은 메시지를 전송하고 워커 종료"""
+        self.flush(timeout)
+        self._stop.set()
+        self._worker.join(timeout)
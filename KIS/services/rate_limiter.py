@@ -0,0 +1,77 @@
+# services/rate_limiter.py
+# python
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    토큰 버킷 방식의 API 호출 제한기
+    주문(우선순위) 요청이 대기 중이면 시세 조회 요청보다 먼저 토큰을 받는다.
+    """
+
+    LANES = ("normal", "priority")
+
+    def __init__(self, rate, capacity=None):
+        """
+        :param rate: 초당 허용 요청 수
+        :param capacity: 버킷 크기 (순간 최대 요청 수, 기본값 rate)
+        """
+        self.rate = float(rate)
+        self.capacity = float(capacity or rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._cond = threading.Condition()
+        self._priority_waiting = 0
+        self._metrics = {lane: {"count": 0, "total_wait": 0.0, "max_wait": 0.0} for lane in self.LANES}
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, priority=False):
+        """
+        토큰 1개를 받을 때까지 대기
+        :param priority: 주문 요청 여부
+        :return: 대기 시간 (초)
+        """
+        start = time.monotonic()
+        with self._cond:
+            if priority:
+                self._priority_waiting += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    # 우선순위 요청이 기다리는 동안 일반 요청은 토큰을 가져가지 않는다
+                    if self._tokens >= 1 and (priority or not self._priority_waiting):
+                        self._tokens -= 1
+                        break
+                    wait = max((1 - self._tokens) / self.rate, 0.001)
+                    self._cond.wait(wait)
+            finally:
+                if priority:
+                    self._priority_waiting -= 1
+                    self._cond.notify_all()
+
+            waited = time.monotonic() - start
+            m = self._metrics["priority" if priority else "normal"]
+            m["count"] += 1
+            m["total_wait"] += waited
+            m["max_wait"] = max(m["max_wait"], waited)
+        return waited
+
+    def stats(self):
+        """
+        대기 시간 통계
+        :return: {lane: {"count", "avg_wait", "max_wait"}}
+        """
+        with self._cond:
+            return {
+                lane: {
+                    "count": m["count"],
+                    "avg_wait": m["total_wait"] / m["count"] if m["count"] else 0.0,
+                    "max_wait": m["max_wait"],
+                }
+                for lane, m in self._metrics.items()
+            }
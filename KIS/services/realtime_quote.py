@@ -0,0 +1,162 @@
+# services/realtime_quote.py
+# python
+import asyncio
+import json
+import time
+from collections import namedtuple
+import websockets
+
+# 실시간 체결가 레코드 (H0STCNT0 필드 중 매매 판단에 필요한 값만 보관)
+Tick = namedtuple("Tick", ["code", "time", "price", "open", "high", "low", "volume", "acc_volume", "received_at"])
+
+TR_ID_TRADE = "H0STCNT0"  # 국내주식 실시간체결가
+TRADE_FIELD_COUNT = 46
+
+
+def parse_frame(frame, received_at=None):
+    """
+    실시간 데이터 프레임 파싱
+    형식: "암호화여부|TR_ID|레코드수|필드^필드^..."
+    :param frame: 웹소켓 텍스트 프레임
+    :param received_at: 수신 시각 (time.monotonic 기준, 기본값 현재)
+    :return: Tick 리스트 (체결가 프레임이 아니면 빈 리스트)
+    """
+    parts = frame.split("|", 3)
+    if len(parts) != 4 or parts[1] != TR_ID_TRADE:
+        return []
+    received_at = time.monotonic() if received_at is None else received_at
+    fields = parts[3].split("^")
+    ticks = []
+    for i in range(int(parts[2])):
+        rec = fields[i * TRADE_FIELD_COUNT:(i + 1) * TRADE_FIELD_COUNT]
+        if len(rec) < 14:
+            break
+        ticks.append(Tick(
+            code=rec[0],
+            time=rec[1],
+            price=int(rec[2]),
+            open=int(rec[7]),
+            high=int(rec[8]),
+            low=int(rec[9]),
+            volume=int(rec[12]),
+            acc_volume=int(rec[13]),
+            received_at=received_at,
+        ))
+    return ticks
+
+
+class RealtimeQuoteService:
+    """KIS 실시간 체결가 웹소켓 구독 서비스"""
+
+    MAX_SUBSCRIPTIONS = 41  # 세션당 실시간 등록 가능 종목 수
+    RECONNECT_DELAY = 1
+    MAX_RECONNECT_DELAY = 30
+
+    def __init__(self, config, auth_service, on_tick, url=None, approval_key=None):
+        """
+        :param on_tick: 체결 수신 시 호출할 콜백 (Tick 인자)
+        :param url: 웹소켓 주소 (기본값 config.WS_URL_BASE, 테스트 시 로컬 서버 지정)
+        :param approval_key: 실시간 접속키 (없으면 auth_service로 발급)
+        """
+        self.config = config
+        self.auth_service = auth_service
+        self.on_tick = on_tick
+        self.url = url or config.WS_URL_BASE
+        self.approval_key = approval_key
+        self.codes = set()
+        self._ws = None
+        self._running = False
+
+    def _request(self, code, tr_type):
+        return json.dumps({
+            "header": {
+                "approval_key": self.approval_key,
+                "custtype": "P",
+                "tr_type": tr_type,  # 1: 등록, 2: 해제
+                "content-type": "utf-8",
+            },
+            "body": {"input": {"tr_id": TR_ID_TRADE, "tr_key": code}},
+        })
+
+    async def subscribe(self, code):
+        """
+        종목 실시간 체결가 등록
+        :param code: 종목 코드
+        """
+        if code in self.codes:
+            return
+        if len(self.codes) >= self.MAX_SUBSCRIPTIONS:
+            raise ValueError(f"Realtime subscription limit reached ({self.MAX_SUBSCRIPTIONS})")
+        self.codes.add(code)
+        if self._ws is not None:
+            await self._ws.send(self._request(code, "1"))
+
+    async def unsubscribe(self, code):
+        """
+        종목 실시간 체결가 해제
+        :param code: 종목 코드
+        """
+        if code not in self.codes:
+            return
+        self.codes.discard(code)
+        if self._ws is not None:
+            await self._ws.send(self._request(code, "2"))
+
+    async def _handle(self, ws, frame):
+        if frame[0] in "01":
+            try:
+                ticks = parse_frame(frame)
+            except (ValueError, IndexError) as e:
+                print(f"Malformed realtime frame skipped: {e}")
+                return
+            for tick in ticks:
+                # 콜백 오류(주문 REST 호출 실패 등)가 수신 루프를 멈추지 않도록 체결 단위로 격리
+                try:
+                    self.on_tick(tick)
+                except Exception as e:
+                    print(f"Realtime tick handler failed for {tick.code}: {e}")
+            return
+
+        try:
+            message = json.loads(frame)
+        except ValueError as e:
+            print(f"Malformed realtime message skipped: {e}")
+            return
+        tr_id = message.get("header", {}).get("tr_id")
+        if tr_id == "PINGPONG":
+            await ws.send(frame)
+        elif message.get("body", {}).get("rt_cd") not in (None, "0"):
+            print(f"Realtime subscription error: {message['body'].get('msg1')}")
+
+    async def run(self):
+        """웹소켓 접속 및 수신 루프 (끊기면 재접속 후 재등록)"""
+        self._running = True
+        delay = self.RECONNECT_DELAY
+        while self._running:
+            try:
+                if self.approval_key is None:
+                    self.approval_key = await asyncio.to_thread(self.auth_service.get_approval_key)
+                async with websockets.connect(self.url, ping_interval=None) as ws:
+                    self._ws = ws
+                    for code in list(self.codes):
+                        await ws.send(self._request(code, "1"))
+                    delay = self.RECONNECT_DELAY
+                    async for frame in ws:
+                        await self._handle(ws, frame)
+            except websockets.InvalidHandshake as e:
+                # 접속키가 만료/거부되었을 수 있으므로 다음 접속 때 다시 발급
+                print(f"Realtime handshake rejected: {e}")
+                self.approval_key = None
+            except Exception as e:
+                # 접속키 발급 실패 등 어떤 오류든 재접속으로 처리 (수신 스레드가 조용히 죽지 않도록)
+                print(f"Realtime connection lost: {e}")
+            finally:
+                self._ws = None
+            if self._running:
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.MAX_RECONNECT_DELAY)
+
+    async def stop(self):
+        self._running = False
+        if self._ws is not None:
+            await self._ws.close()
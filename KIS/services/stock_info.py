@@ -1,49 +1,56 @@
 # 5. services/stock_info.py
 # python
 
+import asyncio
+import datetime
 import requests
+from services.daily_bar_cache import DailyBarCache
 from strategies.volatility_breakout import VolatilityBreakoutStrategy
 
 class StockInfoService:
-    def __init__(self, config, auth_service):
+    def __init__(self, config, auth_service, client, history_store=None):
         self.config = config
         self.auth_service = auth_service
+        self.client = client
+        self.history_store = history_store
         self.strategy = VolatilityBreakoutStrategy()
+        self.bar_cache = DailyBarCache(config.DAILY_BAR_CACHE_PATH)
+        # 동시에 진행할 요청 수 (전달받은 클라이언트의 커넥션 풀 크기를 넘지 않도록)
+        self.max_concurrency = client.pool_size
     
     def get_current_price(self, code="005930"):
         """현재가 조회"""
         PATH = "uapi/domestic-stock/v1/quotations/inquire-price"
-        URL = f"{self.config.URL_BASE}/{PATH}"
-        headers = {
-            "Content-Type": "application/json", 
-            "authorization": f"Bearer {self.config.ACCESS_TOKEN}",
-            "appKey": self.config.APP_KEY,
-            "appSecret": self.config.APP_SECRET,
-            "tr_id": "FHKST01010100"
-        }
         params = {
             "fid_cond_mrkt_div_code": "J",
             "fid_input_iscd": code,
         }
         
         try:
-            res = requests.get(URL, headers=headers, params=params)
-            res.raise_for_status()
-            return int(res.json()['output']['stck_prpr'])
+            data = self.client.call("FHKST01010100", PATH, params=params)
+            return int(data['output']['stck_prpr'])
         except requests.exceptions.RequestException as e:
             raise RuntimeError(f"Current price retrieval failed: {e}")
 
     def get_target_price(self, code="005930"):
-        """변동성 돌파 전략 목표가 계산"""
+        """변동성 돌파 전략 목표가 계산 (거래일별 일봉 캐시 사용)"""
+        today = datetime.date.today().strftime("%Y%m%d")
+        bar = self.bar_cache.get(code, today)
+        if bar is None:
+            bar = self._fetch_daily_bar(code, today)
+        return self.strategy.calculate_target_price(*bar)
+
+    def _fetch_daily_bar(self, code, today):
+        """
+        일봉 조회 (오늘 백필된 로컬 저장소가 있으면 전일 봉은 저장소에서 읽는다)
+        :return: (오늘 시가, 전일 고가, 전일 저가)
+        """
+        if self.history_store is not None and self.history_store.is_fresh(code):
+            prev = self.history_store.previous_bar(code, today)
+            if prev is not None:
+                return self._fetch_today_open(code, today, prev)
+
         PATH = "uapi/domestic-stock/v1/quotations/inquire-daily-price"
-        URL = f"{self.config.URL_BASE}/{PATH}"
-        headers = {
-            "Content-Type": "application/json", 
-            "authorization": f"Bearer {self.config.ACCESS_TOKEN}",
-            "appKey": self.config.APP_KEY,
-            "appSecret": self.config.APP_SECRET,
-            "tr_id": "FHKST01010400"
-        }
         params = {
             "fid_cond_mrkt_div_code": "J",
             "fid_input_iscd": code,
@@ -52,15 +59,66 @@ class StockInfoService:
         }
         
         try:
-            res = requests.get(URL, headers=headers, params=params)
-            res.raise_for_status()
-            data = res.json()['output']
-            
-            stck_oprc = int(data[0]['stck_oprc'])  # 오늘 시가
-            stck_hgpr = int(data[1]['stck_hgpr'])  # 전일 고가
-            stck_lwpr = int(data[1]['stck_lwpr'])  # 전일 저가
-            
-            return self.strategy.calculate_target_price(stck_oprc, stck_hgpr, stck_lwpr)
+            data = self.client.call("FHKST01010400", PATH, params=params)['output']
+        except requests.exceptions.RequestException as e:
+            raise RuntimeError(f"Target price calculation failed: {e}")
+
+        stck_oprc = int(data[0]['stck_oprc'])  # 오늘 시가
+        stck_hgpr = int(data[1]['stck_hgpr'])  # 전일 고가
+        stck_lwpr = int(data[1]['stck_lwpr'])  # 전일 저가
+
+        # 오늘 일봉이 생긴 뒤(장 시작 후)에만 캐시한다
+        if data[0].get('stck_bsop_date') == today:
+            self.bar_cache.put(code, today, stck_oprc, stck_hgpr, stck_lwpr)
+        return stck_oprc, stck_hgpr, stck_lwpr
+
+    def _fetch_today_open(self, code, today, prev):
+        PATH = "uapi/domestic-stock/v1/quotations/inquire-price"
+        params = {
+            "fid_cond_mrkt_div_code": "J",
+            "fid_input_iscd": code,
+        }
+
+        try:
+            output = self.client.call("FHKST01010100", PATH, params=params)['output']
         except requests.exceptions.RequestException as e:
             raise RuntimeError(f"Target price calculation failed: {e}")
-#
\ No newline at end of file
+
+        stck_oprc = int(output['stck_oprc'])  # 오늘 시가 (장 시작 전에는 0)
+        bar = (stck_oprc, int(prev['high']), int(prev['low']))
+        if stck_oprc > 0:
+            self.bar_cache.put(code, today, *bar)
+        return bar
+
+    async def get_current_price_async(self, code="005930"):
+        """현재가 조회 (비동기)"""
+        return await asyncio.to_thread(self.get_current_price, code)
+
+    async def get_target_price_async(self, code="005930"):
+        """변동성 돌파 전략 목표가 계산 (비동기)"""
+        return await asyncio.to_thread(self.get_target_price, code)
+
+    async def scan(self, symbols):
+        """
+        여러 종목의 목표가/현재가를 동시에 조회
+        요청 속도는 KisClient의 RateLimiter가 제한한다.
+        :param symbols: 종목 코드 리스트
+        :return: {종목코드: {"target_price": ..., "current_price": ...}} (조회 실패 종목 제외)
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def fetch(code):
+            async with semaphore:
+                target_price = await self.get_target_price_async(code)
+            async with semaphore:
+                current_price = await self.get_current_price_async(code)
+            return {"target_price": target_price, "current_price": current_price}
+
+        results = await asyncio.gather(*(fetch(code) for code in symbols), return_exceptions=True)
+        snapshot = {}
+        for code, result in zip(symbols, results):
+            if isinstance(result, Exception):
+                print(f"Scan failed for {code}: {result}")
+                continue
+            snapshot[code] = result
+        return snapshot
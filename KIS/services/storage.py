@@ -0,0 +1,40 @@
+# services/storage.py
+# python
+import json
+import os
+import tempfile
+
+
+def atomic_write_json(path, data, mode=0o600):
+    """
+    JSON 파일 원자적 저장 (임시 파일에 쓴 뒤 교체)
+    :param path: 저장 경로
+    :param data: 저장할 객체
+    :param mode: 파일 권한 (기본값 소유자 읽기/쓰기만 허용)
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".json")
+    try:
+        os.chmod(tmp_path, mode)
+        with os.fdopen(fd, "w", encoding="UTF-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def read_json(path):
+    """
+    JSON 파일 읽기
+    :return: 파일 내용 또는 파일이 없거나 손상된 경우 None
+    """
+    try:
+        with open(path, encoding="UTF-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
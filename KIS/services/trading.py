@@ -1,9 +1,9 @@
 import requests
-import json
 
 class TradingService:
-    def __init__(self, config, auth_service, notification_service):
+    def __init__(self, config, auth_service, notification_service, client):
         self.config = config
+        self.client = client
         self.auth_service = auth_service
         self.notification = notification_service
     
@@ -13,17 +13,9 @@ class TradingService:
         :param symbol: 종목 코드
         :param quantity: 매수 수량
         :param price: 매수 가격
+        :return: 주문 성공 여부
         """
         PATH = "uapi/domestic-stock/v1/trading/order-cash"
-        URL = f"{self.config.URL_BASE}/{PATH}"
-        headers = {
-            "Content-Type": "application/json", 
-            "authorization": f"Bearer {self.config.ACCESS_TOKEN}",
-            "appKey": self.config.APP_KEY,
-            "appSecret": self.config.APP_SECRET,
-            "tr_id": "TTTC0802U",
-            "custtype": "P"
-        }
         body = {
             "CANO": self.config.CANO,
             "ACNT_PRDT_CD": self.config.ACNT_PRDT_CD,
@@ -34,28 +26,21 @@ class TradingService:
         }
         
         try:
-            res = requests.post(URL, headers=headers, data=json.dumps(body))
-            res.raise_for_status()
+            self.client.call("TTTC0802U", PATH, body=body)
             self.notification.send_message(f"[매수] {symbol}: {quantity}주, {price}원")
+            return True
         except requests.exceptions.RequestException as e:
             self.notification.send_message(f"매수 주문 실패: {e}")
+            return False
     
     def sell_stock(self, symbol, quantity):
         """
         주식 매도 함수
         :param symbol: 종목 코드
         :param quantity: 매도 수량
+        :return: 주문 성공 여부
         """
         PATH = "uapi/domestic-stock/v1/trading/order-cash"
-        URL = f"{self.config.URL_BASE}/{PATH}"
-        headers = {
-            "Content-Type": "application/json", 
-            "authorization": f"Bearer {self.config.ACCESS_TOKEN}",
-            "appKey": self.config.APP_KEY,
-            "appSecret": self.config.APP_SECRET,
-            "tr_id": "TTTC0801U",
-            "custtype": "P"
-        }
         body = {
             "CANO": self.config.CANO,
             "ACNT_PRDT_CD": self.config.ACNT_PRDT_CD,
@@ -65,8 +50,9 @@ class TradingService:
         }
         
         try:
-            res = requests.post(URL, headers=headers, data=json.dumps(body))
-            res.raise_for_status()
+            self.client.call("TTTC0801U", PATH, body=body)
             self.notification.send_message(f"[매도] {symbol}: {quantity}주")
+            return True
         except requests.exceptions.RequestException as e:
-            self.notification.send_message(f"매도 주문 실패: {e}")
\ No newline at end of file
+            self.notification.send_message(f"매도 주문 실패: {e}")
+            return False
\ No newline at end of file
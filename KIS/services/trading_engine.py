@@ -0,0 +1,116 @@
+# services/trading_engine.py
+# python
+import datetime
+import heapq
+import itertools
+import queue
+import time
+
+# 장 운영 구간 (국내 정규장 기준)
+PHASE_PRE_MARKET = "pre_market"   # ~ 09:00
+PHASE_LIQUIDATE = "liquidate"     # 09:00 ~ 09:05 : 전일 잔여 수량 매도
+PHASE_BUY = "buy"                 # 09:05 ~ 15:15 : 돌파 매수
+PHASE_SELL = "sell"               # 15:15 ~ 15:20 : 일괄 매도
+PHASE_CLOSED = "closed"           # 15:20 ~     : 종료
+
+SESSION_SCHEDULE = (
+    (datetime.time(9, 0), PHASE_LIQUIDATE),
+    (datetime.time(9, 5), PHASE_BUY),
+    (datetime.time(15, 15), PHASE_SELL),
+    (datetime.time(15, 20), PHASE_CLOSED),
+)
+
+
+def build_session(day=None):
+    """
+    하루치 장 구간 전환 시각 계산
+    :param day: 기준 날짜 (기본값 오늘)
+    :return: [(전환 시각, 구간)] 시간순 리스트
+    """
+    day = day or datetime.date.today()
+    return [(datetime.datetime.combine(day, t), phase) for t, phase in SESSION_SCHEDULE]
+
+
+def phase_at(session, now):
+    """
+    :return: now 시점의 장 구간
+    """
+    phase = PHASE_PRE_MARKET
+    for start, p in session:
+        if now >= start:
+            phase = p
+    return phase
+
+
+class TradingEngine:
+    """
+    이벤트 기반 매매 루프
+    고정 주기로 깨어나지 않고 시세 이벤트(post)나 예약된 타이머가 있을 때만 처리한다.
+    """
+
+    def __init__(self, on_phase, on_event, session=None, clock=datetime.datetime.now):
+        """
+        :param on_phase: 장 구간이 바뀔 때 호출 (phase 인자)
+        :param on_event: post()로 들어온 이벤트 처리 (event 인자)
+        :param session: build_session() 결과 (기본값 오늘)
+        :param clock: 현재 시각 함수
+        """
+        self.on_phase = on_phase
+        self.on_event = on_event
+        self.session = session or build_session()
+        self.clock = clock
+        self.phase = None
+        self._events = queue.Queue()
+        self._timers = []
+        self._seq = itertools.count()
+        self._running = False
+
+    def post(self, event):
+        """다른 스레드(웹소켓 등)에서 이벤트 전달"""
+        self._events.put(event)
+
+    def call_at(self, when, callback):
+        """
+        지정 시각에 콜백 실행 예약 (엔진 스레드에서만 호출)
+        :param when: 실행 시각 (datetime)
+        """
+        heapq.heappush(self._timers, (when, next(self._seq), callback))
+
+    def stop(self):
+        self._running = False
+        self._events.put(None)
+
+    def _set_phase(self, phase):
+        if phase != self.phase:
+            self.phase = phase
+            self.on_phase(phase)
+
+    def _run_due_timers(self):
+        now = self.clock()
+        while self._timers and self._timers[0][0] <= now:
+            _, _, callback = heapq.heappop(self._timers)
+            callback()
+
+    def run(self):
+        """엔진 루프 실행 (stop() 호출 또는 장 종료 구간 처리 후 반환)"""
+        self._running = True
+        now = self.clock()
+        # 현재 구간을 바로 적용하고 이후 전환 시각만 타이머로 예약
+        self._set_phase(phase_at(self.session, now))
+        for start, phase in self.session:
+            if start > now:
+                self.call_at(start, lambda p=phase: self._set_phase(p))
+
+        while self._running:
+            self._run_due_timers()
+            if not self._running:
+                break
+            timeout = None
+            if self._timers:
+                timeout = max((self._timers[0][0] - self.clock()).total_seconds(), 0)
+            try:
+                event = self._events.get(timeout=timeout)
+            except queue.Empty:
+                continue
+            if event is not None:
+                self.on_event(event)
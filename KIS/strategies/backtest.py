@@ -0,0 +1,92 @@
+# strategies/backtest.py
+# python
+import numpy as np
+
+TRADING_DAYS = 252
+
+
+class BacktestResult:
+    """변동성 돌파 백테스트 결과 (배열 모양: 종목 x 일자)"""
+
+    def __init__(self, target, entries, fills, returns, weights):
+        self.target = target
+        self.entries = entries
+        self.fills = fills
+        self.returns = returns
+        # 종목별 누적 수익 곡선
+        self.equity = np.cumprod(1 + returns, axis=1)
+        # 거래 가능한 종목에 자금을 똑같이 나눈 포트폴리오
+        daily = (returns * weights).sum(axis=0)
+        self.portfolio_returns = daily
+        self.portfolio_equity = np.cumprod(1 + daily)
+
+    def stats(self):
+        """
+        포트폴리오 성과 요약
+        :return: dict (total_return, cagr, mdd, trades, win_rate)
+        """
+        equity = self.portfolio_equity
+        n_days = equity.shape[0]
+        total_return = equity[-1] - 1 if n_days else 0.0
+        years = n_days / TRADING_DAYS
+        cagr = equity[-1] ** (1 / years) - 1 if n_days and equity[-1] > 0 else 0.0
+        peak = np.maximum.accumulate(equity) if n_days else equity
+        mdd = float(np.min(equity / peak - 1)) if n_days else 0.0
+        trades = int(self.entries.sum())
+        wins = int((self.returns[self.entries] > 0).sum())
+        return {
+            "total_return": float(total_return),
+            "cagr": float(cagr),
+            "mdd": mdd,
+            "trades": trades,
+            "win_rate": wins / trades if trades else 0.0,
+        }
+
+
+def breakout_returns(open_, high, low, close, k=0.5, fee_rate=0.00015, tax_rate=0.0018):
+    """
+    변동성 돌파 전략 일별 수익률 계산
+    당일 고가가 목표가(시가 + 전일 변동폭 * k)에 닿으면 목표가(갭 상승 시 시가)에 매수하고
+    당일 종가에 매도한다. 데이터가 없는 날은 NaN으로 채운다.
+
+    :param open_: 시가 배열 (종목 x 일자)
+    :param high: 고가 배열
+    :param low: 저가 배열
+    :param close: 종가 배열
+    :param k: 변동성 배수 (스칼라, 종목별 (N, 1) 또는 (N, T) 배열)
+    :param fee_rate: 매수/매도 수수료율
+    :param tax_rate: 매도 거래세율
+    :return: (목표가, 진입 여부, 체결가, 일별 수익률) 배열 튜플
+    """
+    target = np.full(open_.shape, np.nan)
+    target[:, 1:] = open_[:, 1:] + (high[:, :-1] - low[:, :-1]) * np.broadcast_to(k, open_.shape)[:, 1:]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        entries = high >= target  # NaN 비교는 False
+        fills = np.where(entries, np.fmax(target, open_), np.nan)
+        returns = close * (1 - fee_rate - tax_rate) / (fills * (1 + fee_rate)) - 1
+    returns = np.where(entries & np.isfinite(returns), returns, 0.0)
+    return target, entries, fills, returns
+
+
+def as_ohlc_matrix(*arrays):
+    arrays = [np.asarray(a, dtype=np.float64) for a in arrays]
+    if arrays[0].ndim == 1:
+        arrays = [a[np.newaxis, :] for a in arrays]
+    return arrays
+
+
+def backtest_breakout(open_, high, low, close, k=0.5, fee_rate=0.00015, tax_rate=0.0018):
+    """
+    변동성 돌파 전략 벡터화 백테스트 (인자는 breakout_returns와 동일)
+    :return: BacktestResult
+    """
+    open_, high, low, close = as_ohlc_matrix(open_, high, low, close)
+    target, entries, fills, returns = breakout_returns(open_, high, low, close, k, fee_rate, tax_rate)
+
+    # 그날 시세가 있는 종목끼리 자금을 나눈다
+    tradable = np.isfinite(target) & np.isfinite(close)
+    counts = tradable.sum(axis=0)
+    weights = np.divide(tradable, counts, out=np.zeros(tradable.shape), where=counts > 0)
+
+    return BacktestResult(target, entries, fills, returns, weights)
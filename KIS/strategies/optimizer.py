@@ -0,0 +1,133 @@
+# strategies/optimizer.py
+# python
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+from strategies.backtest import breakout_returns, as_ohlc_matrix
+
+# 워크포워드 결과 테이블 (종목 x 구간 한 행)
+RESULT_DTYPE = np.dtype([
+    ("symbol", "U12"),
+    ("train_start", "i4"),
+    ("test_start", "i4"),
+    ("test_end", "i4"),
+    ("k", "f4"),          # 선택된 k (노이즈 비율 k를 고른 경우 NaN)
+    ("noise_k", "?"),
+    ("train_return", "f4"),
+    ("test_return", "f4"),
+])
+
+_worker = {}
+
+
+def noise_k(open_, high, low, close, window=20):
+    """
+    노이즈 비율 기반 k 계산
+    noise = 1 - |종가 - 시가| / (고가 - 저가) 의 직전 window일 평균 (당일 값은 사용하지 않음)
+    :return: k 배열 (종목 x 일자, 초기 window일은 NaN)
+    """
+    with np.errstate(invalid="ignore", divide="ignore"):
+        noise = 1 - np.abs(close - open_) / (high - low)
+    noise = np.where(np.isfinite(noise), noise, 0.0)
+    csum = np.zeros((noise.shape[0], noise.shape[1] + 1))
+    np.cumsum(noise, axis=1, out=csum[:, 1:])
+    k = np.full(noise.shape, np.nan)
+    # t일의 k = t-window ~ t-1일 노이즈 평균
+    k[:, window:] = (csum[:, window:-1] - csum[:, :-window - 1]) / window
+    return k
+
+
+def _init_worker(shm_name, shape):
+    # 프로세스마다 가격 행렬을 복사하지 않고 공유 메모리를 그대로 참조
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _worker["shm"] = shm
+    _worker["ohlc"] = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+
+
+def _window_returns(task):
+    """
+    k 하나에 대해 모든 종목/구간의 로그 수익률 계산
+    :param task: (k 또는 None(노이즈 k), 구간 시작 배열, 구간 끝 배열, fee_rate, tax_rate, noise_window)
+    :return: (종목 x 구간) 로그 수익률
+    """
+    k, starts, ends, fee_rate, tax_rate, noise_window = task
+    open_, high, low, close = _worker["ohlc"]
+    if k is None:
+        k = noise_k(open_, high, low, close, noise_window)
+        k = np.where(np.isfinite(k), k, 0.5)
+    _, _, _, returns = breakout_returns(open_, high, low, close, k, fee_rate, tax_rate)
+    log_equity = np.zeros((returns.shape[0], returns.shape[1] + 1))
+    np.cumsum(np.log1p(returns), axis=1, out=log_equity[:, 1:])
+    return log_equity[:, ends] - log_equity[:, starts]
+
+
+def walk_forward(open_, high, low, close, k_values, symbols=None, train_days=252, test_days=63,
+                 include_noise=True, noise_window=20, fee_rate=0.00015, tax_rate=0.0018, max_workers=None):
+    """
+    종목별 k 워크포워드 최적화
+    학습 구간에서 수익률이 가장 높은 k를 골라 바로 뒤 검증 구간 수익률로 평가한다.
+    k 후보마다 한 프로세스 작업으로 나누고, 가격 행렬은 공유 메모리로 전달한다.
+
+    :param open_, high, low, close: 가격 배열 (종목 x 일자)
+    :param k_values: k 후보 리스트
+    :param symbols: 종목 코드 리스트 (기본값 행 번호)
+    :param train_days: 학습 구간 길이 (거래일)
+    :param test_days: 검증 구간 길이이자 이동 간격
+    :param include_noise: 노이즈 비율 k를 후보에 추가할지 여부
+    :param max_workers: 프로세스 수 (기본값 CPU 수)
+    :return: RESULT_DTYPE 구조화 배열
+    """
+    open_, high, low, close = as_ohlc_matrix(open_, high, low, close)
+    n_symbols, n_days = close.shape
+    symbols = list(symbols) if symbols is not None else [str(i) for i in range(n_symbols)]
+
+    train_starts = np.arange(0, n_days - train_days - test_days + 1, test_days)
+    if train_starts.size == 0:
+        raise ValueError("Not enough history for one train/test window")
+    test_starts = train_starts + train_days
+    test_ends = test_starts + test_days
+    n_windows = train_starts.size
+    starts = np.concatenate([train_starts, test_starts])
+    ends = np.concatenate([test_starts, test_ends])
+
+    candidates = [float(k) for k in k_values] + ([None] if include_noise else [])
+    tasks = [(k, starts, ends, fee_rate, tax_rate, noise_window) for k in candidates]
+
+    shape = (4, n_symbols, n_days)
+    shm = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)) * 8)
+    try:
+        ohlc = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+        ohlc[0], ohlc[1], ohlc[2], ohlc[3] = open_, high, low, close
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(shm.name, shape)) as executor:
+            grid = np.stack(list(executor.map(_window_returns, tasks)))  # (K, N, 2W)
+        del ohlc
+    finally:
+        shm.close()
+        shm.unlink()
+
+    train, test = grid[:, :, :n_windows], grid[:, :, n_windows:]
+    best = np.argmax(train, axis=0)  # (N, W)
+    best_train = np.take_along_axis(train, best[np.newaxis], axis=0)[0]
+    best_test = np.take_along_axis(test, best[np.newaxis], axis=0)[0]
+    k_table = np.array([np.nan if k is None else k for k in candidates])
+
+    table = np.empty(n_symbols * n_windows, dtype=RESULT_DTYPE)
+    table["symbol"] = np.repeat(symbols, n_windows)
+    table["train_start"] = np.tile(train_starts, n_symbols)
+    table["test_start"] = np.tile(test_starts, n_symbols)
+    table["test_end"] = np.tile(test_ends, n_symbols)
+    table["k"] = k_table[best].ravel()
+    table["noise_k"] = np.isnan(k_table[best]).ravel()
+    table["train_return"] = np.expm1(best_train).ravel()
+    table["test_return"] = np.expm1(best_test).ravel()
+    return table
+
+
+def save_results(path, table):
+    """결과 테이블을 .npy 파일로 저장"""
+    np.save(path, table)
+
+
+def load_results(path):
+    return np.load(path)
@@ -14,4 +14,13 @@ class VolatilityBreakoutStrategy:
         volatility = yesterday_high - yesterday_low
         target_price = today_open + (volatility * k)
         return target_price
+
+    def is_breakout(self, current_price, target_price):
+        """
+        목표가 돌파 여부
+        :param current_price: 현재가 (체결가)
+        :param target_price: 목표 매수 가격
+        :return: 돌파 여부
+        """
+        return target_price is not None and current_price > target_price
 #
\ No newline at end of file
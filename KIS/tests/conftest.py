@@ -0,0 +1,7 @@
+# tests/conftest.py
+# python
+import os
+import sys
+
+# 봇과 같은 방식(KIS 디렉터리 기준)으로 services / strategies를 import
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
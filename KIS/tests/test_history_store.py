@@ -0,0 +1,47 @@
+# tests/test_history_store.py
+# python
+import builtins
+import numpy as np
+import pytest
+from services.history_store import HistoryStore
+
+
+def _bars(ts, base):
+    ts = np.asarray(ts)
+    return {"ts": ts, "open": base + 0.1 + 0 * ts, "high": base + 0.2 + 0 * ts, "low": base + 0.3 + 0 * ts,
+            "close": base + 0.4 + 0 * ts, "volume": base + 0.5 + 0 * ts}
+
+
+def test_interrupted_append_does_not_misalign_columns(tmp_path, monkeypatch):
+    store = HistoryStore(str(tmp_path))
+    assert store.append("005930", "D", _bars([20260101, 20260102], 1)) == 2
+
+    # volume.bin까지 쓰고 ts.bin을 쓰기 전에 중단 (close는 일부 바이트만 기록)
+    real_open = builtins.open
+
+    def failing_open(path, mode="r", *args, **kwargs):
+        f = real_open(path, mode, *args, **kwargs)
+        if str(path).endswith("close.bin") and "a" in mode:
+            f.write(b"\x00\x01\x02")
+        if str(path).endswith("ts.bin") and "a" in mode:
+            f.close()
+            raise OSError("disk unplugged")
+        return f
+
+    monkeypatch.setattr(builtins, "open", failing_open)
+    with pytest.raises(OSError):
+        store.append("005930", "D", _bars([20260105, 20260106], 9))
+    monkeypatch.setattr(builtins, "open", real_open)
+
+    # 중단된 행은 보이지 않는다
+    assert store.read("005930")["ts"].tolist() == [20260101, 20260102]
+
+    assert store.append("005930", "D", _bars([20260107], 2)) == 1
+    data = store.read("005930")
+    assert data["ts"].tolist() == [20260101, 20260102, 20260107]
+    for name, offset in (("open", 0.1), ("high", 0.2), ("low", 0.3), ("close", 0.4), ("volume", 0.5)):
+        assert data[name].tolist() == pytest.approx([1 + offset, 1 + offset, 2 + offset])
+
+    ts, matrix = store.read_matrix(["005930"])
+    assert ts.tolist() == [20260101, 20260102, 20260107]
+    assert matrix["close"][0].tolist() == pytest.approx([1.4, 1.4, 2.4])
@@ -0,0 +1,110 @@
+# tests/test_realtime_quote.py
+# python
+import asyncio
+import json
+from services.realtime_quote import RealtimeQuoteService, parse_frame
+from strategies.volatility_breakout import VolatilityBreakoutStrategy
+from ws_replay import ReplayServer, trade_frame
+
+
+class Config:
+    WS_URL_BASE = None
+
+
+def test_parse_frame_multiple_records():
+    frame = trade_frame(("005930", "090001", 71000, 70000, 71200, 69900, 10, 1000),
+                        ("000660", "090001", 150000, 149000, 151000, 148500, 3, 300))
+    ticks = parse_frame(frame, received_at=1.0)
+    assert [t.code for t in ticks] == ["005930", "000660"]
+    assert ticks[0].price == 71000 and ticks[0].high == 71200 and ticks[0].acc_volume == 1000
+    assert ticks[1].low == 148500 and ticks[1].received_at == 1.0
+    assert parse_frame('{"header": {"tr_id": "PINGPONG"}}') == []
+
+
+def test_replay_resubscribe_and_breakout():
+    strategy = VolatilityBreakoutStrategy()
+    targets = {"005930": 70500, "000660": 152000}
+    ticks, breakouts = [], []
+    done = asyncio.Event()
+
+    def on_tick(tick):
+        ticks.append(tick)
+        if tick.price == 0:
+            raise RuntimeError("handler failure")  # 콜백 오류는 수신 루프를 멈추면 안 된다
+        if strategy.is_breakout(tick.price, targets[tick.code]):
+            breakouts.append(tick.code)
+        if len(ticks) == 5:
+            done.set()
+
+    sessions = [
+        # 첫 접속: 체결 2건, 깨진 프레임, 콜백 오류 후 끊김
+        ([trade_frame(("005930", "090001", 70000, 70000, 70100, 69900, 5, 5)),
+          "not json",
+          trade_frame(("000660", "090001", 0, 0, 0, 0, 0, 0)),
+          trade_frame(("005930", "090002", 70600, 70000, 70600, 69900, 7, 12))], True),
+        # 재접속: 재구독 후 체결 재개
+        ([trade_frame(("000660", "090003", 151000, 149000, 151000, 148500, 1, 1),
+                      ("000660", "090003", 152500, 149000, 152500, 148500, 2, 3))], False),
+    ]
+
+    async def scenario():
+        async with ReplayServer(sessions, subscriptions=2) as server:
+            service = RealtimeQuoteService(Config(), None, on_tick, url=server.url, approval_key="test-key")
+            service.RECONNECT_DELAY = 0.01
+            await service.subscribe("005930")
+            await service.subscribe("000660")
+            task = asyncio.create_task(service.run())
+            await asyncio.wait_for(done.wait(), timeout=5)
+            await service.stop()
+            await asyncio.wait_for(task, timeout=5)
+            return server
+
+    server = asyncio.run(scenario())
+    assert server.connections == 2
+    for received in server.requests:
+        assert sorted(r["body"]["input"]["tr_key"] for r in received) == ["000660", "005930"]
+        assert all(r["header"]["tr_type"] == "1" and r["header"]["approval_key"] == "test-key"
+                   for r in received)
+    assert [t.price for t in ticks] == [70000, 0, 70600, 151000, 152500]
+    assert breakouts == ["005930", "000660"]
+
+
+def test_handshake_rejection_refreshes_approval_key():
+    import websockets
+    from http import HTTPStatus
+
+    class Auth:
+        calls = 0
+
+        def get_approval_key(self):
+            Auth.calls += 1
+            return f"key-{Auth.calls}"
+
+    attempts = []
+    got = asyncio.Event()
+
+    def reject_first(connection, request):
+        attempts.append(request.path)
+        if len(attempts) == 1:
+            return connection.respond(HTTPStatus.FORBIDDEN, "expired approval key\n")
+
+    async def handler(ws):
+        json.loads(await ws.recv())
+        got.set()
+        await ws.wait_closed()
+
+    async def scenario():
+        async with websockets.serve(handler, "127.0.0.1", 0, process_request=reject_first) as server:
+            port = server.sockets[0].getsockname()[1]
+            service = RealtimeQuoteService(Config(), Auth(), lambda tick: None, url=f"ws://127.0.0.1:{port}")
+            service.RECONNECT_DELAY = 0.01
+            await service.subscribe("005930")
+            task = asyncio.create_task(service.run())
+            await asyncio.wait_for(got.wait(), timeout=5)
+            await service.stop()
+            await asyncio.wait_for(task, timeout=5)
+            return service
+
+    service = asyncio.run(scenario())
+    assert len(attempts) == 2
+    assert Auth.calls == 2 and service.approval_key == "key-2"
@@ -0,0 +1,67 @@
+# tests/ws_replay.py
+# python
+import asyncio
+import json
+import websockets
+
+
+class ReplayServer:
+    """
+    녹화한 실시간 프레임을 재생하는 로컬 웹소켓 서버 (KIS 실시간 서버 대역)
+    접속마다 구독 요청을 모두 받은 뒤 sessions[n]의 프레임을 순서대로 보낸다.
+    drop=True인 세션은 재생 후 연결을 끊어 재접속을 유도한다.
+    """
+
+    def __init__(self, sessions, subscriptions):
+        """
+        :param sessions: [(프레임 리스트, drop 여부), ...] 접속 순서대로
+        :param subscriptions: 재생 전에 기다릴 구독 요청 수
+        """
+        self.sessions = list(sessions)
+        self.subscriptions = subscriptions
+        self.requests = []  # 접속별로 받은 구독 요청 (json)
+        self.connections = 0
+        self._server = None
+
+    async def _handler(self, ws):
+        index = self.connections
+        self.connections += 1
+        received = []
+        self.requests.append(received)
+        while len(received) < self.subscriptions:
+            received.append(json.loads(await ws.recv()))
+        frames, drop = self.sessions[index] if index < len(self.sessions) else ([], False)
+        for frame in frames:
+            await ws.send(frame)
+        if drop:
+            await ws.close()
+            return
+        await ws.wait_closed()
+
+    async def __aenter__(self):
+        self._server = await websockets.serve(self._handler, "127.0.0.1", 0)
+        return self
+
+    async def __aexit__(self, *exc):
+        self._server.close()
+        await self._server.wait_closed()
+
+    @property
+    def url(self):
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"ws://{host}:{port}"
+
+
+def trade_frame(*records):
+    """
+    H0STCNT0 체결가 프레임 생성
+    :param records: (종목코드, 체결시각, 현재가, 시가, 고가, 저가, 체결량, 누적거래량)
+    """
+    fields = []
+    for code, time_, price, open_, high, low, volume, acc_volume in records:
+        rec = [""] * 46
+        rec[0], rec[1], rec[2] = code, time_, str(price)
+        rec[7], rec[8], rec[9] = str(open_), str(high), str(low)
+        rec[12], rec[13] = str(volume), str(acc_volume)
+        fields.extend(rec)
+    return f"0|H0STCNT0|{len(records)}|" + "^".join(fields)
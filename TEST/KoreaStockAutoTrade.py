@@ -62,8 +62,14 @@ def get_current_price(code="005930"):
     res = requests.get(URL, headers=headers, params=params)
     return int(res.json()['output']['stck_prpr'])
 
+daily_bar_cache = {} # (종목코드, 거래일) -> (오늘 시가, 전일 고가, 전일 저가)
+
 def get_target_price(code="005930"):
     """변동성 돌파 전략으로 매수 목표가 조회"""
+    today = datetime.datetime.now().strftime('%Y%m%d')
+    if (code, today) in daily_bar_cache:
+        stck_oprc, stck_hgpr, stck_lwpr = daily_bar_cache[(code, today)]
+        return stck_oprc + (stck_hgpr - stck_lwpr) * 0.5
     PATH = "uapi/domestic-stock/v1/quotations/inquire-daily-price"
     URL = f"{URL_BASE}/{PATH}"
     headers = {"Content-Type":"application/json", 
@@ -78,9 +84,12 @@ def get_target_price(code="005930"):
     "fid_period_div_code":"D"
     }
     res = requests.get(URL, headers=headers, params=params)
-    stck_oprc = int(res.json()['output'][0]['stck_oprc']) #오늘 시가
-    stck_hgpr = int(res.json()['output'][1]['stck_hgpr']) #전일 고가
-    stck_lwpr = int(res.json()['output'][1]['stck_lwpr']) #전일 저가
+    output = res.json()['output']
+    stck_oprc = int(output[0]['stck_oprc']) #오늘 시가
+    stck_hgpr = int(output[1]['stck_hgpr']) #전일 고가
+    stck_lwpr = int(output[1]['stck_lwpr']) #전일 저가
+    if output[0]['stck_bsop_date'] == today: # 장 시작 후에는 값이 바뀌지 않으므로 캐시
+        daily_bar_cache[(code, today)] = (stck_oprc, stck_hgpr, stck_lwpr)
     target_price = stck_oprc + (stck_hgpr - stck_lwpr) * 0.5
     return target_price
 
@@ -112,19 +121,16 @@ def get_stock_balance():
     stock_list = res.json()['output1']
     evaluation = res.json()['output2']
     stock_dict = {}
-    send_message(f"====주식 보유잔고====")
+    lines = ["====주식 보유잔고===="] # 한 번의 메세지로 묶어서 전송
     for stock in stock_list:
         if int(stock['hldg_qty']) > 0:
             stock_dict[stock['pdno']] = stock['hldg_qty']
-            send_message(f"{stock['prdt_name']}({stock['pdno']}): {stock['hldg_qty']}주")
-            time.sleep(0.1)
-    send_message(f"주식 평가 금액: {evaluation[0]['scts_evlu_amt']}원")
-    time.sleep(0.1)
-    send_message(f"평가 손익 합계: {evaluation[0]['evlu_pfls_smtl_amt']}원")
-    time.sleep(0.1)
-    send_message(f"총 평가 금액: {evaluation[0]['tot_evlu_amt']}원")
-    time.sleep(0.1)
-    send_message(f"=================")
+            lines.append(f"{stock['prdt_name']}({stock['pdno']}): {stock['hldg_qty']}주")
+    lines.append(f"주식 평가 금액: {evaluation[0]['scts_evlu_amt']}원")
+    lines.append(f"평가 손익 합계: {evaluation[0]['evlu_pfls_smtl_amt']}원")
+    lines.append(f"총 평가 금액: {evaluation[0]['tot_evlu_amt']}원")
+    lines.append(f"=================")
+    send_message("\n".join(lines))
     return stock_dict
 
 def get_balance():
@@ -64,8 +64,14 @@ def get_current_price(market="NAS", code="AAPL"):
     res = requests.get(URL, headers=headers, params=params)
     return float(res.json()['output']['last'])
 
+daily_bar_cache = {} # (거래소, 종목코드, 거래일) -> (오늘 시가, 전일 고가, 전일 저가)
+
 def get_target_price(market="NAS", code="AAPL"):
     """변동성 돌파 전략으로 매수 목표가 조회"""
+    today = datetime.datetime.now(timezone('America/New_York')).strftime('%Y%m%d')
+    if (market, code, today) in daily_bar_cache:
+        stck_oprc, stck_hgpr, stck_lwpr = daily_bar_cache[(market, code, today)]
+        return stck_oprc + (stck_hgpr - stck_lwpr) * 0.5
     PATH = "uapi/overseas-price/v1/quotations/dailyprice"
     URL = f"{URL_BASE}/{PATH}"
     headers = {"Content-Type":"application/json", 
@@ -82,9 +88,12 @@ def get_target_price(market="NAS", code="AAPL"):
         "MODP":"0"
     }
     res = requests.get(URL, headers=headers, params=params)
-    stck_oprc = float(res.json()['output2'][0]['open']) #오늘 시가
-    stck_hgpr = float(res.json()['output2'][1]['high']) #전일 고가
-    stck_lwpr = float(res.json()['output2'][1]['low']) #전일 저가
+    output = res.json()['output2']
+    stck_oprc = float(output[0]['open']) #오늘 시가
+    stck_hgpr = float(output[1]['high']) #전일 고가
+    stck_lwpr = float(output[1]['low']) #전일 저가
+    if output[0]['xymd'] == today: # 장 시작 후에는 값이 바뀌지 않으므로 캐시
+        daily_bar_cache[(market, code, today)] = (stck_oprc, stck_hgpr, stck_lwpr)
     target_price = stck_oprc + (stck_hgpr - stck_lwpr) * 0.5
     return target_price
 
@@ -111,17 +120,15 @@ def get_stock_balance():
     stock_list = res.json()['output1']
     evaluation = res.json()['output2']
     stock_dict = {}
-    send_message(f"====주식 보유잔고====")
+    lines = ["====주식 보유잔고===="] # 한 번의 메세지로 묶어서 전송
     for stock in stock_list:
         if int(stock['ovrs_cblc_qty']) > 0:
             stock_dict[stock['ovrs_pdno']] = stock['ovrs_cblc_qty']
-            send_message(f"{stock['ovrs_item_name']}({stock['ovrs_pdno']}): {stock['ovrs_cblc_qty']}주")
-            time.sleep(0.1)
-    send_message(f"주식 평가 금액: ${evaluation['tot_evlu_pfls_amt']}")
-    time.sleep(0.1)
-    send_message(f"평가 손익 합계: ${evaluation['ovrs_tot_pfls']}")
-    time.sleep(0.1)
-    send_message(f"=================")
+            lines.append(f"{stock['ovrs_item_name']}({stock['ovrs_pdno']}): {stock['ovrs_cblc_qty']}주")
+    lines.append(f"주식 평가 금액: ${evaluation['tot_evlu_pfls_amt']}")
+    lines.append(f"평가 손익 합계: ${evaluation['ovrs_tot_pfls']}")
+    lines.append(f"=================")
+    send_message("\n".join(lines))
     return stock_dict
 
 def get_balance():
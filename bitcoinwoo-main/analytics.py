@@ -0,0 +1,182 @@
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+# 지표 계산에 필요한 trades 컬럼 (query_trades(conn, ANALYTICS_COLUMNS)로 이것만 읽는다)
+ANALYTICS_COLUMNS = ['id', 'ts_epoch', 'coin_symbol', 'decision', 'percentage', 'coin_balance', 'krw_balance',
+                     'coin_avg_buy_price', 'coin_krw_price', 'profit_amount']
+
+DAY = 86400
+PERIODS_PER_YEAR = 365  # 암호화폐는 매일 거래된다
+
+
+def _arrays(trades):
+    """시각(같으면 id) 순으로 정렬한 numpy 배열 (결측 잔고/가격은 0)"""
+    ts = trades['ts_epoch'].to_numpy(dtype=np.int64)
+    if np.all(ts[1:] >= ts[:-1]):
+        order = slice(None)  # query_trades 기본 정렬 (ts_epoch, id)
+    else:
+        ids = trades['id'].to_numpy(dtype=np.int64) if 'id' in trades else np.arange(len(trades))
+        order = np.lexsort((ids, ts))
+
+    def col(name, fill=None):
+        values = trades[name].to_numpy(dtype=float, na_value=np.nan)[order]
+        return values if fill is None else np.where(np.isnan(values), fill, values)
+
+    # 문자열 컬럼은 코드/불리언으로만 바꾼다 (문자열 배열 변환이 계산 전체보다 느리다)
+    coin_codes, coins = pd.factorize(trades['coin_symbol'])
+    return {
+        'ts': ts[order],
+        'coin': coin_codes[order],
+        'coins': len(coins),
+        'sell': (trades['decision'] == 'sell').to_numpy(dtype=bool)[order],
+        'percentage': col('percentage'),
+        'krw': col('krw_balance', 0.0),
+        'qty': col('coin_balance', 0.0),
+        'price': col('coin_krw_price', 0.0),
+        'avg': col('coin_avg_buy_price', 0.0),
+        'profit': col('profit_amount'),
+    }
+
+
+def _holdings(a):
+    """
+    행마다 전체 코인 평가 금액
+    각 행의 잔고는 그 코인의 것만 기록되므로 다른 코인은 마지막으로 기록된 수량 x 가격으로 채운다.
+    """
+    n = len(a['ts'])
+    idx = np.arange(n)
+    value = np.zeros(n)
+    coin_value = a['qty'] * a['price']
+    for k in range(a['coins']):
+        last = np.where(a['coin'] == k, idx, -1)
+        np.maximum.accumulate(last, out=last)
+        value += np.where(last >= 0, coin_value[np.maximum(last, 0)], 0.0)
+    return value
+
+
+def _round_trips(a):
+    """
+    매도 행별 (실현 손익, 수익률)
+    autotrade.py는 보유 수량 전체를 팔고 손익을 기록한다. 손익을 기록하지 않는 봇(autotrade4 등)은
+    percentage가 매도 비율이므로 (현재가 - 평단가) x 보유 수량 x 매도 비율로 추정한다.
+    """
+    sells = np.flatnonzero(a['sell'])
+    profit, avg, percentage = a['profit'][sells], a['avg'][sells], a['percentage'][sells]
+    logged = ~np.isnan(profit)
+    fraction = np.where(logged | np.isnan(percentage), 1.0, np.clip(percentage / 100, 0, 1))
+    sold = a['qty'][sells] * fraction
+    cost = avg * sold
+    pnl = np.where(logged, profit, (a['price'][sells] - avg) * sold)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = np.where(cost > 0, pnl / cost, np.nan)
+    return pnl, returns
+
+
+def _local_times(ts):
+    """epoch 초 -> 현지 시각 (봇이 기록하는 timestamp와 같은 기준)"""
+    return pd.to_datetime(ts, unit='s', utc=True).tz_convert(datetime.now().astimezone().tzinfo).tz_localize(None)
+
+
+def equity_curve(trades):
+    """거래 시점별 평가 금액 (KRW + 코인 평가액, 현지 시각 인덱스)"""
+    if trades.empty:
+        return pd.Series(dtype=float, name='equity')
+    a = _arrays(trades)
+    return pd.Series(a['krw'] + _holdings(a), index=_local_times(a['ts']), name='equity')
+
+
+def trade_returns(trades):
+    """매도(라운드 트립)별 수익률 (비율, 계산할 수 없는 행은 NaN)"""
+    if trades.empty:
+        return np.array([])
+    return _round_trips(_arrays(trades))[1]
+
+
+def _period_returns(ts, equity, period):
+    """기간(period초) 마지막 평가 금액의 수익률. 거래가 없던 기간은 0으로 채운다"""
+    bucket = ts // period
+    last = np.flatnonzero(np.append(np.diff(bucket) != 0, True))
+    values, buckets = equity[last], bucket[last]
+    returns = np.zeros(max(int(buckets[-1] - buckets[0]), 0))
+    valid = values[:-1] > 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        changes = values[1:] / values[:-1] - 1
+    returns[(buckets[1:] - buckets[0] - 1)[valid]] = changes[valid]
+    return returns
+
+
+def compute_metrics(trades, period=DAY, periods_per_year=PERIODS_PER_YEAR):
+    """
+    trades 테이블(ANALYTICS_COLUMNS)로 성과 지표 계산
+    수익률 관련 값은 %, 기간은 일 단위. 계산할 수 없는 지표는 None.
+    :param period: 샤프/소르티노 계산에 쓰는 수익률 구간 (초, 기본값: 1일)
+    :param periods_per_year: 연율화에 쓰는 1년당 구간 수
+    """
+    metrics = dict.fromkeys(('start', 'end', 'trades', 'round_trips', 'initial_equity', 'final_equity',
+                             'total_return', 'win_rate', 'profit_factor', 'avg_trade_return', 'sharpe',
+                             'sortino', 'max_drawdown', 'max_drawdown_days', 'exposure'))
+    if trades.empty:
+        metrics.update(trades=0, round_trips=0)
+        return metrics
+    a = _arrays(trades)
+    ts = a['ts']
+    holdings = _holdings(a)
+    equity = a['krw'] + holdings
+    start, end = _local_times(ts[[0, -1]])
+    metrics.update(start=start, end=end, trades=len(ts), initial_equity=equity[0], final_equity=equity[-1])
+    if equity[0] > 0:
+        metrics['total_return'] = (equity[-1] / equity[0] - 1) * 100
+
+    # 라운드 트립 (매도 행)
+    pnl, returns = _round_trips(a)
+    metrics['round_trips'] = len(pnl)
+    if len(pnl):
+        metrics['win_rate'] = (pnl > 0).mean() * 100
+        gains, losses = pnl[pnl > 0].sum(), -pnl[pnl < 0].sum()
+        metrics['profit_factor'] = gains / losses if losses > 0 else (np.inf if gains > 0 else None)
+        if np.isfinite(returns).any():
+            metrics['avg_trade_return'] = np.nanmean(returns) * 100
+
+    # 샤프 / 소르티노 (거래가 없던 구간 포함)
+    period_returns = _period_returns(ts, equity, period)
+    if len(period_returns) > 1:
+        mean = period_returns.mean()
+        std = period_returns.std(ddof=1)
+        downside = np.sqrt(np.mean(np.minimum(period_returns, 0) ** 2))
+        if std > 0:
+            metrics['sharpe'] = mean / std * np.sqrt(periods_per_year)
+        if downside > 0:
+            metrics['sortino'] = mean / downside * np.sqrt(periods_per_year)
+
+    # 최대 낙폭과 최장 낙폭 기간 (직전 고점 이후 회복하지 못한 시간)
+    peak = np.maximum.accumulate(equity)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        drawdown = np.where(peak > 0, equity / peak - 1, 0.0)
+    metrics['max_drawdown'] = drawdown.min() * 100
+    peak_at = np.maximum.accumulate(np.where(equity >= peak, np.arange(len(ts)), 0))
+    metrics['max_drawdown_days'] = (ts - ts[peak_at]).max() / DAY
+
+    # 노출 시간: 코인을 보유한 채로 지나간 시간의 비율 (각 행의 잔고는 직전 거래 이후 보유분)
+    elapsed = ts[-1] - ts[0]
+    if elapsed > 0:
+        metrics['exposure'] = np.diff(ts)[holdings[1:] > 0].sum() / elapsed * 100
+    return metrics
+
+
+def format_metrics(metrics):
+    """LLM 프롬프트용 한 줄 요약 (계산되지 않은 지표는 생략)"""
+    labels = (
+        ('total_return', 'Total return', '{:.2f}%'),
+        ('round_trips', 'Closed trades', '{}'),
+        ('win_rate', 'Win rate', '{:.1f}%'),
+        ('profit_factor', 'Profit factor', '{:.2f}'),
+        ('avg_trade_return', 'Avg trade return', '{:.2f}%'),
+        ('sharpe', 'Sharpe', '{:.2f}'),
+        ('sortino', 'Sortino', '{:.2f}'),
+        ('max_drawdown', 'Max drawdown', '{:.2f}%'),
+        ('max_drawdown_days', 'Longest drawdown', '{:.1f} days'),
+        ('exposure', 'Exposure', '{:.1f}%'),
+    )
+    return ', '.join(f"{label}: {fmt.format(metrics[key])}" for key, label, fmt in labels
+                     if metrics.get(key) is not None)
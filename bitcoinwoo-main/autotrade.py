@@ -2,14 +2,19 @@ import os
 import logging
 import time
 import schedule
-import sqlite3
 from datetime import datetime, timedelta
 import argparse
 from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor
 import pyupbit
 import pandas as pd
-import ta
 from ta.utils import dropna
+from candle_cache import CandleCache
+from signals import add_indicators_batch, make_trading_decision
+from balance_book import BalanceBook
+from orders import plan_orders, FEE_RATE
+from trade_db import init_trades, query_trades, to_epoch, load_daily_pnl, equity_performance
+from rate_limiter import RateLimiter, limited, QUOTATION_RATE, EXCHANGE_RATE, ORDER_RATE
 
 # .env 파일에 저장된 환경 변수를 불러오기 (API 키 등)
 load_dotenv()
@@ -25,10 +30,11 @@ if not access or not secret:
     logger.error("API keys not found. Please check your .env file.")
     raise ValueError("Missing API keys. Please check your .env file.")
 upbit = pyupbit.Upbit(access, secret)
+# 잔고 장부 (사이클마다 get_balances 한 번, 체결은 장부에 바로 반영)
+balance_book = BalanceBook(upbit)
 
-# 거래 수수료 및 최소 거래 금액 설정
-FEE_RATE = 0.0005  # 업비트 수수료는 0.05%
-MIN_TRADE_AMOUNT = 5000  # 최소 거래 금액 5,000원
+# 통합 trades 테이블의 source 값 (여러 봇의 기록을 한 저장소에서 구분)
+BOT_NAME = 'autotrade'
 
 # 기본값 설정
 default_coins = ['BTC', 'DOGE', 'XLM', 'XRP', 'SOL']
@@ -84,203 +90,144 @@ if total_alloc > 100:
 
 markets = [f"KRW-{coin}" for coin in coin_symbols]
 
-# SQLite 데이터베이스 초기화 함수
+# SQLite 데이터베이스 초기화 함수 (통합 trades 스키마, 예전 파일은 제자리 업그레이드)
 def init_db():
-    conn = sqlite3.connect('crypto_trades.db')
-    c = conn.cursor()
-    c.execute('''CREATE TABLE IF NOT EXISTS trades
-                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                  timestamp TEXT,
-                  decision TEXT,
-                  percentage REAL,
-                  reason TEXT,
-                  coin_symbol TEXT,
-                  coin_balance REAL,
-                  krw_balance REAL,
-                  coin_avg_buy_price REAL,
-                  coin_krw_price REAL,
-                  profit_amount REAL,
-                  profit_rate REAL,
-                  trade_start_time TEXT,
-                  trade_end_time TEXT,
-                  reflection TEXT)''')
-    conn.commit()
-    return conn
+    return init_trades('crypto_trades.db', BOT_NAME)
 
 # 거래 기록을 DB에 저장하는 함수
 def log_trade(conn, decision, percentage, reason, coin_balance, krw_balance,
               coin_avg_buy_price, coin_krw_price, coin_symbol,
               profit_amount=None, profit_rate=None,
               trade_start_time=None, trade_end_time=None,
-              reflection=''):
+              reflection='', fee=None):
     c = conn.cursor()
-    timestamp = datetime.now().isoformat()
+    now = datetime.now()
+    timestamp = now.isoformat()
     c.execute("""INSERT INTO trades 
                  (timestamp, decision, percentage, reason, coin_symbol, coin_balance, krw_balance,
-                  coin_avg_buy_price, coin_krw_price, profit_amount, profit_rate, trade_start_time, trade_end_time, reflection) 
-                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                  coin_avg_buy_price, coin_krw_price, profit_amount, profit_rate, trade_start_time, trade_end_time, reflection,
+                  ts_epoch, source, fee) 
+                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
               (timestamp, decision, percentage, reason, coin_symbol, coin_balance, krw_balance,
-               coin_avg_buy_price, coin_krw_price, profit_amount, profit_rate, trade_start_time, trade_end_time, reflection))
+               coin_avg_buy_price, coin_krw_price, profit_amount, profit_rate, trade_start_time, trade_end_time, reflection,
+               to_epoch(now), BOT_NAME, fee))
     conn.commit()
 
-# 최근 투자 기록 조회
-def get_recent_trades(conn, days=30):
-    c = conn.cursor()
-    days_ago = (datetime.now() - timedelta(days=days)).isoformat()
-    c.execute("SELECT * FROM trades WHERE timestamp > ? ORDER BY timestamp ASC", (days_ago,))
-    columns = [column[0] for column in c.description]
-    trades_df = pd.DataFrame.from_records(data=c.fetchall(), columns=columns)
-    return trades_df
-
-# 최근 투자 기록을 기반으로 퍼포먼스 계산
-def calculate_performance(trades_df):
-    if trades_df.empty:
-        return None, None
-    initial_balance = trades_df.iloc[0]['krw_balance'] + trades_df.iloc[0]['coin_balance'] * trades_df.iloc[0]['coin_krw_price']
-    final_balance = trades_df.iloc[-1]['krw_balance'] + trades_df.iloc[-1]['coin_balance'] * trades_df.iloc[-1]['coin_krw_price']
-    if initial_balance == 0:
-        return None, final_balance
-    return (final_balance - initial_balance) / initial_balance * 100, initial_balance
-
-# 데이터프레임에 보조 지표를 추가하는 함수
-def add_indicators(df):
-    # 볼린저 밴드 추가
-    indicator_bb = ta.volatility.BollingerBands(close=df['close'], window=20, window_dev=2)
-    df['bb_bbm'] = indicator_bb.bollinger_mavg()
-    df['bb_bbh'] = indicator_bb.bollinger_hband()
-    df['bb_bbl'] = indicator_bb.bollinger_lband()
-    
-    # RSI 추가
-    df['rsi'] = ta.momentum.RSIIndicator(close=df['close'], window=14).rsi()
-    
-    # MACD 추가
-    macd = ta.trend.MACD(close=df['close'])
-    df['macd'] = macd.macd()
-    df['macd_signal'] = macd.macd_signal()
-    df['macd_diff'] = macd.macd_diff()
-
-    return df
-
-# 매매 결정 로직 수정: 신호 발생 시점에 매매가 이루어지도록 변경
-def make_trading_decision(df):
-    if len(df) < 2:
-        return "hold", ""
-
-    # 이전 행과 현재 행을 가져옵니다.
-    prev_row = df.iloc[-2]
-    last_row = df.iloc[-1]
-    decision = "hold"
-    reason = ""
-
-    # 조건 1: 볼린저 밴드 상단 돌파와 RSI 과매수 진입 순간 -> 매도
-    if (prev_row['close'] < prev_row['bb_bbh'] and last_row['close'] >= last_row['bb_bbh']) and \
-       (prev_row['rsi'] <= 70 and last_row['rsi'] > 70):
-        decision = "sell"
-        reason = "Price just crossed above upper Bollinger Band and RSI entered overbought."
-    # 조건 2: 볼린저 밴드 하단 돌파와 RSI 과매도 진입 순간 -> 매수
-    elif (prev_row['close'] > prev_row['bb_bbl'] and last_row['close'] <= last_row['bb_bbl']) and \
-         (prev_row['rsi'] >= 30 and last_row['rsi'] < 30):
-        decision = "buy"
-        reason = "Price just crossed below lower Bollinger Band and RSI entered oversold."
-    # 조건 3: MACD 시그널 라인 상향 돌파 순간 -> 매수
-    elif (prev_row['macd'] <= prev_row['macd_signal'] and last_row['macd'] > last_row['macd_signal']):
-        decision = "buy"
-        reason = "MACD line just crossed above signal line."
-    # 조건 4: MACD 시그널 라인 하향 돌파 순간 -> 매도
-    elif (prev_row['macd'] >= prev_row['macd_signal'] and last_row['macd'] < last_row['macd_signal']):
-        decision = "sell"
-        reason = "MACD line just crossed below signal line."
-
-    return decision, reason
+# 최근 투자 기록 조회 (ts_epoch 인덱스로 구간만 읽는다)
+def get_recent_trades(conn, days=30, columns=None):
+    return query_trades(conn, columns, start=datetime.now() - timedelta(days=days))
+
+# 최근 일별 손익 집계(daily_pnl)로 퍼포먼스 계산 (첫 거래 대비 마지막 거래 시점 평가 금액)
+def calculate_performance(conn, days=30):
+    return equity_performance(load_daily_pnl(conn, start=datetime.now() - timedelta(days=days)))
 
 # 누적 매수 금액을 저장할 딕셔너리
 cumulative_buy_amounts = {}
 
+# 업비트 요청 제한 (시세 / 잔고 조회 / 주문), 동시에 실행되는 모든 스레드가 공유한다
+quotation_limiter = RateLimiter(QUOTATION_RATE)
+exchange_limiter = RateLimiter(EXCHANGE_RATE)
+order_limiter = RateLimiter(ORDER_RATE)
+
+# 코인별 캔들 캐시 (매 실행마다 새로 생긴 캔들만 조회)
+candle_cache = CandleCache(fetcher=limited(quotation_limiter, pyupbit.get_ohlcv))
+
+# 코인별 조회/주문을 동시에 보내는 스레드 풀 (코인 수가 늘어도 한 사이클이 실행 주기 안에 끝나도록)
+MAX_WORKERS = 8
+executor = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+
+# 1단계: 캔들 조회 (시장별 동시 실행)
+def fetch_candles(market):
+    try:
+        return candle_cache.get_ohlcv(market, interval=data_interval, count=100)
+    except Exception as e:
+        logger.error(f"[{market}] Failed to fetch candles: {e}")
+        return None
+
+# 4단계: 주문 실행 (코인별 동시 실행)
+def execute_order(order):
+    order_limiter.acquire()
+    order['trade_start_time'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    try:
+        if order['decision'] == "buy":
+            order['result'] = upbit.buy_market_order(order['market'], order['amount'])
+        else:
+            order['result'] = upbit.sell_market_order(order['market'], order['amount'])
+        # 거부된 주문은 에러 응답(dict)이나 None이 오므로 장부에 반영하지 않는다
+        if not isinstance(order['result'], dict) or 'uuid' not in order['result']:
+            order['error'] = order['result']
+    except Exception as e:
+        order['error'] = e
+    order['trade_end_time'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return order
+
 # 트레이딩 작업을 수행하는 함수
 def job():
     try:
         conn = init_db()
-        total_krw_balance = upbit.get_balance("KRW")
+        # 잔고 장부 갱신 (TTL이 지났거나 직전 사이클에 주문이 나간 경우에만 get_balances 호출)
+        if balance_book.is_stale():
+            exchange_limiter.acquire()
+            balance_book.sync()
+        total_krw_balance = balance_book.balance("KRW")
         logger.info(f"Total KRW Balance: {total_krw_balance}")
 
+        # 1단계: 모든 시장의 캔들을 동시에 조회
+        candles = dict(zip(markets, executor.map(fetch_candles, markets)))
+
+        # 2단계: 모든 시장의 보조 지표를 한 번에 계산하고 시장별 매매 결정
+        frames = {market: dropna(df) for market, df in candles.items()
+                  if df is not None and not df.empty and len(df) >= 2}
+        frames = add_indicators_batch(frames)
+        signals = {}
         for market, coin_symbol in zip(markets, coin_symbols):
-            # 데이터 수집 및 보조 지표 계산
-            df = pyupbit.get_ohlcv(market, interval=data_interval, count=100)
-            if df is None or df.empty or len(df) < 2:
+            if market not in frames:
                 continue
-            df = dropna(df)
-            df = add_indicators(df)
-            
-            # 매매 결정
-            decision, reason = make_trading_decision(df)
-            
-            # 매매 신호 발생 시간
-            signal_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            
-            # 매매 실행 로직
+            decision, reason = make_trading_decision(frames[market])
+            # "hold"인 경우 주문하지 않음
             if decision in ["buy", "sell"]:
-                coin_balance = upbit.get_balance(coin_symbol)
-                krw_balance = upbit.get_balance("KRW")
-                current_price = pyupbit.get_current_price(market)
-                allocation_percentage = allocation_percentages[coin_symbol]
-                allocation_amount = total_krw_balance * (allocation_percentage / 100)
-                cumulative_buy = cumulative_buy_amounts.get(coin_symbol, 0)
-                coin_avg_buy_price = upbit.get_avg_buy_price(coin_symbol)
-
-                if decision == "buy":
-                    remaining_alloc = allocation_amount - cumulative_buy
-                    buy_amount = min(remaining_alloc, krw_balance)
-                    if buy_amount >= MIN_TRADE_AMOUNT:
-                        # 매매 시작 시간
-                        trade_start_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                        # 매수 전 코인 잔고 및 평균 매수가
-                        coin_balance_before_buy = coin_balance
-                        coin_avg_buy_price_before_buy = coin_avg_buy_price
-                        # 매수 주문 실행
-                        upbit.buy_market_order(market, buy_amount)
-                        cumulative_buy_amounts[coin_symbol] = cumulative_buy + buy_amount
-                        # 매매 완료 시간
-                        trade_end_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                        logger.info(f"Signal Time: {signal_time}, Trade Start Time: {trade_start_time}, Trade End Time: {trade_end_time}, [{coin_symbol}] Executed BUY order for {buy_amount} KRW. Reason: {reason}")
-                        # 거래 기록 저장 (매매가 실행된 경우에만)
-                        log_trade(conn, decision, allocation_percentage, reason, coin_balance_before_buy, krw_balance,
-                                  coin_avg_buy_price_before_buy, current_price, coin_symbol,
-                                  profit_amount=None, profit_rate=None,
-                                  trade_start_time=trade_start_time, trade_end_time=trade_end_time)
-                    else:
-                        logger.info(f"{signal_time} [{coin_symbol}] Not enough allocation or KRW balance to execute BUY. Remaining Allocation: {remaining_alloc:.2f} KRW, Available KRW: {krw_balance:.2f} KRW")
-                elif decision == "sell":
-                    sell_amount = coin_balance
-                    sell_total = sell_amount * current_price
-                    if sell_total >= MIN_TRADE_AMOUNT:
-                        # 매매 시작 시간
-                        trade_start_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                        # 매도 전 코인 잔고 및 평균 매수가
-                        coin_balance_before_sell = coin_balance
-                        coin_avg_buy_price_before_sell = coin_avg_buy_price
-                        # 매도 주문 실행
-                        upbit.sell_market_order(market, sell_amount)
-                        cumulative_buy_amounts[coin_symbol] = 0  # 매도 시 누적 매수 금액 초기화
-                        # 매매 완료 시간
-                        trade_end_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                        # 수익 계산
-                        profit_amount = (current_price - coin_avg_buy_price_before_sell) * sell_amount
-                        if coin_avg_buy_price_before_sell > 0:
-                            profit_rate = ((current_price / coin_avg_buy_price_before_sell) - 1) * 100
-                        else:
-                            profit_rate = None
-                        logger.info(f"Signal Time: {signal_time}, Trade Start Time: {trade_start_time}, Trade End Time: {trade_end_time}, [{coin_symbol}] Executed SELL order for {sell_amount} {coin_symbol}. Reason: {reason}")
-                        logger.info(f"Profit for {coin_symbol}: {profit_amount:.2f} KRW ({profit_rate:.2f}%)")
-                        # 거래 기록 저장 (매매가 실행된 경우에만)
-                        log_trade(conn, decision, allocation_percentage, reason, coin_balance_before_sell, krw_balance,
-                                  coin_avg_buy_price_before_sell, current_price, coin_symbol,
-                                  profit_amount=profit_amount, profit_rate=profit_rate,
-                                  trade_start_time=trade_start_time, trade_end_time=trade_end_time)
-                    else:
-                        logger.info(f"{signal_time} [{coin_symbol}] Not enough {coin_symbol} balance to execute SELL. Required: {MIN_TRADE_AMOUNT} KRW, Available: {sell_total:.2f} KRW")
-            else:
-                # "hold"인 경우 데이터베이스에 기록하지 않음
+                # 매매 신호 발생 시간
+                signals[coin_symbol] = (decision, reason, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        if not signals:
+            conn.close()
+            return
+
+        # 3단계: 신호가 난 코인의 현재가를 한 번에 조회하고 장부 잔고로 주문 계획
+        quotation_limiter.acquire()
+        prices = pyupbit.get_current_price([f"KRW-{coin}" for coin in signals])
+        if not isinstance(prices, dict):
+            prices = {f"KRW-{coin}": prices for coin in signals}
+        orders = plan_orders(signals, prices, total_krw_balance, allocation_percentages, cumulative_buy_amounts,
+                             balance_book.balance, balance_book.avg_buy_price)
+
+        # 4단계: 주문을 동시에 실행하고 결과는 순서대로 기록
+        for order in executor.map(execute_order, orders):
+            coin_symbol = order['coin_symbol']
+            if 'error' in order:
+                logger.error(f"[{coin_symbol}] {order['decision'].upper()} order failed: {order['error']}")
                 continue
+            profit_amount = profit_rate = None
+            if order['decision'] == "buy":
+                fee = order['amount'] * FEE_RATE
+                cumulative_buy_amounts[coin_symbol] = cumulative_buy_amounts.get(coin_symbol, 0) + order['amount']
+                balance_book.apply_buy(coin_symbol, order['amount'], order['current_price'], FEE_RATE)
+                logger.info(f"Signal Time: {order['signal_time']}, Trade Start Time: {order['trade_start_time']}, Trade End Time: {order['trade_end_time']}, [{coin_symbol}] Executed BUY order for {order['amount']} KRW. Reason: {order['reason']}")
+            else:
+                cumulative_buy_amounts[coin_symbol] = 0  # 매도 시 누적 매수 금액 초기화
+                balance_book.apply_sell(coin_symbol, order['amount'], order['current_price'], FEE_RATE)
+                fee = order['amount'] * order['current_price'] * FEE_RATE
+                # 수익 계산
+                profit_amount = (order['current_price'] - order['coin_avg_buy_price']) * order['amount']
+                if order['coin_avg_buy_price'] > 0:
+                    profit_rate = ((order['current_price'] / order['coin_avg_buy_price']) - 1) * 100
+                logger.info(f"Signal Time: {order['signal_time']}, Trade Start Time: {order['trade_start_time']}, Trade End Time: {order['trade_end_time']}, [{coin_symbol}] Executed SELL order for {order['amount']} {coin_symbol}. Reason: {order['reason']}")
+                logger.info(f"Profit for {coin_symbol}: {profit_amount:.2f} KRW ({profit_rate or 0:.2f}%)")
+            # 거래 기록 저장 (매매가 실행된 경우에만)
+            log_trade(conn, order['decision'], order['percentage'], order['reason'], order['coin_balance'],
+                      order['krw_balance'], order['coin_avg_buy_price'], order['current_price'], coin_symbol,
+                      profit_amount=profit_amount, profit_rate=profit_rate,
+                      trade_start_time=order['trade_start_time'], trade_end_time=order['trade_end_time'],
+                      fee=fee)
 
         conn.close()
     except Exception as e:
@@ -302,22 +249,21 @@ if __name__ == "__main__":
         print(f"Fetch Interval: {fetch_interval} minute(s)")
 
         # 현재 잔고 및 수익률 계산
-        total_krw_balance = upbit.get_balance("KRW")
+        balance_book.sync()
+        total_krw_balance = balance_book.balance("KRW")
+        current_prices = pyupbit.get_current_price(markets)
+        if not isinstance(current_prices, dict):
+            current_prices = {markets[0]: current_prices}
         total_coin_valuation = 0
-        for coin in coin_symbols:
-            coin_balance = upbit.get_balance(coin)
-            current_price = pyupbit.get_current_price(f"KRW-{coin}")
-            total_coin_valuation += coin_balance * current_price
+        for market, coin in zip(markets, coin_symbols):
+            total_coin_valuation += balance_book.balance(coin) * current_prices[market]
         current_total_valuation = total_krw_balance + total_coin_valuation
 
         # 초기 투자 금액 가져오기 (DB에서)
         conn = init_db()
-        trades_df = get_recent_trades(conn)
+        performance, initial_balance = calculate_performance(conn)
         conn.close()
-        if not trades_df.empty:
-            performance, initial_balance = calculate_performance(trades_df)
-        else:
-            performance = None
+        if initial_balance is None:
             initial_balance = current_total_valuation  # 초기 투자 금액 설정
 
         if performance is not None:
@@ -14,6 +14,7 @@ from datetime import datetime, timedelta
 import re
 import schedule
 import numpy as np
+from trade_db import init_trades, query_trades, to_epoch, load_daily_pnl, equity_performance, PROMPT_COLUMNS
 
 # .env 파일에 저장된 환경 변수를 불러오기 (API 키 등)
 load_dotenv()
@@ -30,24 +31,14 @@ if not access or not secret:
     raise ValueError("Missing API keys. Please check your .env file.")
 upbit = pyupbit.Upbit(access, secret)
 
+# 통합 trades 테이블의 source 값 (여러 봇의 기록을 한 저장소에서 구분)
+BOT_NAME = 'autotrade2'
+
 # SQLite 데이터베이스 초기화 함수 - 거래 내역을 저장할 테이블을 생성
 def init_db():
     logger.info("Initializing database...")
-    conn = sqlite3.connect('bitcoin_trades.db')
-    c = conn.cursor()
-    c.execute('''CREATE TABLE IF NOT EXISTS trades
-                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                  timestamp TEXT,
-                  decision TEXT,
-                  percentage INTEGER,
-                  reason TEXT,
-                  gpt_response TEXT,
-                  btc_balance REAL,
-                  krw_balance REAL,
-                  btc_avg_buy_price REAL,
-                  btc_krw_price REAL,
-                  reflection TEXT)''')
-    conn.commit()
+    # 통합 trades 스키마 (예전 파일은 제자리 업그레이드)
+    conn = init_trades('bitcoin_trades.db', BOT_NAME)
     logger.info("Database initialized successfully.")
     return conn
 
@@ -55,37 +46,28 @@ def init_db():
 def log_trade(conn, decision, percentage, reason, gpt_response, btc_balance, krw_balance, btc_avg_buy_price, btc_krw_price, reflection=''):
     logger.info("Logging trade to database...")
     c = conn.cursor()
-    timestamp = datetime.now().isoformat()
+    now = datetime.now()
     c.execute("""INSERT INTO trades 
-                 (timestamp, decision, percentage, reason, gpt_response, btc_balance, krw_balance, btc_avg_buy_price, btc_krw_price, reflection) 
-                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-              (timestamp, decision, percentage, reason, gpt_response, btc_balance, krw_balance, btc_avg_buy_price, btc_krw_price, reflection))
+                 (timestamp, ts_epoch, decision, percentage, reason, gpt_response, coin_balance, krw_balance, coin_avg_buy_price, coin_krw_price, reflection, coin_symbol, source) 
+                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+              (now.isoformat(), to_epoch(now), decision, percentage, reason, gpt_response, btc_balance, krw_balance, btc_avg_buy_price, btc_krw_price, reflection, 'BTC', BOT_NAME))
     conn.commit()
     logger.info("Trade logged successfully.")
 
-# 최근 투자 기록 조회
+# 최근 투자 기록 조회 (ts_epoch 인덱스로 구간만, 프롬프트에 쓰는 컬럼만 읽는다)
 def get_recent_trades(conn, days=7):
     logger.info("Fetching recent trades from database...")
-    c = conn.cursor()
-    seven_days_ago = (datetime.now() - timedelta(days=days)).isoformat()
-    c.execute("SELECT * FROM trades WHERE timestamp > ? ORDER BY timestamp DESC", (seven_days_ago,))
-    columns = [column[0] for column in c.description]
-    recent_trades = pd.DataFrame.from_records(data=c.fetchall(), columns=columns)
+    recent_trades = query_trades(conn, PROMPT_COLUMNS, start=datetime.now() - timedelta(days=days), descending=True)
     logger.info("Recent trades fetched successfully.")
     return recent_trades
 
-# 최근 수익성 평가 함수
+# 최근 수익성 평가 함수 (거래 원본 대신 일별 손익 집계 daily_pnl을 읽는다)
 def evaluate_performance(conn):
-    trades_df = get_recent_trades(conn, days=30)
-    if trades_df.empty:
+    performance, _ = equity_performance(load_daily_pnl(conn, start=datetime.now() - timedelta(days=30)))
+    if performance is None:
         logger.info("No trades available for evaluation.")
         return None
 
-    # 매매 기록을 기반으로 수익률 계산
-    initial_balance = trades_df.iloc[-1]['krw_balance'] + trades_df.iloc[-1]['btc_balance'] * trades_df.iloc[-1]['btc_krw_price']
-    final_balance = trades_df.iloc[0]['krw_balance'] + trades_df.iloc[0]['btc_balance'] * trades_df.iloc[0]['btc_krw_price']
-
-    performance = (final_balance - initial_balance) / initial_balance * 100
     logger.info(f"30-day Performance: {performance:.2f}%")
     return performance
 
@@ -10,6 +10,7 @@ import pyupbit
 import pandas as pd
 import ta
 from ta.utils import dropna
+from trade_db import init_trades, query_trades, to_epoch, load_daily_pnl, equity_performance, PROMPT_COLUMNS
 
 # .env 파일에 저장된 환경 변수를 불러오기 (API 키 등)
 load_dotenv()
@@ -26,6 +27,9 @@ if not access or not secret:
     raise ValueError("Missing API keys. Please check your .env file.")
 upbit = pyupbit.Upbit(access, secret)
 
+# 통합 trades 테이블의 source 값 (여러 봇의 기록을 한 저장소에서 구분)
+BOT_NAME = 'autotrade_'
+
 # 거래 수수료 및 최소 거래 금액 설정
 FEE_RATE = 0.0005  # 업비트 수수료는 0.05%
 MIN_TRADE_AMOUNT = 5000  # 최소 거래 금액 5,000원
@@ -86,54 +90,30 @@ markets = [f"KRW-{coin}" for coin in coin_symbols]
 
 # SQLite 데이터베이스 초기화 함수
 def init_db():
-    conn = sqlite3.connect('crypto_trades.db')
-    c = conn.cursor()
-    c.execute('''CREATE TABLE IF NOT EXISTS trades
-                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                  timestamp TEXT,
-                  decision TEXT,
-                  percentage REAL,
-                  reason TEXT,
-                  coin_symbol TEXT,
-                  coin_balance REAL,
-                  krw_balance REAL,
-                  coin_avg_buy_price REAL,
-                  coin_krw_price REAL,
-                  reflection TEXT)''')
-    conn.commit()
+    # 통합 trades 스키마 (예전 파일은 제자리 업그레이드)
+    conn = init_trades('crypto_trades.db', BOT_NAME)
     return conn
 
 # 거래 기록을 DB에 저장하는 함수
 def log_trade(conn, decision, percentage, reason, coin_balance, krw_balance,
               coin_avg_buy_price, coin_krw_price, coin_symbol, reflection=''):
     c = conn.cursor()
-    timestamp = datetime.now().isoformat()
+    now = datetime.now()
     c.execute("""INSERT INTO trades 
-                 (timestamp, decision, percentage, reason, coin_symbol, coin_balance, krw_balance,
-                  coin_avg_buy_price, coin_krw_price, reflection) 
-                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-              (timestamp, decision, percentage, reason, coin_symbol, coin_balance, krw_balance,
-               coin_avg_buy_price, coin_krw_price, reflection))
+                 (timestamp, ts_epoch, decision, percentage, reason, coin_symbol, coin_balance, krw_balance,
+                  coin_avg_buy_price, coin_krw_price, reflection, source) 
+                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+              (now.isoformat(), to_epoch(now), decision, percentage, reason, coin_symbol, coin_balance, krw_balance,
+               coin_avg_buy_price, coin_krw_price, reflection, BOT_NAME))
     conn.commit()
 
-# 최근 투자 기록 조회
-def get_recent_trades(conn, days=30):
-    c = conn.cursor()
-    days_ago = (datetime.now() - timedelta(days=days)).isoformat()
-    c.execute("SELECT * FROM trades WHERE timestamp > ? ORDER BY timestamp ASC", (days_ago,))
-    columns = [column[0] for column in c.description]
-    trades_df = pd.DataFrame.from_records(data=c.fetchall(), columns=columns)
-    return trades_df
-
-# 최근 투자 기록을 기반으로 퍼포먼스 계산
-def calculate_performance(trades_df):
-    if trades_df.empty:
-        return None, None
-    initial_balance = trades_df.iloc[0]['krw_balance'] + trades_df.iloc[0]['coin_balance'] * trades_df.iloc[0]['coin_krw_price']
-    final_balance = trades_df.iloc[-1]['krw_balance'] + trades_df.iloc[-1]['coin_balance'] * trades_df.iloc[-1]['coin_krw_price']
-    if initial_balance == 0:
-        return None, final_balance
-    return (final_balance - initial_balance) / initial_balance * 100, initial_balance
+# 최근 투자 기록 조회 (ts_epoch 인덱스로 구간만 읽는다)
+def get_recent_trades(conn, days=30, columns=PROMPT_COLUMNS):
+    return query_trades(conn, columns, start=datetime.now() - timedelta(days=days))
+
+# 최근 일별 손익 집계(daily_pnl)로 퍼포먼스 계산 (첫 거래 대비 마지막 거래 시점 평가 금액)
+def calculate_performance(conn, days=30):
+    return equity_performance(load_daily_pnl(conn, start=datetime.now() - timedelta(days=days)))
 
 # 데이터프레임에 보조 지표를 추가하는 함수
 def add_indicators(df):
@@ -285,12 +265,9 @@ if __name__ == "__main__":
 
         # 초기 투자 금액 가져오기 (DB에서)
         conn = init_db()
-        trades_df = get_recent_trades(conn)
+        performance, initial_balance = calculate_performance(conn)
         conn.close()
-        if not trades_df.empty:
-            performance, initial_balance = calculate_performance(trades_df)
-        else:
-            performance = None
+        if initial_balance is None:
             initial_balance = current_total_valuation  # 초기 투자 금액 설정
 
         if performance is not None:
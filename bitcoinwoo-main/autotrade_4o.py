@@ -24,6 +24,8 @@ from pydantic import BaseModel
 import sqlite3
 from datetime import datetime, timedelta
 import schedule
+from trade_db import init_trades, query_trades, to_epoch, load_daily_pnl, equity_performance, PROMPT_COLUMNS
+from analytics import ANALYTICS_COLUMNS, compute_metrics, format_metrics
 
 # .env 파일에 저장된 환경 변수를 불러오기 (API 키 등)
 load_dotenv()
@@ -40,6 +42,9 @@ if not access or not secret:
     raise ValueError("Missing API keys. Please check your .env file.")
 upbit = pyupbit.Upbit(access, secret)
 
+# 통합 trades 테이블의 source 값 (여러 봇의 기록을 한 저장소에서 구분)
+BOT_NAME = 'autotrade_4o'
+
 # OpenAI 구조화된 출력 체크용 클래스
 class TradingDecision(BaseModel):
     decision: str
@@ -48,53 +53,33 @@ class TradingDecision(BaseModel):
 
 # SQLite 데이터베이스 초기화 함수 - 거래 내역을 저장할 테이블을 생성
 def init_db():
-    conn = sqlite3.connect('bitcoin_trades.db')
-    c = conn.cursor()
-    c.execute('''CREATE TABLE IF NOT EXISTS trades
-                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                  timestamp TEXT,
-                  decision TEXT,
-                  percentage INTEGER,
-                  reason TEXT,
-                  btc_balance REAL,
-                  krw_balance REAL,
-                  btc_avg_buy_price REAL,
-                  btc_krw_price REAL,
-                  reflection TEXT)''')
-    conn.commit()
+    # 통합 trades 스키마 (예전 파일은 제자리 업그레이드)
+    conn = init_trades('bitcoin_trades.db', BOT_NAME)
     return conn
 
 # 거래 기록을 DB에 저장하는 함수
 def log_trade(conn, decision, percentage, reason, btc_balance, krw_balance, btc_avg_buy_price, btc_krw_price, reflection=''):
     c = conn.cursor()
-    timestamp = datetime.now().isoformat()
+    now = datetime.now()
     c.execute("""INSERT INTO trades 
-                 (timestamp, decision, percentage, reason, btc_balance, krw_balance, btc_avg_buy_price, btc_krw_price, reflection) 
-                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-              (timestamp, decision, percentage, reason, btc_balance, krw_balance, btc_avg_buy_price, btc_krw_price, reflection))
+                 (timestamp, ts_epoch, decision, percentage, reason, coin_balance, krw_balance, coin_avg_buy_price, coin_krw_price, reflection, coin_symbol, source) 
+                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+              (now.isoformat(), to_epoch(now), decision, percentage, reason, btc_balance, krw_balance, btc_avg_buy_price, btc_krw_price, reflection, 'BTC', BOT_NAME))
     conn.commit()
 
-# 최근 투자 기록 조회
+# 최근 투자 기록 조회 (ts_epoch 인덱스로 구간만, 프롬프트와 성과 지표에 쓰는 컬럼만 읽는다)
 def get_recent_trades(conn, days=7):
-    c = conn.cursor()
-    seven_days_ago = (datetime.now() - timedelta(days=days)).isoformat()
-    c.execute("SELECT * FROM trades WHERE timestamp > ? ORDER BY timestamp DESC", (seven_days_ago,))
-    columns = [column[0] for column in c.description]
-    return pd.DataFrame.from_records(data=c.fetchall(), columns=columns)
-
-# 최근 투자 기록을 기반으로 퍼포먼스 계산 (초기 잔고 대비 최종 잔고)
-def calculate_performance(trades_df):
-    if trades_df.empty:
-        return 0 # 기록이 없을 경우 0%로 설정
-    # 초기 잔고 계산 (KRW + BTC * 현재 가격)
-    initial_balance = trades_df.iloc[-1]['krw_balance'] + trades_df.iloc[-1]['btc_balance'] * trades_df.iloc[-1]['btc_krw_price']
-    # 최종 잔고 계산
-    final_balance = trades_df.iloc[0]['krw_balance'] + trades_df.iloc[0]['btc_balance'] * trades_df.iloc[0]['btc_krw_price']
-    return (final_balance - initial_balance) / initial_balance * 100
+    columns = PROMPT_COLUMNS + [c for c in ANALYTICS_COLUMNS if c not in PROMPT_COLUMNS]
+    return query_trades(conn, columns, start=datetime.now() - timedelta(days=days), descending=True)
+
+# 일별 손익 집계(daily_pnl)로 퍼포먼스 계산 (초기 잔고 대비 최종 잔고)
+def calculate_performance(pnl_df):
+    performance, _ = equity_performance(pnl_df)
+    return performance if performance is not None else 0  # 기록이 없을 경우 0%로 설정
 
 # AI 모델을 사용하여 최근 투자 기록과 시장 데이터를 기반으로 분석 및 반성을 생성하는 함수
-def generate_reflection(trades_df, current_market_data):
-    performance = calculate_performance(trades_df) # 투자 퍼포먼스 계산
+def generate_reflection(trades_df, pnl_df, current_market_data):
+    performance = calculate_performance(pnl_df) # 투자 퍼포먼스 계산
     
     client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
     if not client.api_key:
@@ -113,12 +98,16 @@ def generate_reflection(trades_df, current_market_data):
                 "role": "user",
                 "content": f"""
                 Recent trading data:
-                {trades_df.to_json(orient='records')}
+                {trades_df[PROMPT_COLUMNS].to_json(orient='records')}
+                
+                Daily P&L (per day: trades, realized profit, fees, ending equity in KRW):
+                {pnl_df[['day', 'trades', 'realized_profit', 'fees', 'ending_equity']].to_json(orient='records')}
                 
                 Current market data:
                 {current_market_data}
                 
                 Overall performance in the last 7 days: {performance:.2f}%
+                Performance metrics in the last 7 days: {format_metrics(compute_metrics(trades_df))}
                 
                 Please analyze this data and provide:
                 1. A brief reflection on the recent trading decisions
@@ -371,6 +360,7 @@ def ai_trading():
         with sqlite3.connect('bitcoin_trades.db') as conn:
             # 최근 거래 내역 가져오기
             recent_trades = get_recent_trades(conn)
+            daily_pnl = load_daily_pnl(conn, start=datetime.now() - timedelta(days=7))
             
             # 현재 시장 데이터 수집 (기존 코드에서 가져온 데이터 사용)
             current_market_data = {
@@ -382,7 +372,7 @@ def ai_trading():
             }
             
             # 반성 및 개선 내용 생성
-            reflection = generate_reflection(recent_trades, current_market_data)
+            reflection = generate_reflection(recent_trades, daily_pnl, current_market_data)
             
             # AI 모델에 반성 내용 제공
             response = client.chat.completions.create(
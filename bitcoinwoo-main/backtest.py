@@ -0,0 +1,213 @@
+import argparse
+import logging
+import os
+import time
+import numpy as np
+import pandas as pd
+from candle_cache import CandleCache
+from orders import plan_orders, FEE_RATE, MIN_TRADE_AMOUNT
+from signals import add_indicators, signal_series, DECISIONS
+from trade_db import init_trades, to_epoch
+
+logger = logging.getLogger(__name__)
+
+# trades 테이블과 같은 컬럼 (id 제외)
+TRADE_COLUMNS = ['timestamp', 'decision', 'percentage', 'reason', 'coin_symbol', 'coin_balance',
+                 'krw_balance', 'coin_avg_buy_price', 'coin_krw_price', 'profit_amount', 'profit_rate',
+                 'trade_start_time', 'trade_end_time', 'reflection', 'fee']
+
+
+def load_candles(coin_symbols, interval='minute15', count=35040, cache_dir='candles'):
+    """
+    코인별 과거 캔들 조회
+    받은 캔들은 cache_dir에 저장해 두고, 다음 실행 때는 CandleCache로 저장된 마지막 캔들 이후만 받는다.
+    :param count: 코인별 캔들 수 (기본값: 15분봉 1년)
+    :param cache_dir: 캔들 저장 디렉터리 (None이면 저장하지 않고 매번 전체를 받는다)
+    :return: {코인 심볼: OHLCV DataFrame}
+    """
+    cache = CandleCache(capacity=count)
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+    candles = {}
+    for coin in coin_symbols:
+        market = f"KRW-{coin}"
+        path = os.path.join(cache_dir, f"{market}_{interval}.pkl") if cache_dir else None
+        if path and os.path.exists(path):
+            cache.seed(market, interval, pd.read_pickle(path))
+        df = cache.get_ohlcv(market, interval=interval, count=count)
+        if df is None or df.empty:
+            logger.warning(f"No candles for {coin}; skipping.")
+            continue
+        if path:
+            df.to_pickle(path)
+        candles[coin] = df
+    return candles
+
+
+class BacktestResult:
+    """백테스트 결과 (거래 기록 + 자산 곡선)"""
+
+    def __init__(self, trades, equity, krw_balance, coin_balances):
+        self.trades = trades
+        self.equity = equity
+        self.krw_balance = krw_balance
+        self.coin_balances = coin_balances
+
+    def summary(self):
+        initial, final = self.equity.iloc[0], self.equity.iloc[-1]
+        sells = self.trades[self.trades['decision'] == 'sell']
+        peak = self.equity.cummax()
+        return {
+            'initial_equity': initial,
+            'final_equity': final,
+            'return_rate': (final / initial - 1) * 100 if initial else None,
+            'max_drawdown': ((self.equity / peak - 1).min() * 100) if len(self.equity) else None,
+            'trades': len(self.trades),
+            'buys': int((self.trades['decision'] == 'buy').sum()),
+            'sells': len(sells),
+            'win_rate': (sells['profit_amount'] > 0).mean() * 100 if len(sells) else None,
+            'realized_profit': sells['profit_amount'].sum(),
+        }
+
+    def to_sqlite(self, path, source='backtest'):
+        """거래 기록을 통합 trades 테이블에 저장 (대시보드에서 그대로 조회 가능)"""
+        conn = init_trades(path, source)
+        try:
+            trades = self.trades.assign(source=source, ts_epoch=[to_epoch(t) for t in self.trades['timestamp']])
+            trades.to_sql('trades', conn, if_exists='append', index=False)
+            conn.commit()
+        finally:
+            conn.close()
+
+
+def run_backtest(candles, allocation_percentages, initial_krw=1_000_000,
+                 fee_rate=FEE_RATE, min_trade_amount=MIN_TRADE_AMOUNT):
+    """
+    autotrade.py의 job()과 같은 규칙으로 캔들을 재생하는 이벤트 기반 백테스트
+
+    - 지표와 신호는 코인별로 전체 구간을 한 번에 계산하고, 신호가 난 캔들만 순서대로 처리한다.
+    - 같은 시각의 신호는 한 사이클로 묶어 job()과 같은 orders.plan_orders로 주문을 계획한다.
+      할당 금액과 매수 한도는 사이클 시작 시점의 KRW 잔고 기준이며 같은 사이클의 매도 대금은 쓰지 않는다.
+    - 매수 수수료는 주문 금액에 더해 빠지므로 잔고가 부족하면 수수료를 뺀 금액만큼만 체결한다.
+    - 매도는 보유 수량 전체를 팔고 누적 매수 금액을 초기화한다.
+    - 체결 가격은 신호가 난 캔들의 종가다. 실거래는 진행 중 캔들로 1분마다 판단하므로
+      같은 캔들 안에서 여러 번 매수될 수 있지만, 백테스트는 완성된 캔들당 한 번만 판단한다.
+
+    :param candles: {코인 심볼: OHLCV DataFrame}
+    :param allocation_percentages: {코인 심볼: 할당 비율(%)}
+    :param initial_krw: 시작 KRW 잔고
+    :return: BacktestResult
+    """
+    coins = [coin for coin in allocation_percentages if coin in candles]
+    if not coins:
+        raise ValueError("No candles for any allocated coin.")
+    closes = {}
+    events = []
+    for order, coin in enumerate(coins):
+        df = add_indicators(candles[coin][['open', 'high', 'low', 'close', 'volume']].dropna().copy())
+        signals = signal_series(df)
+        closes[coin] = df['close']
+        hit = np.flatnonzero(signals['reason_code'].to_numpy() != 0)
+        events.append(pd.DataFrame({
+            'time': df.index[hit],
+            'order': order,
+            'code': signals['reason_code'].to_numpy()[hit],
+            'reason': signals['reason'].to_numpy()[hit],
+            'price': df['close'].to_numpy()[hit],
+        }))
+
+    # 시각 순, 같은 시각이면 코인 설정 순서 (job()의 루프 순서)
+    events = pd.concat(events, ignore_index=True).sort_values(['time', 'order'], kind='stable')
+
+    krw = float(initial_krw)
+    balances = {coin: 0.0 for coin in coins}
+    avg_prices = {coin: 0.0 for coin in coins}
+    cumulative_buy_amounts = {coin: 0.0 for coin in coins}
+    trades = []
+    # 체결 직후 상태 (자산 곡선용)
+    state_times, state_krw, state_coin, state_qty = [], [], [], []
+
+    times = events['time'].to_numpy()
+    coin_index, codes, reasons, prices = (events[c].tolist() for c in ('order', 'code', 'reason', 'price'))
+    bounds = np.append(np.flatnonzero(times[1:] != times[:-1]) + 1, len(times))
+    begin = 0
+    for end in bounds:
+        time_ = times[begin]
+        stamp = pd.Timestamp(time_).strftime("%Y-%m-%d %H:%M:%S")
+        cycle = range(begin, end)
+        begin = end
+        signals = {coins[coin_index[i]]: (DECISIONS[codes[i]], reasons[i], stamp) for i in cycle}
+        cycle_prices = {f"KRW-{coins[coin_index[i]]}": prices[i] for i in cycle}
+        planned = plan_orders(signals, cycle_prices, krw, allocation_percentages, cumulative_buy_amounts,
+                              balances.get, avg_prices.get, min_trade_amount)
+
+        # 매도 대금은 사이클이 끝난 뒤 잔고에 들어온다 (주문을 동시에 보내는 job()과 같게)
+        proceeds = 0.0
+        for order in planned:
+            coin, price = order['coin_symbol'], order['current_price']
+            coin_balance, avg_price = balances[coin], avg_prices[coin]
+            if order['decision'] == 'buy':
+                buy_amount = min(order['amount'], krw / (1 + fee_rate))
+                qty = buy_amount / price
+                trades.append((stamp, 'buy', order['percentage'], order['reason'], coin, order['coin_balance'],
+                               order['krw_balance'], avg_price, price, None, None, stamp, stamp, '',
+                               buy_amount * fee_rate))
+                krw -= buy_amount * (1 + fee_rate)
+                balances[coin] = coin_balance + qty
+                avg_prices[coin] = (avg_price * coin_balance + price * qty) / balances[coin]
+                cumulative_buy_amounts[coin] += buy_amount
+            else:
+                profit_amount = (price - avg_price) * coin_balance
+                profit_rate = (price / avg_price - 1) * 100 if avg_price > 0 else None
+                trades.append((stamp, 'sell', order['percentage'], order['reason'], coin, order['coin_balance'],
+                               order['krw_balance'], avg_price, price, profit_amount, profit_rate, stamp, stamp, '',
+                               coin_balance * price * fee_rate))
+                proceeds += coin_balance * price * (1 - fee_rate)
+                balances[coin] = 0.0
+                avg_prices[coin] = 0.0
+                cumulative_buy_amounts[coin] = 0
+            state_times.append(time_)
+            state_krw.append(krw + proceeds)
+            state_coin.append(coin)
+            state_qty.append(balances[coin])
+        krw += proceeds
+
+    equity = _equity_curve(closes, initial_krw, state_times, state_krw, state_coin, state_qty)
+    return BacktestResult(pd.DataFrame(trades, columns=TRADE_COLUMNS), equity, krw, balances)
+
+
+def _equity_curve(closes, initial_krw, times, krw, coins, qty):
+    """체결 사이에는 잔고가 변하지 않으므로 체결 시점 잔고를 앞으로 채워 평가한다"""
+    prices = pd.DataFrame(closes).sort_index().ffill()
+    if not times:
+        return pd.Series(float(initial_krw), index=prices.index, name='equity')
+    fills = pd.DataFrame({'time': times, 'krw': krw, 'coin': coins, 'qty': qty})
+    # 같은 시각 여러 체결은 마지막 상태만 남긴다
+    krw_series = fills.groupby('time')['krw'].last().reindex(prices.index).ffill().fillna(initial_krw)
+    qty = (fills.pivot_table(index='time', columns='coin', values='qty', aggfunc='last')
+           .reindex(index=prices.index, columns=prices.columns).ffill().fillna(0.0))
+    return (krw_series + (qty * prices.fillna(0.0)).sum(axis=1)).rename('equity')
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    logging.getLogger('orders').setLevel(logging.WARNING)  # 사이클마다 나오는 주문 생략 로그
+    parser = argparse.ArgumentParser(description='Backtest the BB/RSI/MACD crypto bot')
+    parser.add_argument('--coins', nargs='+', default=['BTC', 'DOGE', 'XLM', 'XRP', 'SOL'])
+    parser.add_argument('--allocation', type=float, default=20.0, help='Allocation percentage per coin')
+    parser.add_argument('--interval', default='minute15')
+    parser.add_argument('--count', type=int, default=35040, help='Candles per coin (default: 1 year of 15m)')
+    parser.add_argument('--krw', type=float, default=1_000_000, help='Initial KRW balance')
+    parser.add_argument('--db', help='Write the simulated trades to this SQLite file')
+    parser.add_argument('--cache-dir', default='candles', help='Directory for fetched candles (reused next run)')
+    args = parser.parse_args()
+
+    candles = load_candles(args.coins, args.interval, args.count, args.cache_dir)
+    started = time.perf_counter()
+    result = run_backtest(candles, {coin: args.allocation for coin in args.coins}, args.krw)
+    elapsed = time.perf_counter() - started
+    for key, value in result.summary().items():
+        print(f"{key}: {value}")
+    print(f"elapsed: {elapsed:.2f}s")
+    if args.db:
+        result.to_sqlite(args.db)
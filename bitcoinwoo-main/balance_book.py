@@ -0,0 +1,103 @@
+# trade/balance_book.py
+import threading
+import time
+
+
+def _currency(ticker):
+    # accepts "KRW-BTC" as well, like pyupbit.get_balance
+    return ticker.split('-')[-1] if '-' in ticker else ticker
+
+
+class BalanceBook:
+    """
+    Per-currency balances built from a single get_balances() call.
+    Fills are applied to the book locally; it is re-synced with Upbit
+    only when the TTL expires or after an order was placed.
+    """
+
+    def __init__(self, upbit, ttl=60, clock=time.monotonic):
+        self.upbit = upbit
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = {}
+        self._synced_at = None
+        self._ordered = False  # an order was placed since the last sync
+        self._lock = threading.Lock()
+
+    def sync(self):
+        """Rebuild the book from Upbit (one API call)."""
+        balances = self.upbit.get_balances()
+        if not isinstance(balances, list):
+            # pyupbit returns the error payload (a dict) on failure; keep the old book
+            raise RuntimeError(f"Failed to fetch balances: {balances}")
+        entries = {}
+        for b in balances:
+            entries[b['currency']] = {
+                'currency': b['currency'],
+                'balance': float(b.get('balance') or 0),
+                'locked': float(b.get('locked') or 0),
+                'avg_buy_price': float(b.get('avg_buy_price') or 0),
+                'unit_currency': b.get('unit_currency', 'KRW'),
+            }
+        with self._lock:
+            self._entries = entries
+            self._synced_at = self.clock()
+            self._ordered = False
+
+    def is_stale(self):
+        return self._synced_at is None or self._ordered or self.clock() - self._synced_at >= self.ttl
+
+    def refresh(self):
+        """Call at the start of a cycle; re-syncs only when needed. Returns True if it synced."""
+        if self.is_stale():
+            self.sync()
+            return True
+        return False
+
+    def balance(self, ticker):
+        """Available balance (0 if not held)."""
+        if self._synced_at is None:
+            self.sync()
+        entry = self._entries.get(_currency(ticker))
+        return entry['balance'] if entry else 0.0
+
+    def avg_buy_price(self, ticker):
+        if self._synced_at is None:
+            self.sync()
+        entry = self._entries.get(_currency(ticker))
+        return entry['avg_buy_price'] if entry else 0.0
+
+    def entries(self, currencies=None):
+        """Entries shaped like get_balances(), optionally filtered by currency."""
+        if self._synced_at is None:
+            self.sync()
+        return [dict(e) for c, e in self._entries.items() if currencies is None or c in currencies]
+
+    def _entry(self, currency):
+        return self._entries.setdefault(currency, {
+            'currency': currency, 'balance': 0.0, 'locked': 0.0,
+            'avg_buy_price': 0.0, 'unit_currency': 'KRW',
+        })
+
+    def apply_buy(self, ticker, krw_amount, price, fee_rate=0.0005):
+        """Apply a market buy fill (the fee is charged on top of the KRW amount)."""
+        with self._lock:
+            coin = self._entry(_currency(ticker))
+            krw = self._entry('KRW')
+            qty = krw_amount / price
+            total = coin['balance'] + qty
+            coin['avg_buy_price'] = (coin['avg_buy_price'] * coin['balance'] + price * qty) / total
+            coin['balance'] = total
+            krw['balance'] = max(krw['balance'] - krw_amount * (1 + fee_rate), 0.0)
+            self._ordered = True
+
+    def apply_sell(self, ticker, qty, price, fee_rate=0.0005):
+        """Apply a market sell fill."""
+        with self._lock:
+            coin = self._entry(_currency(ticker))
+            krw = self._entry('KRW')
+            coin['balance'] = max(coin['balance'] - qty, 0.0)
+            if coin['balance'] == 0:
+                coin['avg_buy_price'] = 0.0
+            krw['balance'] += qty * price * (1 - fee_rate)
+            self._ordered = True
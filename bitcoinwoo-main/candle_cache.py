@@ -0,0 +1,135 @@
+import logging
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import pyupbit
+
+logger = logging.getLogger(__name__)
+
+# pyupbit interval 문자열별 캔들 길이
+INTERVAL_DELTAS = {
+    'minute1': pd.Timedelta(minutes=1),
+    'minute3': pd.Timedelta(minutes=3),
+    'minute5': pd.Timedelta(minutes=5),
+    'minute10': pd.Timedelta(minutes=10),
+    'minute15': pd.Timedelta(minutes=15),
+    'minute30': pd.Timedelta(minutes=30),
+    'minute60': pd.Timedelta(hours=1),
+    'minute240': pd.Timedelta(hours=4),
+    'day': pd.Timedelta(days=1),
+}
+COLUMNS = ['open', 'high', 'low', 'close', 'volume', 'value']
+
+
+class CandleRingBuffer:
+    """고정 크기 캔들 링 버퍼 (가장 오래된 캔들부터 덮어쓴다)"""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.ts = np.zeros(capacity, dtype='int64')
+        self.values = np.zeros((capacity, len(COLUMNS)), dtype='float64')
+        self.start = 0
+        self.size = 0
+
+    def last_ts(self):
+        if self.size == 0:
+            return None
+        return self.ts[(self.start + self.size - 1) % self.capacity]
+
+    def extend(self, df):
+        """
+        캔들 병합: 마지막 캔들과 시각이 같으면 덮어쓰고(진행 중 캔들 갱신) 더 새로운 캔들만 추가
+        """
+        ts = df.index.values.astype('datetime64[ns]').astype('int64')
+        values = df.reindex(columns=COLUMNS).to_numpy(dtype='float64')
+        for t, row in zip(ts, values):
+            last = self.last_ts()
+            if last is not None and t < last:
+                continue
+            if last is not None and t == last:
+                pos = (self.start + self.size - 1) % self.capacity
+            elif self.size < self.capacity:
+                pos = (self.start + self.size) % self.capacity
+                self.size += 1
+            else:
+                pos = self.start
+                self.start = (self.start + 1) % self.capacity
+            self.ts[pos] = t
+            self.values[pos] = row
+
+    def to_frame(self, count):
+        count = min(count, self.size)
+        idx = (self.start + self.size - count + np.arange(count)) % self.capacity
+        index = pd.DatetimeIndex(self.ts[idx].astype('datetime64[ns]'))
+        return pd.DataFrame(self.values[idx], index=index, columns=COLUMNS)
+
+
+class CandleCache:
+    """
+    (market, interval)별 OHLCV 캐시
+    처음 한 번만 전체를 받고, 이후에는 마지막 캐시 캔들 이후의 캔들만 받아 병합한다.
+    """
+
+    def __init__(self, capacity=200, fetcher=pyupbit.get_ohlcv, clock=datetime.now):
+        """
+        :param capacity: 종목/주기별 최소 보관 캔들 수
+        :param fetcher: pyupbit.get_ohlcv 호환 함수
+        :param clock: 현재 시각 함수 (업비트 캔들 시각과 같은 KST 기준)
+        """
+        self.capacity = capacity
+        self.fetcher = fetcher
+        self.clock = clock
+        self._buffers = {}
+
+    def seed(self, market, interval, df):
+        """
+        저장해 둔 캔들로 버퍼를 채운다 (이후 get_ohlcv는 마지막 캔들 이후만 받는다)
+        :param df: pyupbit.get_ohlcv 형태의 DataFrame
+        """
+        buf = CandleRingBuffer(max(len(df), self.capacity))
+        buf.extend(df)
+        self._buffers[(market, interval)] = buf
+
+    def _full_load(self, market, interval, capacity):
+        df = self.fetcher(market, interval=interval, count=capacity)
+        if df is None or df.empty:
+            return None
+        buf = CandleRingBuffer(capacity)
+        buf.extend(df)
+        self._buffers[(market, interval)] = buf
+        return buf
+
+    def get_ohlcv(self, market, interval='day', count=200):
+        """
+        pyupbit.get_ohlcv와 같은 형태의 DataFrame 반환
+        :return: 최근 count개 캔들 DataFrame 또는 조회 실패 시 None
+        """
+        key = (market, interval)
+        buf = self._buffers.get(key)
+        delta = INTERVAL_DELTAS.get(interval)
+        if delta is None:
+            # week/month 등은 캐시하지 않는다
+            return self.fetcher(market, interval=interval, count=count)
+
+        if buf is None or buf.capacity < count:
+            buf = self._full_load(market, interval, max(count, self.capacity))
+            return buf.to_frame(count) if buf else None
+
+        last = pd.Timestamp(buf.last_ts())
+        elapsed = int((pd.Timestamp(self.clock()) - last) / delta)
+        # 진행 중이던 마지막 캔들도 다시 받아 갱신한다
+        n_new = max(elapsed, 0) + 2
+        if n_new >= buf.capacity:
+            buf = self._full_load(market, interval, buf.capacity)
+            return buf.to_frame(count) if buf else None
+
+        df = self.fetcher(market, interval=interval, count=n_new)
+        if df is None or df.empty:
+            logger.warning(f"Incremental candle fetch failed for {market} {interval}; using cached candles.")
+            return buf.to_frame(count)
+        if df.index[0] > last:
+            # 캐시와 새 캔들 사이에 빈 구간이 있으면 전체를 다시 받는다
+            buf = self._full_load(market, interval, buf.capacity)
+            return buf.to_frame(count) if buf else None
+        buf.extend(df)
+        return buf.to_frame(count)
@@ -0,0 +1,344 @@
+# database/migrations.py
+"""
+Versioned trades schema shared by every bot variant, tracked with PRAGMA user_version.
+
+    version 0  legacy tables: btc_* columns (bitcoin_trades.db, autotrade2/4/_4o/_log)
+               or coin_* columns (crypto_trades.db, autotrade/autotrade_/DatabaseManager)
+    version 1  unified trades table with source, ts_epoch and coin_* columns
+    version 2  fee column and the daily_pnl rollup, kept current by an insert trigger on trades
+    version 3  origin column: merged rows are keyed by (origin, source_id) instead of (source, source_id)
+
+Usage (from the BITCOIN directory):
+    python -m database.migrations status crypto_trades.db bitcoin_trades.db
+    python -m database.migrations upgrade bitcoin_trades.db --source autotrade4
+    python -m database.migrations merge all_trades.db crypto_trades.db=autotrade bitcoin_trades.db=autotrade4
+    python -m database.migrations rebuild all_trades.db
+"""
+import argparse
+import logging
+import os
+import sqlite3
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 3
+BATCH_SIZE = 50000
+
+TRADES_DDL = '''CREATE TABLE IF NOT EXISTS trades
+                (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                 ts_epoch INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
+                 timestamp TEXT NOT NULL,
+                 source TEXT NOT NULL DEFAULT '',
+                 source_id INTEGER,
+                 origin TEXT,
+                 coin_symbol TEXT NOT NULL DEFAULT 'BTC',
+                 decision TEXT NOT NULL,
+                 percentage REAL,
+                 reason TEXT,
+                 coin_balance REAL,
+                 krw_balance REAL,
+                 coin_avg_buy_price REAL,
+                 coin_krw_price REAL,
+                 profit_amount REAL,
+                 profit_rate REAL,
+                 trade_start_time TEXT,
+                 trade_end_time TEXT,
+                 reflection TEXT,
+                 gpt_response TEXT,
+                 fee REAL)'''
+
+TRADES_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_trades_timestamp ON trades (timestamp)",
+    "CREATE INDEX IF NOT EXISTS idx_trades_ts_epoch ON trades (ts_epoch)",
+    "CREATE INDEX IF NOT EXISTS idx_trades_coin_epoch ON trades (coin_symbol, ts_epoch)",
+    "CREATE INDEX IF NOT EXISTS idx_trades_source_epoch ON trades (source, ts_epoch)",
+    # rows copied from another file keep the merge label and their original id, so re-merging is a no-op
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_trades_origin_row ON trades (origin, source_id) "
+    "WHERE source_id IS NOT NULL",
+)
+
+# unified column -> legacy columns to take it from, in order of preference
+LEGACY_COLUMNS = {
+    'coin_symbol': ('coin_symbol',),
+    'decision': ('decision',),
+    'percentage': ('percentage',),
+    'reason': ('reason',),
+    'coin_balance': ('coin_balance', 'btc_balance'),
+    'krw_balance': ('krw_balance',),
+    'coin_avg_buy_price': ('coin_avg_buy_price', 'btc_avg_buy_price'),
+    'coin_krw_price': ('coin_krw_price', 'btc_krw_price'),
+    'profit_amount': ('profit_amount',),
+    'profit_rate': ('profit_rate',),
+    'trade_start_time': ('trade_start_time',),
+    'trade_end_time': ('trade_end_time',),
+    'reflection': ('reflection',),
+    'gpt_response': ('gpt_response',),
+    'fee': ('fee',),
+}
+
+# One row per bot, coin and local-time day. Opening/ending equity are the balances logged
+# on the day's first/last trade (by id).
+DAILY_PNL_DDL = '''CREATE TABLE IF NOT EXISTS daily_pnl
+                   (source TEXT NOT NULL,
+                    coin_symbol TEXT NOT NULL,
+                    day TEXT NOT NULL,
+                    trades INTEGER NOT NULL,
+                    buys INTEGER NOT NULL,
+                    sells INTEGER NOT NULL,
+                    realized_profit REAL NOT NULL,
+                    fees REAL NOT NULL,
+                    opening_equity REAL,
+                    ending_equity REAL,
+                    first_trade_id INTEGER NOT NULL,
+                    last_trade_id INTEGER NOT NULL,
+                    PRIMARY KEY (source, coin_symbol, day)) WITHOUT ROWID'''
+DAILY_PNL_COLUMNS = ('source', 'coin_symbol', 'day', 'trades', 'buys', 'sells', 'realized_profit', 'fees',
+                     'opening_equity', 'ending_equity', 'first_trade_id', 'last_trade_id')
+
+_DAY = "strftime('%Y-%m-%d', {t}.ts_epoch, 'unixepoch', 'localtime')"
+_EQUITY = "COALESCE({t}.krw_balance, 0) + COALESCE({t}.coin_balance, 0) * COALESCE({t}.coin_krw_price, 0)"
+
+# every insert touches exactly one rollup row (UPSERT needs SQLite 3.24+)
+DAILY_PNL_TRIGGER = f'''CREATE TRIGGER IF NOT EXISTS trades_daily_pnl AFTER INSERT ON trades
+BEGIN
+    INSERT INTO daily_pnl ({', '.join(DAILY_PNL_COLUMNS)})
+    VALUES (NEW.source, NEW.coin_symbol, {_DAY.format(t='NEW')}, 1,
+            NEW.decision = 'buy', NEW.decision = 'sell', COALESCE(NEW.profit_amount, 0), COALESCE(NEW.fee, 0),
+            {_EQUITY.format(t='NEW')}, {_EQUITY.format(t='NEW')}, NEW.id, NEW.id)
+    ON CONFLICT (source, coin_symbol, day) DO UPDATE SET
+        trades = trades + 1,
+        buys = buys + excluded.buys,
+        sells = sells + excluded.sells,
+        realized_profit = realized_profit + excluded.realized_profit,
+        fees = fees + excluded.fees,
+        ending_equity = excluded.ending_equity,
+        last_trade_id = excluded.last_trade_id;
+END'''
+
+DAILY_PNL_REBUILD = f'''INSERT INTO daily_pnl ({', '.join(DAILY_PNL_COLUMNS)})
+SELECT g.source, g.coin_symbol, g.day, g.trades, g.buys, g.sells, g.realized_profit, g.fees,
+       {_EQUITY.format(t='f')}, {_EQUITY.format(t='l')}, g.first_id, g.last_id
+FROM (SELECT source, coin_symbol, {_DAY.format(t='trades')} AS day, COUNT(*) AS trades,
+             TOTAL(decision = 'buy') AS buys, TOTAL(decision = 'sell') AS sells,
+             TOTAL(profit_amount) AS realized_profit, TOTAL(fee) AS fees,
+             MIN(id) AS first_id, MAX(id) AS last_id
+      FROM trades GROUP BY source, coin_symbol, day) AS g
+JOIN trades AS f ON f.id = g.first_id
+JOIN trades AS l ON l.id = g.last_id'''
+
+
+def schema_version(conn, schema='main'):
+    return conn.execute(f"PRAGMA {schema}.user_version").fetchone()[0]
+
+
+def _columns(conn, table, schema='main'):
+    return [row[1] for row in conn.execute(f"PRAGMA {schema}.table_info({table})")]
+
+
+def _has_table(conn, table, schema='main'):
+    return conn.execute(f"SELECT 1 FROM {schema}.sqlite_master WHERE type='table' AND name=?",
+                        (table,)).fetchone() is not None
+
+
+def _select_list(columns):
+    """
+    SELECT expressions mapping a legacy (or unified) trades table onto the unified columns.
+    The source name is bound as the first parameter.
+    """
+    exprs = {}
+    epoch = "CAST(strftime('%s', timestamp, 'utc') AS INTEGER)"
+    exprs['ts_epoch'] = f"COALESCE(ts_epoch, {epoch}, 0)" if 'ts_epoch' in columns else f"COALESCE({epoch}, 0)"
+    exprs['timestamp'] = "COALESCE(timestamp, '')"
+    exprs['source'] = "COALESCE(NULLIF(source, ''), ?)" if 'source' in columns else "?"
+    for target, candidates in LEGACY_COLUMNS.items():
+        found = next((c for c in candidates if c in columns), None)
+        exprs[target] = found if found else "NULL"
+    exprs['coin_symbol'] = f"COALESCE({exprs['coin_symbol']}, 'BTC')"
+    exprs['decision'] = f"LOWER(COALESCE({exprs['decision']}, 'hold'))"
+    exprs['percentage'] = f"CAST({exprs['percentage']} AS REAL)"
+    return list(exprs), list(exprs.values())
+
+
+def _copy_batches(conn, src_table, columns, source, batch_size, origin=None):
+    """
+    Copy rows in id order, one transaction per batch.
+    Without origin the original ids are kept (in-place upgrade); with origin each row is tagged
+    with origin and its original id as source_id (merge).
+    :return: (rows copied, rows skipped because they were already present)
+    """
+    targets, exprs = _select_list(columns)
+    params = (source,)
+    if origin is None:
+        targets, exprs = ['id'] + targets, ['id'] + exprs
+        # resume an interrupted upgrade after the last copied id
+        last = conn.execute("SELECT COALESCE(MAX(id), 0) FROM trades").fetchone()[0]
+    else:
+        targets, exprs = targets + ['origin', 'source_id'], exprs + ['?', 'id']
+        params = (source, origin)
+        # resume after the last row merged from this file
+        last = conn.execute("SELECT COALESCE(MAX(source_id), 0) FROM trades WHERE origin = ?",
+                            (origin,)).fetchone()[0]
+    sql = (f"INSERT OR IGNORE INTO trades ({', '.join(targets)}) "
+           f"SELECT {', '.join(exprs)} FROM {src_table} WHERE id > ? AND id <= ?")
+    copied = ignored = 0
+    while True:
+        hi, count = conn.execute(f"SELECT MAX(id), COUNT(*) FROM (SELECT id FROM {src_table} "
+                                 f"WHERE id > ? ORDER BY id LIMIT ?)", (last, batch_size)).fetchone()
+        if not count:
+            break
+        with conn:
+            inserted = conn.execute(sql, params + (last, hi)).rowcount
+        copied += inserted
+        ignored += count - inserted
+        last = hi
+    return copied, ignored
+
+
+def migrate(conn, source='', batch_size=BATCH_SIZE):
+    """
+    Bring a trades database up to SCHEMA_VERSION in place.
+    A legacy table is renamed and copied into the unified table in id batches; an interrupted
+    upgrade resumes from the last copied id on the next call.
+    :param source: bot name recorded on migrated rows (e.g. "autotrade4")
+    :return: the schema version before the upgrade
+    """
+    version = schema_version(conn)
+    if version >= SCHEMA_VERSION:
+        return version
+
+    if version < 1:
+        if _has_table(conn, 'trades') and not _has_table(conn, 'trades_legacy') \
+                and 'source' not in _columns(conn, 'trades'):
+            with conn:
+                conn.execute("ALTER TABLE trades RENAME TO trades_legacy")
+        with conn:
+            conn.execute(TRADES_DDL)
+        if _has_table(conn, 'trades_legacy'):
+            copied, ignored = _copy_batches(conn, 'trades_legacy', _columns(conn, 'trades_legacy'),
+                                            source, batch_size)
+            logger.info(f"Migrated {copied} legacy trades ({ignored} already present)")
+            with conn:
+                conn.execute("DROP TABLE trades_legacy")
+        with conn:
+            if 'origin' not in _columns(conn, 'trades'):
+                conn.execute("ALTER TABLE trades ADD COLUMN origin TEXT")
+            for ddl in TRADES_INDEXES:
+                conn.execute(ddl)
+            conn.execute("PRAGMA user_version = 1")
+
+    if version < 2:
+        with conn:
+            if 'fee' not in _columns(conn, 'trades'):
+                conn.execute("ALTER TABLE trades ADD COLUMN fee REAL")
+            conn.execute(DAILY_PNL_DDL)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_daily_pnl_day ON daily_pnl (day)")
+            conn.execute(DAILY_PNL_TRIGGER)
+            _rebuild_daily_pnl(conn)
+            conn.execute("PRAGMA user_version = 2")
+
+    if version < 3:
+        with conn:
+            if 'origin' not in _columns(conn, 'trades'):
+                conn.execute("ALTER TABLE trades ADD COLUMN origin TEXT")
+            # rows merged before version 3 were keyed by source; keep that key so re-merging stays a no-op
+            conn.execute("UPDATE trades SET origin = source WHERE source_id IS NOT NULL AND origin IS NULL")
+            conn.execute("DROP INDEX IF EXISTS idx_trades_source_row")
+            for ddl in TRADES_INDEXES:
+                conn.execute(ddl)
+            conn.execute("PRAGMA user_version = 3")
+    return version
+
+
+def _rebuild_daily_pnl(conn):
+    conn.execute("DELETE FROM daily_pnl")
+    return conn.execute(DAILY_PNL_REBUILD).rowcount
+
+
+def rebuild_daily_pnl(conn):
+    """
+    Recompute daily_pnl from the whole trades table (after editing trades behind the trigger's back).
+    :return: number of rollup rows
+    """
+    with conn:
+        return _rebuild_daily_pnl(conn)
+
+
+def merge(dest_conn, src_path, source, batch_size=BATCH_SIZE):
+    """
+    Append another trades file (any version, left unmodified) into dest_conn's store.
+    Rows keep the bot name recorded in the file (source fills it in for files without one) and are
+    keyed by the merge label plus their original id, so files whose ids overlap are all copied and
+    running it again only copies new rows.
+    :param source: merge label for this file; must differ between files merged into the same store
+    :return: (rows copied, rows skipped because they were already merged)
+    """
+    migrate(dest_conn, batch_size=batch_size)
+    dest_conn.execute("ATTACH DATABASE ? AS src", (f"file:{os.path.abspath(src_path)}?mode=ro",))
+    try:
+        if not _has_table(dest_conn, 'trades', 'src'):
+            return 0, 0
+        copied, ignored = _copy_batches(dest_conn, 'src.trades', _columns(dest_conn, 'trades', 'src'),
+                                        source, batch_size, origin=source)
+        if ignored:
+            logger.warning(f"{src_path}: {ignored} trades already merged as {source}, skipped")
+        return copied, ignored
+    finally:
+        dest_conn.execute("DETACH DATABASE src")
+
+
+def _connect(path):
+    conn = sqlite3.connect(path, uri=True)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Trades schema migration tool")
+    sub = parser.add_subparsers(dest="command", required=True)
+    status = sub.add_parser("status", help="Show schema version and row count")
+    status.add_argument("paths", nargs="+")
+    upgrade = sub.add_parser("upgrade", help="Upgrade files in place")
+    upgrade.add_argument("paths", nargs="+")
+    upgrade.add_argument("--source", default=None, help="Bot name for migrated rows (default: file name)")
+    upgrade.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    merge_cmd = sub.add_parser("merge", help="Merge files into one store")
+    merge_cmd.add_argument("dest")
+    merge_cmd.add_argument("sources", nargs="+", help="path=source_name (default name: file name)")
+    merge_cmd.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    rebuild = sub.add_parser("rebuild", help="Recompute the daily_pnl rollup")
+    rebuild.add_argument("paths", nargs="+")
+    args = parser.parse_args(argv)
+
+    if args.command == "status":
+        for path in args.paths:
+            conn = sqlite3.connect(f"file:{os.path.abspath(path)}?mode=ro", uri=True)
+            rows = conn.execute("SELECT COUNT(*) FROM trades").fetchone()[0] if _has_table(conn, 'trades') else 0
+            print(f"{path}: version {schema_version(conn)}, {rows} trades")
+            conn.close()
+    elif args.command == "upgrade":
+        for path in args.paths:
+            conn = _connect(path)
+            source = args.source or os.path.splitext(os.path.basename(path))[0]
+            before = migrate(conn, source, args.batch_size)
+            print(f"{path}: version {before} -> {schema_version(conn)}")
+            conn.close()
+    elif args.command == "merge":
+        conn = _connect(args.dest)
+        for spec in args.sources:
+            path, _, source = spec.partition("=")
+            source = source or os.path.splitext(os.path.basename(path))[0]
+            copied, ignored = merge(conn, path, source, args.batch_size)
+            print(f"{path} ({source}): {copied} trades merged into {args.dest}, {ignored} already present")
+        conn.close()
+    elif args.command == "rebuild":
+        for path in args.paths:
+            conn = _connect(path)
+            migrate(conn, os.path.splitext(os.path.basename(path))[0])
+            print(f"{path}: {rebuild_daily_pnl(conn)} daily_pnl rows")
+            conn.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
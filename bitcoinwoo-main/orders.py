@@ -0,0 +1,54 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 거래 수수료 및 최소 거래 금액 설정 (autotrade.py와 backtest.py가 같은 값을 쓴다)
+FEE_RATE = 0.0005  # 업비트 수수료는 0.05%
+MIN_TRADE_AMOUNT = 5000  # 최소 거래 금액 5,000원
+
+
+# 매수/매도 주문 계획 (잔고를 순서대로 나눠야 하므로 직렬로 처리)
+# 주문은 동시에 실행되므로 같은 사이클의 매도 대금은 매수에 쓰지 않는다 (사이클 시작 시점 KRW 잔고 기준)
+def plan_orders(signals, prices, total_krw_balance, allocation_percentages, cumulative_buy_amounts,
+                balance, avg_buy_price, min_trade_amount=MIN_TRADE_AMOUNT):
+    """
+    :param signals: {코인 심볼: (decision, reason, signal_time)} (코인 설정 순서)
+    :param prices: {시장: 현재가}
+    :param total_krw_balance: 사이클 시작 시점 KRW 잔고
+    :param balance: 코인 심볼 -> 보유 수량 함수
+    :param avg_buy_price: 코인 심볼 -> 평균 매수가 함수
+    :return: 주문 dict 리스트 (매수는 KRW 금액, 매도는 수량이 amount)
+    """
+    orders = []
+    krw_balance = total_krw_balance
+    for coin_symbol, (decision, reason, signal_time) in signals.items():
+        market = f"KRW-{coin_symbol}"
+        coin_balance = balance(coin_symbol)
+        coin_avg_buy_price = avg_buy_price(coin_symbol)
+        current_price = prices[market]
+        allocation_percentage = allocation_percentages[coin_symbol]
+        allocation_amount = total_krw_balance * (allocation_percentage / 100)
+        cumulative_buy = cumulative_buy_amounts.get(coin_symbol, 0)
+        order = dict(market=market, coin_symbol=coin_symbol, decision=decision, reason=reason,
+                     signal_time=signal_time, percentage=allocation_percentage,
+                     coin_balance=coin_balance, krw_balance=krw_balance,
+                     coin_avg_buy_price=coin_avg_buy_price, current_price=current_price)
+
+        if decision == "buy":
+            remaining_alloc = allocation_amount - cumulative_buy
+            buy_amount = min(remaining_alloc, krw_balance)
+            if buy_amount >= min_trade_amount:
+                order['amount'] = buy_amount
+                # 앞서 계획한 매수 금액만큼 이후 코인이 쓸 수 있는 KRW를 줄인다
+                krw_balance -= buy_amount
+                orders.append(order)
+            else:
+                logger.info(f"{signal_time} [{coin_symbol}] Not enough allocation or KRW balance to execute BUY. Remaining Allocation: {remaining_alloc:.2f} KRW, Available KRW: {krw_balance:.2f} KRW")
+        elif decision == "sell":
+            sell_total = coin_balance * current_price
+            if sell_total >= min_trade_amount:
+                order['amount'] = coin_balance
+                orders.append(order)
+            else:
+                logger.info(f"{signal_time} [{coin_symbol}] Not enough {coin_symbol} balance to execute SELL. Required: {min_trade_amount} KRW, Available: {sell_total:.2f} KRW")
+    return orders
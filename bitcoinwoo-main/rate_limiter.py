@@ -0,0 +1,43 @@
+import functools
+import threading
+import time
+
+# 업비트 API 요청 제한 (초당)
+QUOTATION_RATE = 10  # 시세 조회 (IP 단위)
+EXCHANGE_RATE = 30  # 잔고 등 주문 외 거래 API (계정 단위)
+ORDER_RATE = 8  # 주문 (계정 단위)
+
+
+class RateLimiter:
+    """스레드 간에 공유하는 토큰 버킷 (초당 rate개, 최대 capacity개까지 몰아서 허용)"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """토큰 하나를 얻을 때까지 대기하고 대기 시간(초)을 반환"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+def limited(limiter, func):
+    """func 호출 전에 limiter 토큰을 얻도록 감싼 함수"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        limiter.acquire()
+        return func(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+import ta
+from batch_indicators import compute_all
+
+# 매매 신호 사유 코드 (make_trading_decision의 조건 우선순위 순서)
+HOLD = 0
+BB_RSI_OVERBOUGHT = 1
+BB_RSI_OVERSOLD = 2
+MACD_CROSS_UP = 3
+MACD_CROSS_DOWN = 4
+
+DECISIONS = {HOLD: "hold", BB_RSI_OVERBOUGHT: "sell", BB_RSI_OVERSOLD: "buy",
+             MACD_CROSS_UP: "buy", MACD_CROSS_DOWN: "sell"}
+REASONS = {
+    HOLD: "",
+    BB_RSI_OVERBOUGHT: "Price just crossed above upper Bollinger Band and RSI entered overbought.",
+    BB_RSI_OVERSOLD: "Price just crossed below lower Bollinger Band and RSI entered oversold.",
+    MACD_CROSS_UP: "MACD line just crossed above signal line.",
+    MACD_CROSS_DOWN: "MACD line just crossed below signal line.",
+}
+
+
+# 데이터프레임에 보조 지표를 추가하는 함수
+def add_indicators(df):
+    # 볼린저 밴드 추가
+    indicator_bb = ta.volatility.BollingerBands(close=df['close'], window=20, window_dev=2)
+    df['bb_bbm'] = indicator_bb.bollinger_mavg()
+    df['bb_bbh'] = indicator_bb.bollinger_hband()
+    df['bb_bbl'] = indicator_bb.bollinger_lband()
+    
+    # RSI 추가
+    df['rsi'] = ta.momentum.RSIIndicator(close=df['close'], window=14).rsi()
+    
+    # MACD 추가
+    macd = ta.trend.MACD(close=df['close'])
+    df['macd'] = macd.macd()
+    df['macd_signal'] = macd.macd_signal()
+    df['macd_diff'] = macd.macd_diff()
+
+    return df
+
+
+# 여러 시장의 데이터프레임에 같은 보조 지표를 한 번에 추가하는 함수
+def add_indicators_batch(frames):
+    """
+    캔들 수가 같은 시장끼리 종가를 (시장 x 시간) 행렬로 쌓아 batch_indicators.compute_all로 계산한다.
+    결과는 add_indicators와 같다.
+    :param frames: {시장: 데이터프레임}
+    :return: {시장: 지표가 추가된 데이터프레임}
+    """
+    groups = {}
+    for market, df in frames.items():
+        groups.setdefault(len(df), []).append(market)
+    for group in groups.values():
+        close = np.vstack([frames[market]['close'].to_numpy(dtype=float) for market in group])
+        indicators = compute_all(close)
+        for row, market in enumerate(group):
+            df = frames[market]
+            for name, values in indicators.items():
+                df[name] = values[row]
+    return frames
+
+
+def reason_codes(df):
+    """전체 구간의 교차 조건을 한 번에 계산한 행별 사유 코드 (첫 행은 HOLD)"""
+    def prev(col):
+        values = df[col].to_numpy(dtype=float)
+        shifted = np.full_like(values, np.nan)
+        shifted[1:] = values[:-1]
+        return shifted, values
+
+    with np.errstate(invalid='ignore'):
+        close_p, close = prev('close')
+        bbh_p, bbh = prev('bb_bbh')
+        bbl_p, bbl = prev('bb_bbl')
+        rsi_p, rsi = prev('rsi')
+        macd_p, macd = prev('macd')
+        sig_p, sig = prev('macd_signal')
+
+        conditions = [
+            # 조건 1: 볼린저 밴드 상단 돌파와 RSI 과매수 진입 순간 -> 매도
+            (close_p < bbh_p) & (close >= bbh) & (rsi_p <= 70) & (rsi > 70),
+            # 조건 2: 볼린저 밴드 하단 돌파와 RSI 과매도 진입 순간 -> 매수
+            (close_p > bbl_p) & (close <= bbl) & (rsi_p >= 30) & (rsi < 30),
+            # 조건 3: MACD 시그널 라인 상향 돌파 순간 -> 매수
+            (macd_p <= sig_p) & (macd > sig),
+            # 조건 4: MACD 시그널 라인 하향 돌파 순간 -> 매도
+            (macd_p >= sig_p) & (macd < sig),
+        ]
+    choices = [BB_RSI_OVERBOUGHT, BB_RSI_OVERSOLD, MACD_CROSS_UP, MACD_CROSS_DOWN]
+    return np.select(conditions, choices, default=HOLD).astype(np.int8)
+
+
+def signal_series(df):
+    """전체 구간의 매매 신호 (decision / reason_code / reason) - 백테스트용"""
+    codes = reason_codes(df)
+    decisions = np.array([DECISIONS[c] for c in sorted(DECISIONS)], dtype=object)
+    reasons = np.array([REASONS[c] for c in sorted(REASONS)], dtype=object)
+    return pd.DataFrame({
+        'decision': decisions[codes],
+        'reason_code': codes,
+        'reason': reasons[codes],
+    }, index=df.index)
+
+
+# 매매 결정: 전체 신호 시리즈의 마지막 값을 사용 (신호 발생 시점에 매매)
+def make_trading_decision(df):
+    if len(df) < 2:
+        return "hold", ""
+    code = reason_codes(df)[-1]
+    return DECISIONS[code], REASONS[code]
@@ -2,6 +2,13 @@ import streamlit as st
 import pandas as pd
 import sqlite3
 from datetime import datetime, timedelta
+from trade_db import connect_readonly, query_trades, load_daily_pnl
+from analytics import ANALYTICS_COLUMNS, compute_metrics, equity_curve
+
+DB_PATH = 'crypto_trades.db'
+HISTORY_COLUMNS = ['id', 'trade_end_time', 'coin_symbol', 'profit_amount', 'profit_rate']
+# 세션에 쌓아 두는 거래 컬럼 (성과 지표 + 매도 이력)
+TRADE_COLUMNS = ANALYTICS_COLUMNS + [c for c in HISTORY_COLUMNS if c not in ANALYTICS_COLUMNS]
 
 # 페이지 설정
 st.set_page_config(page_title='Crypto Trading Performance', layout='wide')
@@ -12,29 +19,55 @@ st.title('암호화폐 트레이딩 성과 대시보드')
 # 사이드바에서 계좌의 시초가 입력받기
 initial_balance = st.sidebar.number_input('계좌의 시초가를 입력하세요 (KRW)', min_value=0.0, value=1000000.0)
 
-# SQLite 데이터베이스 연결
-conn = sqlite3.connect('crypto_trades.db')
-
-# 거래 데이터 읽어오기
-trades_df = pd.read_sql_query("SELECT * FROM trades", conn)
-
-# 데이터베이스 연결 종료
-conn.close()
-
-# 'trade_end_time'을 datetime 형식으로 변환
-trades_df['trade_end_time'] = pd.to_datetime(trades_df['trade_end_time'])
-
-# 'sell' 거래만 필터링하여 수익 계산
-sell_trades = trades_df[trades_df['decision'] == 'sell'].copy()
-sell_trades.sort_values('trade_end_time', inplace=True)
-
-# 수익 금액이 없는 경우 0으로 대체
-sell_trades['profit_amount'].fillna(0, inplace=True)
+# SQLite 데이터베이스 연결 (읽기 전용: 봇의 기록과 잠금 충돌 없음, 세션 간 재사용)
+@st.cache_resource
+def get_connection():
+    return connect_readonly(DB_PATH)
+
+# 일별 실현 수익 (daily_pnl 집계 행만 읽는다, 마지막 거래 id가 바뀔 때만 다시 조회)
+@st.cache_data
+def load_daily_profit(last_trade_id):
+    return load_daily_pnl(get_connection()).groupby('day')['realized_profit'].sum()
+
+# 성과 지표와 자산 곡선 (세션에 쌓아 둔 거래로 numpy 계산)
+def load_analytics(trades):
+    curve = equity_curve(trades)
+    # 차트에는 일별 마지막 평가 금액만 그린다
+    return compute_metrics(trades), curve.resample('D').last().ffill() if not curve.empty else curve
+
+# 계산되지 않은 지표는 '-'로 표시
+def show(value, fmt):
+    return '-' if value is None else fmt.format(value)
+
+try:
+    conn = get_connection()
+    last_trade_id = conn.execute("SELECT COALESCE(MAX(last_trade_id), 0) FROM daily_pnl").fetchone()[0]
+except sqlite3.OperationalError:
+    st.write('거래 데이터베이스가 아직 없거나 최신 스키마가 아닙니다. 봇을 한 번 실행하세요.')
+    st.stop()
+
+# 거래는 세션에 쌓아 두고 지난 화면 이후 추가된 행만 읽는다 (성과 지표도 새 거래가 있을 때만 다시 계산)
+if 'trades' not in st.session_state or st.session_state['last_trade_id'] > last_trade_id:
+    st.session_state['trades'] = pd.DataFrame(columns=TRADE_COLUMNS)
+    st.session_state['last_trade_id'] = 0
+    st.session_state['analytics'] = None
+if last_trade_id > st.session_state['last_trade_id']:
+    new_trades = query_trades(conn, TRADE_COLUMNS, after_id=st.session_state['last_trade_id'])
+    if not new_trades.empty:
+        trades = st.session_state['trades']
+        st.session_state['trades'] = pd.concat([trades, new_trades], ignore_index=True) \
+            if not trades.empty else new_trades
+        st.session_state['analytics'] = None
+    st.session_state['last_trade_id'] = last_trade_id
+if st.session_state['analytics'] is None:
+    st.session_state['analytics'] = load_analytics(st.session_state['trades'])
+trades = st.session_state['trades']
+sell_trades = trades.loc[trades['decision'] == 'sell', HISTORY_COLUMNS]
 
 # 누적 수익 금액 계산
-if not sell_trades.empty:
-    sell_trades.set_index('trade_end_time', inplace=True)
-    daily_profit = sell_trades['profit_amount'].resample('D').sum().cumsum()
+daily_profit = load_daily_profit(last_trade_id)
+if not daily_profit.empty:
+    daily_profit = daily_profit.set_axis(pd.to_datetime(daily_profit.index)).cumsum()
     daily_profit_rate = (daily_profit / initial_balance) * 100
 
     # 날짜 인덱스 설정 및 결측치 처리
@@ -43,11 +76,10 @@ if not sell_trades.empty:
         method='ffill'
     )
     daily_profit_rate.index.name = '날짜'
+    total_profit = daily_profit.iloc[-1]
 else:
     daily_profit_rate = pd.Series(dtype=float)
-
-# 총 수익 금액 계산
-total_profit = sell_trades['profit_amount'].sum()
+    total_profit = 0.0
 
 # 수익률 계산
 if initial_balance > 0:
@@ -60,19 +92,40 @@ st.header('현재 수익 현황')
 st.write(f'**총 수익 금액:** {total_profit:,.2f} KRW')
 st.write(f'**총 수익률:** {profit_rate:.2f}%')
 
+# 성과 지표 출력
+st.header('성과 지표')
+metrics, equity = st.session_state['analytics']
+col1, col2, col3, col4 = st.columns(4)
+col1.metric('승률', show(metrics['win_rate'], '{:.1f}%'))
+col2.metric('손익비 (Profit Factor)', show(metrics['profit_factor'], '{:.2f}'))
+col3.metric('샤프 지수', show(metrics['sharpe'], '{:.2f}'))
+col4.metric('소르티노 지수', show(metrics['sortino'], '{:.2f}'))
+col1, col2, col3, col4 = st.columns(4)
+col1.metric('최대 낙폭', show(metrics['max_drawdown'], '{:.2f}%'))
+col2.metric('최장 낙폭 기간', show(metrics['max_drawdown_days'], '{:.1f}일'))
+col3.metric('보유 시간 비율', show(metrics['exposure'], '{:.1f}%'))
+col4.metric('평균 거래 수익률', show(metrics['avg_trade_return'], '{:.2f}%'))
+
+st.header('자산 곡선')
+if not equity.empty:
+    st.line_chart(equity.rename('평가 금액 (KRW)'))
+else:
+    st.write('자산 곡선을 표시할 데이터가 없습니다.')
+
 # 거래 이력 테이블 출력
 st.header('거래 이력')
 
 if not sell_trades.empty:
-    trade_history = sell_trades.reset_index()[['trade_end_time', 'coin_symbol', 'profit_amount', 'profit_rate']]
+    trade_history = sell_trades.sort_values('trade_end_time')[HISTORY_COLUMNS[1:]].copy()
+    trade_history['trade_end_time'] = pd.to_datetime(trade_history['trade_end_time'])
     trade_history.rename(columns={
         'trade_end_time': '매매 시간',
         'coin_symbol': '코인',
         'profit_amount': '수익 금액 (KRW)',
         'profit_rate': '수익률 (%)'
     }, inplace=True)
-    trade_history['수익 금액 (KRW)'] = trade_history['수익 금액 (KRW)'].round(2)
-    trade_history['수익률 (%)'] = trade_history['수익률 (%)'].round(2)
+    trade_history['수익 금액 (KRW)'] = trade_history['수익 금액 (KRW)'].astype(float).fillna(0).round(2)
+    trade_history['수익률 (%)'] = trade_history['수익률 (%)'].astype(float).round(2)
     st.dataframe(trade_history.reset_index(drop=True))
 else:
     st.write('매도 거래 내역이 없습니다.')
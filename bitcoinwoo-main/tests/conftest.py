@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 봇과 같은 방식(bitcoinwoo-main 디렉터리 기준)으로 모듈을 import
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
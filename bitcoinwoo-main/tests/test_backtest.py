@@ -0,0 +1,50 @@
+import pandas as pd
+import pytest
+import backtest
+from orders import plan_orders, FEE_RATE
+from signals import signal_series, DECISIONS, REASONS, MACD_CROSS_UP, MACD_CROSS_DOWN
+
+TIMES = pd.date_range('2026-01-01', periods=40, freq='15min')
+PRICES = {'A': 1000.0, 'B': 2000.0}
+# 코인(가격)별로 신호를 낼 캔들 위치와 사유 코드
+CODES = {1000.0: {30: MACD_CROSS_UP, 35: MACD_CROSS_DOWN}, 2000.0: {35: MACD_CROSS_UP}}
+
+
+def _candles(price):
+    return pd.DataFrame({'open': price, 'high': price, 'low': price, 'close': price, 'volume': 1.0}, index=TIMES)
+
+
+def _signals(df):
+    codes = pd.Series(0, index=df.index, dtype='int8')
+    for pos, code in CODES[df['close'].iloc[0]].items():
+        codes.iloc[pos] = code
+    result = signal_series(df.iloc[:0]).reindex(df.index)
+    result['reason_code'] = codes
+    result['decision'] = codes.map(DECISIONS)
+    result['reason'] = codes.map(REASONS)
+    return result
+
+
+def test_same_cycle_sell_does_not_fund_buy(monkeypatch):
+    monkeypatch.setattr(backtest, 'signal_series', _signals)
+    allocation = {'A': 50.0, 'B': 50.0}
+    result = backtest.run_backtest({coin: _candles(price) for coin, price in PRICES.items()}, allocation, 100_000)
+    trades = result.trades
+    assert list(zip(trades['coin_symbol'], trades['decision'])) == [('A', 'buy'), ('A', 'sell'), ('B', 'buy')]
+
+    # 두 번째 사이클(A 매도 + B 매수)을 job()의 plan_orders로 계획한 결과와 비교
+    first_buy = trades['fee'].iloc[0] / FEE_RATE
+    krw = 100_000 - first_buy * (1 + FEE_RATE)
+    stamp = TIMES[35].strftime("%Y-%m-%d %H:%M:%S")
+    live = plan_orders({'A': ('sell', REASONS[MACD_CROSS_DOWN], stamp), 'B': ('buy', REASONS[MACD_CROSS_UP], stamp)},
+                       {f"KRW-{coin}": price for coin, price in PRICES.items()}, krw, allocation,
+                       {'A': first_buy, 'B': 0.0}, {'A': first_buy / PRICES['A'], 'B': 0.0}.get,
+                       {'A': PRICES['A'], 'B': 0.0}.get)
+    simulated = trades.iloc[1:]
+    assert list(simulated['decision']) == [order['decision'] for order in live]
+    assert list(simulated['krw_balance']) == pytest.approx([order['krw_balance'] for order in live])
+    assert list(simulated['coin_balance']) == pytest.approx([order['coin_balance'] for order in live])
+    assert simulated['fee'].iloc[1] / FEE_RATE == pytest.approx(live[1]['amount'])
+    # B의 매수 한도는 A 매도 대금을 포함하지 않은 사이클 시작 잔고
+    assert live[1]['amount'] == pytest.approx(krw * 0.5)
+    assert simulated['krw_balance'].iloc[1] == pytest.approx(krw)
@@ -0,0 +1,30 @@
+import os
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BITCOIN = os.path.join(os.path.dirname(ROOT), 'BITCOIN')
+
+# bitcoinwoo-main 사본 -> 원본 BITCOIN 패키지 모듈
+VENDORED = {
+    'migrations.py': 'database/migrations.py',
+    'trade_queries.py': 'database/trade_queries.py',
+    'balance_book.py': 'trade/balance_book.py',
+    'batch_indicators.py': 'indicators/batch_indicators.py',
+}
+
+
+def _flatten_imports(source):
+    # 평면 스크립트 트리에서는 패키지 경로 없이 import 한다
+    return '\n'.join(line.replace('from database.', 'from ', 1) if line.startswith('from database.') else line
+                     for line in source.split('\n'))
+
+
+@pytest.mark.parametrize('copy, original', sorted(VENDORED.items()))
+def test_vendored_copy_matches_bitcoin_package(copy, original):
+    path = os.path.join(BITCOIN, original)
+    if not os.path.exists(path):
+        pytest.skip(f"BITCOIN/{original} not checked out")
+    with open(path, encoding='utf-8') as f:
+        expected = _flatten_imports(f.read())
+    with open(os.path.join(ROOT, copy), encoding='utf-8') as f:
+        assert f.read() == expected, f"{copy} differs from BITCOIN/{original}; re-copy it after changing the original"
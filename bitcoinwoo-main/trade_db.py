@@ -0,0 +1,68 @@
+import argparse
+import os
+import sqlite3
+from urllib.request import pathname2url
+# 스키마/마이그레이션과 조회 함수는 BITCOIN 패키지 모듈의 사본을 그대로 쓴다
+#   migrations.py    = BITCOIN/database/migrations.py
+#   trade_queries.py = BITCOIN/database/trade_queries.py (패키지 import만 평면 import로 바꿈)
+# 두 트리가 어긋나지 않도록 tests/test_vendored.py가 사본이 달라지면 실패한다. 수정은 BITCOIN 쪽에서 하고 다시 복사한다.
+from migrations import SCHEMA_VERSION, DAILY_PNL_COLUMNS, migrate, rebuild_daily_pnl, schema_version
+from trade_queries import (BUCKETS, AGGREGATES, to_epoch, table_columns, query_trades, aggregate_trades,
+                           load_daily_pnl, equity_performance)
+
+# WAL: 봇이 쓰는 동안에도 대시보드가 읽을 수 있다 / NORMAL: 커밋마다 fsync 하지 않는다
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-16000",  # 16MB 페이지 캐시
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=5000",
+)
+
+# LLM 반성 프롬프트에 넣는 거래 컬럼 (병합/집계용 컬럼은 넣지 않는다)
+PROMPT_COLUMNS = ['timestamp', 'decision', 'percentage', 'reason', 'coin_symbol', 'coin_balance', 'krw_balance',
+                  'coin_avg_buy_price', 'coin_krw_price', 'profit_amount', 'reflection']
+
+
+def connect(db_name):
+    """봇(쓰기)용 연결"""
+    conn = sqlite3.connect(db_name, timeout=5)
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+def connect_readonly(db_name):
+    """
+    대시보드(읽기 전용)용 연결
+    쓰기 잠금을 잡지 않으므로 WAL에서 봇의 기록과 서로 막지 않는다.
+    파일이 없으면 sqlite3.OperationalError
+    """
+    uri = f"file:{pathname2url(os.path.abspath(db_name))}?mode=ro"
+    conn = sqlite3.connect(uri, uri=True, timeout=5, check_same_thread=False)
+    conn.execute("PRAGMA busy_timeout=5000")
+    conn.execute("PRAGMA query_only=ON")
+    return conn
+
+
+def init_trades(db_name, source):
+    """봇용 연결을 열고 trades 테이블을 최신 스키마로 맞춘다 (source: 예전 형식 행에 기록할 봇 이름)"""
+    conn = connect(db_name)
+    migrate(conn, source)
+    return conn
+
+
+if __name__ == "__main__":
+    # python trade_db.py rebuild crypto_trades.db=autotrade [bitcoin_trades.db=autotrade4 ...]
+    parser = argparse.ArgumentParser(description="trades DB 관리")
+    parser.add_argument("command", choices=["rebuild"], help="rebuild: daily_pnl 재계산")
+    parser.add_argument("paths", nargs="+", help="path=봇 이름 (예전 형식 파일을 업그레이드할 때 행에 기록)")
+    args = parser.parse_args()
+    for spec in args.paths:
+        path, _, source = spec.partition("=")
+        if not source:
+            parser.error(f"{spec}: bot name required (path=source)")
+        conn = connect(path)
+        migrate(conn, source)
+        print(f"{path}: {rebuild_daily_pnl(conn)} daily_pnl rows")
+        conn.close()
@@ -0,0 +1,143 @@
+# database/trade_queries.py
+from datetime import datetime
+import pandas as pd
+from migrations import DAILY_PNL_COLUMNS
+
+# strftime formats for time buckets (local time, like the ISO timestamps the bots write)
+BUCKETS = {
+    'minute': '%Y-%m-%d %H:%M',
+    'hour': '%Y-%m-%d %H:00',
+    'day': '%Y-%m-%d',
+    'month': '%Y-%m',
+}
+AGGREGATES = ('count', 'sum', 'avg', 'min', 'max', 'total')
+
+
+def to_epoch(value):
+    """Epoch seconds from a datetime, ISO string or number (naive values are local time)."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return int(value.timestamp())
+
+
+def table_columns(conn, table='trades'):
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def _where(start=None, end=None, coins=None, decision=None, sources=None, after_id=None):
+    clauses, params = [], []
+    if start is not None:
+        clauses.append("ts_epoch >= ?")
+        params.append(to_epoch(start))
+    if end is not None:
+        clauses.append("ts_epoch < ?")
+        params.append(to_epoch(end))
+    if coins:
+        clauses.append(f"coin_symbol IN ({', '.join('?' * len(coins))})")
+        params.extend(coins)
+    if decision is not None:
+        clauses.append("decision = ?")
+        params.append(decision)
+    if sources:
+        clauses.append(f"source IN ({', '.join('?' * len(sources))})")
+        params.extend(sources)
+    if after_id is not None:
+        clauses.append("id > ?")
+        params.append(int(after_id))
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+def query_trades(conn, columns=None, start=None, end=None, coins=None, decision=None,
+                 descending=False, limit=None, sources=None, after_id=None):
+    """
+    Trades in [start, end), optionally for some coins / bots / one decision.
+    Only the requested columns are read; after_id limits it to rows added since that id.
+    """
+    known = table_columns(conn)
+    columns = list(columns) if columns else known
+    unknown = set(columns) - set(known)
+    if unknown:
+        raise ValueError(f"Unknown trade columns: {sorted(unknown)}")
+    where, params = _where(start, end, coins, decision, sources, after_id)
+    sql = f"SELECT {', '.join(columns)} FROM trades{where} ORDER BY ts_epoch {'DESC' if descending else 'ASC'}, id"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(int(limit))
+    return pd.read_sql_query(sql, conn, params=params)
+
+
+def aggregate_trades(conn, aggregates, bucket=None, by_coin=False, start=None, end=None,
+                     coins=None, decision=None, sources=None, by_source=False):
+    """
+    Grouped aggregates computed in SQL.
+    :param aggregates: {output name: (function, column)}, e.g. {'profit': ('sum', 'profit_amount'),
+                       'trades': ('count', '*')}
+    :param bucket: None or one of BUCKETS (local-time period)
+    :param by_coin: also group by coin_symbol
+    :param by_source: also group by bot (source)
+    """
+    known = set(table_columns(conn))
+    select, group = [], []
+    if bucket is not None:
+        if bucket not in BUCKETS:
+            raise ValueError(f"Unknown bucket: {bucket}")
+        select.append(f"strftime('{BUCKETS[bucket]}', ts_epoch, 'unixepoch', 'localtime') AS bucket")
+        group.append("bucket")
+    if by_source:
+        select.append("source")
+        group.append("source")
+    if by_coin:
+        select.append("coin_symbol")
+        group.append("coin_symbol")
+    for name, (func, column) in aggregates.items():
+        if not name.isidentifier() or func not in AGGREGATES or (column != '*' and column not in known):
+            raise ValueError(f"Invalid aggregate {name}: {func}({column})")
+        if column == '*' and func != 'count':
+            raise ValueError(f"Invalid aggregate {name}: {func}(*)")
+        select.append(f"{func.upper()}({column}) AS {name}")
+    where, params = _where(start, end, coins, decision, sources)
+    sql = f"SELECT {', '.join(select)} FROM trades{where}"
+    if group:
+        sql += f" GROUP BY {', '.join(group)} ORDER BY {', '.join(group)}"
+    return pd.read_sql_query(sql, conn, params=params)
+
+
+def load_daily_pnl(conn, start=None, end=None, coins=None, sources=None):
+    """
+    Rows of the daily_pnl rollup for days in [start, end), ordered by day and first trade.
+    Reads one row per bot, coin and day instead of the raw trades.
+    """
+    clauses, params = [], []
+    if start is not None:
+        clauses.append("day >= ?")
+        params.append(datetime.fromtimestamp(to_epoch(start)).strftime('%Y-%m-%d'))
+    if end is not None:
+        clauses.append("day < ?")
+        params.append(datetime.fromtimestamp(to_epoch(end)).strftime('%Y-%m-%d'))
+    if coins:
+        clauses.append(f"coin_symbol IN ({', '.join('?' * len(coins))})")
+        params.extend(coins)
+    if sources:
+        clauses.append(f"source IN ({', '.join('?' * len(sources))})")
+        params.extend(sources)
+    where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+    sql = f"SELECT {', '.join(DAILY_PNL_COLUMNS)} FROM daily_pnl{where} ORDER BY day, first_trade_id"
+    return pd.read_sql_query(sql, conn, params=params)
+
+
+def equity_performance(pnl_df):
+    """
+    Return over the rollup rows: equity at the last trade vs. the first.
+    :return: (return in %, initial equity), or (None, None) without trades
+    """
+    if pnl_df.empty:
+        return None, None
+    initial_balance = pnl_df.loc[pnl_df['first_trade_id'].idxmin(), 'opening_equity']
+    final_balance = pnl_df.loc[pnl_df['last_trade_id'].idxmax(), 'ending_equity']
+    if not initial_balance:
+        return None, final_balance
+    return (final_balance - initial_balance) / initial_balance * 100, initial_balance